@@ -1,89 +1,73 @@
 """
 Test için mevcut kullanıcıların hesaplarına para ekleme scripti
-Bu script, geliştirme ve test amaçlı olarak tüm kullanıcıların vadesiz hesaplarına para ekler.
+Bu script, geliştirme/test verisi ve promosyon yüklemeleri için tüm kullanıcıların ilk vadesiz
+hesabına aynı tutarı toplu olarak ekler. Vadesiz hesabı olmayan kullanıcılara yeni vadesiz hesap
+açılır. Her yükleme 'Yükleme' türünde bir işlem kaydıyla denetlenebilir şekilde kaydedilir.
+
+Kullanım:
+    python add_test_money.py                      # Herkese 10000 TL
+    python add_test_money.py 250 --aciklama "Promosyon"
+    python add_test_money.py 10000 --deneme       # Hiçbir şey yazmadan etkilenecek kayıtları göster
+    python add_test_money.py 10000 --parca 50000  # Parça (commit) başına kullanıcı sayısı
 """
-# Gerekli modelleri ve uygulamayı import et
-from app import app, db, User, Hesap
+# Uygulama fabrikasını ve gerekli servisleri import et
+from app import uygulama_olustur  # Uygulama fabrikası (web'e özgü parçalar olmadan)
+from modeller import tutar_coz
+from servisler import toplu_yukleme
+from decimal import Decimal  # Kuruş hassasiyetinde para hesabı için
+import argparse  # Komut satırı argümanları için
+import time  # Süre ölçümü için
 
-def add_test_money(amount=10000.0):
+def add_test_money(amount=Decimal('10000.00'), aciklama='Test Yüklemesi', parca_boyutu=10000, deneme=False):
     """
     Tüm kullanıcıların vadesiz hesaplarına para ekler
-    
+
     Args:
-        amount (float): Eklenecek para miktarı (varsayılan: 10000.0 TL)
+        amount (Decimal): Eklenecek para miktarı (varsayılan: 10000.00 TL)
+        aciklama (str): İşlem kayıtlarına yazılacak açıklama
+        parca_boyutu (int): Tek commit'te işlenecek kullanıcı sayısı
+        deneme (bool): True ise veritabanına yazmadan sadece sayar
     """
+    baslangic = time.perf_counter()
+
+    def ilerleme(ozet):
+        """Her parçadan sonra ilerlemeyi yazdırır"""
+        sure = time.perf_counter() - baslangic
+        print(f"  {ozet['kullanici']} kullanici islendi ({ozet['kullanici'] / sure:.0f} kullanici/sn)")
+
+    # İşlem bilgilerini yazdır
+    print(f"Her kullaniciya {amount:.2f} TL ekleniyor{' (DENEME - hicbir sey yazilmayacak)' if deneme else ''}...\n")
+
     # Uygulama bağlamı içinde çalış (veritabanı işlemleri için gerekli)
-    with app.app_context():
-        # Tüm kullanıcıları veritabanından al
-        users = User.query.all()
-        
-        # Kullanıcı kontrolü - Hiç kullanıcı yoksa işlemi durdur
-        if not users:
-            print("Hiç kullanıcı bulunamadı!")
-            return
-        
-        # İşlem bilgilerini yazdır
-        print(f"Toplam {len(users)} kullanıcı bulundu.")
-        print(f"Her kullanıcıya {amount:.2f} TL ekleniyor...\n")
-        
-        updated_count = 0  # Güncellenen kullanıcı sayacı
-        
-        # Her kullanıcı için işlem yap
-        for user in users:
-            # Her kullanıcının vadesiz hesaplarını bul
-            vadesiz_hesaplar = Hesap.query.filter_by(
-                kullanici_id=user.id,
-                hesap_turu='Vadesiz'
-            ).all()
-            
-            if vadesiz_hesaplar:
-                # Vadesiz hesap varsa - İlk vadesiz hesaba para ekle
-                hesap = vadesiz_hesaplar[0]  # İlk vadesiz hesabı al
-                eski_bakiye = hesap.bakiye  # Eski bakiyeyi kaydet
-                hesap.bakiye += amount  # Bakiyeye para ekle
-                
-                db.session.commit()  # Değişiklikleri kaydet
-                
-                # İşlem sonucunu yazdır
-                print(f"[OK] {user.ad} {user.soyad} ({user.tc_no})")
-                print(f"  Hesap: {hesap.hesap_no}")
-                print(f"  Eski bakiye: {eski_bakiye:.2f} TL -> Yeni bakiye: {hesap.bakiye:.2f} TL\n")
-                updated_count += 1  # Sayaç artır
-            else:
-                # Vadesiz hesap yoksa - Yeni vadesiz hesap oluştur
-                hesap_no = f"{user.tc_no}{user.id:05d}"[:16]  # Hesap numarası oluştur
-                yeni_hesap = Hesap(
-                    hesap_no=hesap_no,
-                    kullanici_id=user.id,
-                    bakiye=amount,  # Başlangıç bakiyesi olarak eklenen tutar
-                    hesap_turu='Vadesiz'
-                )
-                db.session.add(yeni_hesap)  # Yeni hesabı veritabanına ekle
-                db.session.commit()  # Değişiklikleri kaydet
-                
-                # İşlem sonucunu yazdır
-                print(f"[OK] {user.ad} {user.soyad} ({user.tc_no}) - YENI HESAP OLUSTURULDU")
-                print(f"  Hesap: {yeni_hesap.hesap_no}")
-                print(f"  Bakiye: {amount:.2f} TL\n")
-                updated_count += 1  # Sayaç artır
-        
-        # İşlem özetini yazdır
-        print(f"\n[Tamamlandi] Islem tamamlandi! {updated_count} kullaniciya para eklendi.")
+    with uygulama_olustur(web=False).app_context():
+        ozet = toplu_yukleme(amount, aciklama=aciklama, parca_boyutu=parca_boyutu, deneme=deneme, ilerleme=ilerleme)
+
+    # Kullanıcı kontrolü - Hiç kullanıcı yoksa bildir
+    if not ozet['kullanici']:
+        print("Hiç kullanıcı bulunamadı!")
+        return ozet
+
+    # İşlem özetini yazdır
+    sure = time.perf_counter() - baslangic
+    print(f"\n[{'Deneme' if deneme else 'Tamamlandi'}] {ozet['kullanici']} kullanici, "
+          f"{ozet['guncellenen_hesap']} mevcut hesap, {ozet['yeni_hesap']} yeni hesap, "
+          f"toplam {ozet['toplam_tutar']:.2f} TL ({sure:.1f} sn)")
+    return ozet
 
 # Script doğrudan çalıştırılıyorsa
 if __name__ == '__main__':
-    import sys  # Komut satırı argümanları için
-    
-    # Komut satırından miktar al (varsayılan 10.000 TL)
-    amount = 10000.0  # Varsayılan miktar
-    if len(sys.argv) > 1:  # Komut satırından miktar verilmişse
-        try:
-            amount = float(sys.argv[1])  # Argümanı float'a çevir
-        except ValueError:
-            # Geçersiz değer hatası
-            print("Geçersiz miktar! Sayısal değer giriniz.")
-            sys.exit(1)  # Programı hata ile sonlandır
-    
-    # Para ekleme fonksiyonunu çağır
-    add_test_money(amount)
+    ayristirici = argparse.ArgumentParser(description='Tüm kullanıcıların vadesiz hesaplarına toplu para yükler')
+    ayristirici.add_argument('miktar', nargs='?', default='10000.00', help='Eklenecek tutar (varsayılan: 10000 TL)')
+    ayristirici.add_argument('--aciklama', default='Test Yüklemesi', help='İşlem kayıtlarındaki açıklama')
+    ayristirici.add_argument('--parca', type=int, default=10000, help='Commit başına kullanıcı sayısı')
+    ayristirici.add_argument('--deneme', action='store_true', help='Veritabanına yazmadan etkilenecek kayıtları göster')
+    argumanlar = ayristirici.parse_args()
 
+    # Komut satırından alınan miktarı kuruş hassasiyetinde Decimal'e çevir
+    amount = tutar_coz(argumanlar.miktar)
+    if amount is None or amount <= 0:
+        # Geçersiz değer hatası
+        ayristirici.error("Geçersiz miktar! Pozitif sayısal değer giriniz.")
+
+    # Para ekleme fonksiyonunu çağır
+    add_test_money(amount, aciklama=argumanlar.aciklama, parca_boyutu=argumanlar.parca, deneme=argumanlar.deneme)
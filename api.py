@@ -0,0 +1,271 @@
+"""
+BetikBank JSON API (v1)
+Mobil istemciler ve POS için sürümlü JSON API'nin Blueprint'ini (api_v1) tanımlar.
+app.uygulama_olustur() web arayüzü istendiğinde Blueprint'i uygulamaya kaydeder.
+"""
+from flask import Blueprint, current_app, g, request, jsonify  # API route'ları için
+from datetime import datetime, timedelta  # Token süreleri için
+from functools import wraps  # Route dekoratörleri için
+import hashlib  # API token özetleri için
+import secrets  # Tahmin edilemeyen token'lar üretmek için
+from modeller import db, tutar_coz, Hesap, Kart, YatirimHesabi, ApiTokeni
+from servisler import (onbellek, TransferHatasi, IslemAnahtariCakismasi, transfer_yap, kart_harcamasi, islem_sayfasi, sozluk_listesi,
+                       islem_anahtari_gecerli_mi, GECERSIZ_ISLEM_ANAHTARI, dashboard_onbellegini_temizle,
+                       kullanici_getir, kimlik_dogrula)
+
+# ============================================
+# JSON API (v1)
+# ============================================
+
+# Mobil istemciler için sürümlü JSON API. Kimlik doğrulama 'Authorization: Bearer <token>'
+# başlığıyla yapılır (çerez oturumu kabul edilmez). Yanıtlar sadece gerekli kolonları seçen
+# sorgulardan üretilir; GET yanıtları ETag taşır ve If-None-Match eşleşirse 304 döner.
+
+api_v1 = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+def _token_ozeti(token):
+    """Token'ın veritabanında saklanan SHA-256 özetini döndürür"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _token_anahtari(ozet):
+    """Token çözümlemesinin önbellek anahtarını döndürür"""
+    return f'api_token:{ozet}'
+
+def api_hatasi(mesaj, durum):
+    """JSON hata yanıtı döndürür"""
+    yanit = jsonify({'hata': mesaj})
+    yanit.status_code = durum
+    if durum == 401:
+        yanit.headers['WWW-Authenticate'] = 'Bearer'
+    return yanit
+
+def api_yaniti(veri, durum=200):
+    """JSON yanıtı döndürür; GET isteklerinde gövdeden ETag üretir ve koşullu isteği yanıtlar"""
+    yanit = jsonify(veri)
+    yanit.status_code = durum
+    if request.method == 'GET':
+        yanit.add_etag()  # Gövdenin özeti
+        yanit.headers['Cache-Control'] = 'private, no-cache'  # İstemci her seferinde ETag ile doğrulasın
+        yanit = yanit.make_conditional(request)  # If-None-Match eşleşirse 304 ve boş gövde
+    return yanit
+
+def token_gerekli(fonksiyon):
+    """API route'larını Bearer token ile korur; token'ın kullanıcısını g.api_kullanici'ya koyar"""
+    @wraps(fonksiyon)
+    def sarmalayici(*args, **kwargs):
+        tur, _, token = request.headers.get('Authorization', '').partition(' ')
+        if tur.lower() != 'bearer' or not token:
+            return api_hatasi('Geçerli bir token gerekli.', 401)
+        
+        # Token -> (kullanıcı id, son kullanma) çözümlemesi önbellekte tutulur
+        ozet = _token_ozeti(token)
+        kayit = onbellek.getir(_token_anahtari(ozet))
+        if kayit is None:
+            kayit = db.session.execute(
+                db.select(ApiTokeni.kullanici_id, ApiTokeni.son_kullanma).where(ApiTokeni.token_ozeti == ozet)
+            ).first()
+            kayit = tuple(kayit) if kayit else (None, None)
+            onbellek.koy(_token_anahtari(ozet), kayit, sure=current_app.config['KULLANICI_ONBELLEK_SURESI'])
+        kullanici_id, son_kullanma = kayit
+        if kullanici_id is None or son_kullanma < datetime.utcnow():
+            return api_hatasi('Token geçersiz veya süresi dolmuş.', 401)
+        
+        g.api_kullanici = kullanici_getir(kullanici_id)
+        if g.api_kullanici is None:
+            return api_hatasi('Token geçersiz veya süresi dolmuş.', 401)
+        return fonksiyon(*args, **kwargs)
+    return sarmalayici
+
+# Kompakt serileştiriciler - Sadece istemcinin kullandığı kolonlar seçilir
+
+def _api_islem(satir):
+    """İşlem geçmişi satırını API biçimine çevirir"""
+    return {
+        'id': satir.id,
+        'tarih': satir.tarih.isoformat(),
+        'tutar': satir.tutar,
+        'aciklama': satir.aciklama,
+        'islem_turu': satir.islem_turu,
+        'gonderen_hesap_no': satir.gonderen_hesap_no,
+        'alici_hesap_no': satir.alici_hesap_no,
+        'gelen': bool(satir.gelen),
+        'bakiye_sonrasi': satir.bakiye_sonrasi,
+    }
+
+def _api_islem_sayfasi(hesap_idleri):
+    """adet, onceki ve sonraki parametreleriyle bir işlem sayfası döndürür"""
+    sayfa = islem_sayfasi(hesap_idleri)
+    return {
+        'islemler': [_api_islem(satir) for satir in sayfa['islemler']],
+        'sonraki': sayfa['sonraki_imlec'],
+        'onceki': sayfa['onceki_imlec'],
+    }
+
+# Token Al - TC Kimlik Numarası ve şifreyle yeni token oluşturur
+@api_v1.route('/token', methods=['POST'])
+def api_token_al():
+    """Kimlik bilgileri doğruysa yeni bir API token'ı döndürür (token sadece bu yanıtta görünür)"""
+    veri = request.get_json(silent=True)
+    veri = veri if isinstance(veri, dict) else {}
+    tc_no, sifre, ad = veri.get('tc_no'), veri.get('password'), veri.get('ad')
+    # Metin olmayan değerler (sayı, null, nesne) şifre doğrulamasına gönderilmez
+    if not (isinstance(tc_no, str) and tc_no and isinstance(sifre, str) and sifre):
+        return api_hatasi('TC Kimlik Numarası ve şifre boş olmayan metin olmalı.', 400)
+    if ad is not None and not isinstance(ad, str):
+        return api_hatasi('Geçersiz cihaz adı.', 400)
+    user = kimlik_dogrula(tc_no, sifre)
+    if not user:
+        return api_hatasi('TC Kimlik Numarası veya şifre hatalı.', 401)
+    
+    token = secrets.token_urlsafe(32)
+    son_kullanma = datetime.utcnow() + timedelta(days=current_app.config['API_TOKEN_SURESI_GUN'])
+    db.session.add(ApiTokeni(kullanici_id=user.id, token_ozeti=_token_ozeti(token),
+                             ad=(ad or '')[:100] or None, son_kullanma=son_kullanma))
+    db.session.commit()
+    return api_yaniti({'token': token, 'son_kullanma': son_kullanma.isoformat()}, 201)
+
+# Token Sil - Kullanılan token'ı iptal eder
+@api_v1.route('/token', methods=['DELETE'])
+@token_gerekli
+def api_token_sil():
+    """İstekte kullanılan token'ı iptal eder"""
+    ozet = _token_ozeti(request.headers['Authorization'].partition(' ')[2])
+    db.session.execute(db.delete(ApiTokeni).where(ApiTokeni.token_ozeti == ozet))
+    db.session.commit()
+    onbellek.sil(_token_anahtari(ozet))
+    return '', 204
+
+# Hesaplar
+@api_v1.route('/accounts')
+@token_gerekli
+def api_hesaplar():
+    """Kullanıcının banka hesaplarını döndürür"""
+    return api_yaniti({'hesaplar': sozluk_listesi(
+        db.select(Hesap.id, Hesap.hesap_no, Hesap.hesap_turu, Hesap.bakiye)
+        .where(Hesap.kullanici_id == g.api_kullanici.id).order_by(Hesap.id)
+    )})
+
+# Hesap İşlemleri - Sayfalı
+@api_v1.route('/accounts/<int:hesap_id>/transactions')
+@token_gerekli
+def api_hesap_islemleri(hesap_id):
+    """Bir hesabın işlem geçmişinden bir sayfa döndürür"""
+    if not g.api_kullanici.hesabi_mi(hesap_id):
+        return api_hatasi('Hesap bulunamadı.', 404)
+    return api_yaniti(_api_islem_sayfasi([hesap_id]))
+
+# Tüm İşlemler - Sayfalı
+@api_v1.route('/transactions')
+@token_gerekli
+def api_islemler():
+    """Kullanıcının tüm hesaplarının işlem geçmişinden bir sayfa döndürür"""
+    return api_yaniti(_api_islem_sayfasi(sorted(g.api_kullanici.hesap_idleri)))
+
+# Kartlar - CVV ve tam kart numarası döndürülmez
+@api_v1.route('/cards')
+@token_gerekli
+def api_kartlar():
+    """Kullanıcının kartlarını döndürür"""
+    kartlar = db.session.execute(
+        db.select(Kart.id, Kart.hesap_id, Kart.kart_turu, Kart.kart_no, Kart.son_kullanim_tarihi,
+                  Kart.kart_sahibi_adi, Kart.limit, Kart.kullanilan_limit, Kart.durum)
+        .where(Kart.kullanici_id == g.api_kullanici.id).order_by(Kart.created_at.desc())
+    ).mappings()
+    return api_yaniti({'kartlar': [
+        {**{alan: deger for alan, deger in kart.items() if alan != 'kart_no'}, 'kart_no_son4': kart['kart_no'][-4:]}
+        for kart in kartlar
+    ]})
+
+# Yatırım Hesapları
+@api_v1.route('/investments')
+@token_gerekli
+def api_yatirimlar():
+    """Kullanıcının yatırım hesaplarını döndürür"""
+    return api_yaniti({'yatirim_hesaplari': sozluk_listesi(
+        db.select(YatirimHesabi.id, YatirimHesabi.hesap_no, YatirimHesabi.yatirim_turu,
+                  YatirimHesabi.toplam_bakiye, YatirimHesabi.kar_zarar, YatirimHesabi.durum)
+        .where(YatirimHesabi.kullanici_id == g.api_kullanici.id).order_by(YatirimHesabi.created_at.desc())
+    )})
+
+# Para Transferi
+@api_v1.route('/transfers', methods=['POST'])
+@token_gerekli
+def api_transfer():
+    """Para transferi yapar - Idempotency-Key başlığıyla tekrar gönderilen istek ikinci kez uygulanmaz"""
+    veri = request.get_json(silent=True) or {}
+    tutar = tutar_coz(str(veri.get('tutar', '')))
+    gonderen_hesap_id = veri.get('gonderen_hesap_id')
+    anahtar = request.headers.get('Idempotency-Key')
+    if not islem_anahtari_gecerli_mi(anahtar):
+        return api_hatasi(GECERSIZ_ISLEM_ANAHTARI, 400)
+    if tutar is None:
+        return api_hatasi('Geçersiz transfer tutarı.', 400)
+    if not isinstance(gonderen_hesap_id, int) or not g.api_kullanici.hesabi_mi(gonderen_hesap_id):
+        return api_hatasi('Geçersiz gönderen hesap.', 400)
+    alici = db.session.execute(
+        db.select(Hesap.id, Hesap.kullanici_id).where(Hesap.hesap_no == veri.get('alici_hesap_no'))
+    ).first()
+    if alici is None:
+        return api_hatasi('Alıcı hesap bulunamadı.', 404)
+    
+    try:
+        islem, yeni_mi = transfer_yap(gonderen_hesap_id, alici.id, tutar, aciklama=veri.get('aciklama') or '',
+                                      kullanici_id=g.api_kullanici.id, anahtar=anahtar)
+    except TransferHatasi as hata:
+        return api_hatasi(str(hata), 422)
+    
+    dashboard_onbellegini_temizle(g.api_kullanici.id, alici.kullanici_id)  # Her iki tarafın bakiyesi değişti
+    return api_yaniti({
+        'islem': {
+            'id': islem.id,
+            'tarih': islem.tarih.isoformat(),
+            'tutar': islem.tutar,
+            'aciklama': islem.aciklama,
+            'islem_turu': islem.islem_turu,
+            'bakiye_sonrasi': islem.gonderen_bakiye_sonrasi,
+        },
+        'tekrar': not yeni_mi,  # True ise aynı anahtarla daha önce yapılmış işlem döndürüldü
+    }, 201 if yeni_mi else 200)
+
+def pos_token_gerekli(fonksiyon):
+    """POS (üye işyeri) route'larını POS_TOKEN ile korur; POS_TOKEN ayarlı değilse tüm istekler reddedilir"""
+    @wraps(fonksiyon)
+    def sarmalayici(*args, **kwargs):
+        token = current_app.config['POS_TOKEN']
+        if not token or not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return api_hatasi('Geçerli bir POS token\'ı gerekli.', 401)
+        return fonksiyon(*args, **kwargs)
+    return sarmalayici
+
+# Kart Yetkilendirme - POS'tan gelen harcama isteği
+@api_v1.route('/card-authorizations', methods=['POST'])
+@pos_token_gerekli
+def api_kart_yetkilendir():
+    """Kart harcamasını onaylar (201) veya reddeder (402) - Idempotency-Key ile tekrar gönderilen istek ikinci kez uygulanmaz (farklı istekse 409)"""
+    veri = request.get_json(silent=True) or {}
+    tutar = tutar_coz(str(veri.get('tutar', '')))
+    anahtar = request.headers.get('Idempotency-Key')
+    if not islem_anahtari_gecerli_mi(anahtar):
+        return api_hatasi(GECERSIZ_ISLEM_ANAHTARI, 400)
+    if tutar is None:
+        return api_hatasi('Geçersiz harcama tutarı.', 400)
+    kart_no, son_kullanim, cvv = (str(veri.get(alan) or '') for alan in ('kart_no', 'son_kullanim_tarihi', 'cvv'))
+    if not (kart_no.isdigit() and len(kart_no) == 16 and len(son_kullanim) == 5 and cvv.isdigit()):
+        return api_hatasi('Kart numarası, son kullanma tarihi (AA/YY) ve CVV gerekli.', 400)
+    
+    try:
+        islem, yeni_mi = kart_harcamasi(kart_no, son_kullanim, cvv, tutar,
+                                        aciklama=(veri.get('aciklama') or '')[:200],
+                                        anahtar=anahtar)
+    except IslemAnahtariCakismasi as hata:  # Anahtar bu kartta farklı bir harcamaya ait - Onaylanmaz
+        return api_yaniti({'onay': False, 'sebep': str(hata)}, 409)
+    except TransferHatasi as hata:
+        return api_yaniti({'onay': False, 'sebep': str(hata)}, 402)
+    
+    return api_yaniti({
+        'onay': True,
+        'islem_id': islem.id,
+        'tarih': islem.tarih.isoformat(),
+        'tutar': islem.tutar,
+        'tekrar': not yeni_mi,  # True ise aynı anahtarla daha önce onaylanmış harcama döndürüldü
+    }, 201 if yeni_mi else 200)
@@ -0,0 +1,81 @@
+"""
+BetikBank uygulama ayarları
+Uygulama yapılandırmasını ortam değişkenlerinden okur. Ayarlar modül import edilirken değil,
+her uygulama oluşturulurken (app.uygulama_olustur) okunur; böylece aynı süreçte farklı
+ayarlarla (ör. farklı veritabanlarıyla) birden fazla uygulama oluşturulabilir.
+"""
+import os  # Ortam değişkenleri için
+
+
+def veritabani_motor_ayarlari(uri):
+    """Ortam değişkenlerinden SQLAlchemy motor (bağlantı havuzu) ayarlarını oluşturur
+    
+    DB_POOL_SIZE, DB_MAX_OVERFLOW ve DB_POOL_TIMEOUT verilmezse SQLite için SQLAlchemy
+    varsayılanları, diğer veritabanları (PostgreSQL) için worker başına 10 + 20 bağlantı kullanılır.
+    """
+    ayarlar = {
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1',  # Kopmuş bağlantıları kullanmadan önce yakala
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # Bağlantıları bu kadar saniyede bir yenile
+    }
+    varsayilanlar = {} if uri.startswith('sqlite') else {'DB_POOL_SIZE': 10, 'DB_MAX_OVERFLOW': 20}
+    for ortam_degiskeni, ayar in (('DB_POOL_SIZE', 'pool_size'), ('DB_MAX_OVERFLOW', 'max_overflow'),
+                                  ('DB_POOL_TIMEOUT', 'pool_timeout')):
+        deger = os.environ.get(ortam_degiskeni, varsayilanlar.get(ortam_degiskeni))
+        if deger is not None:
+            ayarlar[ayar] = int(deger)
+    return ayarlar
+
+
+def veritabani_adresi_duzelt(uri):
+    """Bazı servislerin verdiği eski 'postgres://' şema adını SQLAlchemy'nin beklediği adla değiştirir"""
+    if uri.startswith('postgres://'):
+        return 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def ayarlari_oku():
+    """Ortam değişkenlerinden (verilmeyenler için varsayılanlardan) uygulama ayarlarını döndürür"""
+    # Veritabanı adresi - DATABASE_URL ile değiştirilebilir (ör. PostgreSQL, bkz. README)
+    veritabani_uri = veritabani_adresi_duzelt(os.environ.get('DATABASE_URL', 'sqlite:///betikbank.db'))
+
+    ayarlar = {}
+    ayarlar['SECRET_KEY'] = 'betikbank-secret-key-change-in-production'  # Session ve CSRF koruması için gizli anahtar
+    ayarlar['SQLALCHEMY_DATABASE_URI'] = veritabani_uri  # Veritabanı bağlantı adresi (varsayılan: SQLite)
+    ayarlar['SQLALCHEMY_ENGINE_OPTIONS'] = veritabani_motor_ayarlari(veritabani_uri)  # Bağlantı havuzu ayarları
+    ayarlar['SQLITE_BEKLEME_SURESI_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))  # Kilitli veritabanında bekleme süresi
+    ayarlar['SQLALCHEMY_TRACK_MODIFICATIONS'] = False  # Performans için modifikasyon takibini kapat
+    ayarlar['ISLEM_SAYFA_BOYUTU'] = int(os.environ.get('ISLEM_SAYFA_BOYUTU', 50))  # İşlem geçmişinde sayfa başına satır
+    ayarlar['ISLEM_SAYFA_BOYUTU_MAKS'] = 500  # ?adet= parametresiyle istenebilecek en büyük sayfa
+    ayarlar['EKSTRE_PARCA_BOYUTU'] = 1000  # Ekstre dışa aktarımında veritabanından tek seferde okunan satır
+    ayarlar['ONBELLEK_TURU'] = os.environ.get('ONBELLEK_TURU', 'bellek')  # 'bellek' (süreç içi) veya 'redis'
+    ayarlar['ONBELLEK_REDIS_URL'] = os.environ.get('ONBELLEK_REDIS_URL', 'redis://localhost:6379/0')  # Redis adresi
+    ayarlar['ONBELLEK_BOYUTU'] = int(os.environ.get('ONBELLEK_BOYUTU', 10000))  # Süreç içi önbellekte en fazla kayıt
+    ayarlar['ONBELLEK_SURESI'] = int(os.environ.get('ONBELLEK_SURESI', 60))  # Kayıtların varsayılan ömrü (saniye)
+    ayarlar['SIFRE_HASH_YONTEMI'] = os.environ.get('SIFRE_HASH_YONTEMI', 'scrypt')  # Werkzeug yöntemi ve maliyeti (ör. 'pbkdf2:sha256:600000')
+    ayarlar['SIFRE_HAVUZ_TURU'] = os.environ.get('SIFRE_HAVUZ_TURU', 'yok')  # Şifre doğrulama havuzu: 'yok', 'thread' veya 'process'
+    ayarlar['SIFRE_HAVUZ_BOYUTU'] = int(os.environ.get('SIFRE_HAVUZ_BOYUTU', 0)) or None  # Aynı anda en fazla hash hesabı (varsayılan: CPU sayısı)
+    ayarlar['ANALIZ_ONBELLEK_SURESI'] = int(os.environ.get('ANALIZ_ONBELLEK_SURESI', 86400))  # Geçmiş ay analizlerinin önbellek ömrü (saniye)
+    ayarlar['API_TOKEN_SURESI_GUN'] = int(os.environ.get('API_TOKEN_SURESI_GUN', 30))  # API token'larının geçerlilik süresi (gün)
+    ayarlar['KART_IIN'] = os.environ.get('KART_IIN', '979231')  # Kart numaralarının 6 haneli kurum (BIN/IIN) öneki
+    ayarlar['NUMARA_BLOK_BOYUTU'] = int(os.environ.get('NUMARA_BLOK_BOYUTU', 100))  # Her worker'ın tek seferde ayırdığı numara sayısı
+    ayarlar['OLAY_AZAMI_DENEME'] = int(os.environ.get('OLAY_AZAMI_DENEME', 8))  # Bir olayın teslim edilmesi için en fazla deneme
+    ayarlar['OLAY_TEKRAR_BEKLEME'] = int(os.environ.get('OLAY_TEKRAR_BEKLEME', 30))  # İlk yeniden denemeden önce bekleme (saniye, her denemede iki katı)
+    ayarlar['OLAY_KIRA_SURESI'] = int(os.environ.get('OLAY_KIRA_SURESI', 300))  # Sahiplenilen olay bu süre içinde bitmezse başka worker alabilir
+    ayarlar['OLAY_SAKLAMA_GUN'] = int(os.environ.get('OLAY_SAKLAMA_GUN', 7))  # Teslim edilmiş olayların saklanma süresi (gün)
+    ayarlar['OLAY_DEFTER_DOSYASI'] = os.environ.get('OLAY_DEFTER_DOSYASI')  # Verilirse para hareketi olayları bu dosyaya JSON satırı olarak yazılır
+    ayarlar['OLCUM_ACIK'] = os.environ.get('OLCUM_ACIK', '0') == '1'  # İstek ölçümleri, /metrics ve Server-Timing başlıkları
+    ayarlar['OLCUM_TOKEN'] = os.environ.get('OLCUM_TOKEN')  # Verilirse /metrics 'Authorization: Bearer <token>' ister
+    ayarlar['YAVAS_SORGU_MS'] = float(os.environ.get('YAVAS_SORGU_MS', 100))  # Bu süreyi aşan sorgular parametreleriyle loglanır (0: kapalı)
+    ayarlar['ISLEM_ARSIV_AY'] = int(os.environ.get('ISLEM_ARSIV_AY', 12))  # İçinde bulunulan aya ek olarak islem tablosunda tutulan ay sayısı
+    ayarlar['DOLANDIRICILIK_KONTROLU'] = os.environ.get('DOLANDIRICILIK_KONTROLU', '1') == '1'  # Transferlerde hız/limit kuralları
+    ayarlar['DOLANDIRICILIK_KURALLARI'] = os.environ.get('DOLANDIRICILIK_KURALLARI')  # Kurallar (JSON, bkz. dolandiricilik.py); boşsa varsayılanlar
+    ayarlar['DOLANDIRICILIK_TAZELEME_SURESI'] = float(os.environ.get('DOLANDIRICILIK_TAZELEME_SURESI', 5))  # Diğer worker'ların işlemlerini sayaçlara ekleme aralığı (0: kapalı)
+    ayarlar['TALIMAT_AZAMI_DENEME'] = int(os.environ.get('TALIMAT_AZAMI_DENEME', 3))  # Bakiye yetersizse bir talimatın deneme sayısı
+    ayarlar['TALIMAT_TEKRAR_BEKLEME'] = int(os.environ.get('TALIMAT_TEKRAR_BEKLEME', 3600))  # Başarısız talimatın yeniden denenme aralığı (saniye)
+    ayarlar['TALIMAT_KIRA_SURESI'] = int(os.environ.get('TALIMAT_KIRA_SURESI', 300))  # Sahiplenilen talimatların bitirilmesi gereken süre (saniye)
+    ayarlar['POS_TOKEN'] = os.environ.get('POS_TOKEN')  # Kart yetkilendirme API'sinin istediği 'Authorization: Bearer <token>' (yoksa kapalı)
+    ayarlar['KART_ONBELLEK_SURESI'] = int(os.environ.get('KART_ONBELLEK_SURESI', 300))  # Kart durumunun önbellek ömrü (saniye)
+    ayarlar['KART_HATALI_DENEME_SINIRI'] = int(os.environ.get('KART_HATALI_DENEME_SINIRI', 5))  # Bu kadar hatalı CVV/tarih sonrası kart geçici kapanır
+    ayarlar['KART_HATALI_DENEME_SURESI'] = int(os.environ.get('KART_HATALI_DENEME_SURESI', 900))  # Hatalı denemelerin sayıldığı süre (saniye)
+    ayarlar['KULLANICI_ONBELLEK_SURESI'] = int(os.environ.get('KULLANICI_ONBELLEK_SURESI', 30))  # Oturum kullanıcısının önbellek ömrü (saniye)
+    return ayarlar
@@ -0,0 +1,272 @@
+"""
+Performans benchmark scripti
+Bu script, ayrı bir benchmark veritabanına toplu insert ile sentetik veri (kullanıcı, hesap,
+işlem) yükler ve temel bankacılık akışlarını (/login, /dashboard, /transfer, /transactions,
+/account/<id>) Flask test istemcisiyle çalıştırır. Her route için p50/p95/p99 gecikme,
+saniyedeki istek sayısı ve istek başına SQL sorgu sayısını raporlar ve sonuçları JSON olarak
+kaydeder. Önceki bir sonuç dosyası verilirse p95 gecikme ve en fazla sorgu sayısındaki gerilemeleri
+gösterir (gerileme varsa çıkış kodu 1 olur, CI'da kullanılabilir).
+
+Kullanım:
+    python benchmark.py
+    python benchmark.py --kullanici 5000 --hesap 8000 --islem 500000 --tekrar 200
+    python benchmark.py --veri-yukleme  # Mevcut benchmark verisini kullan, yeniden yükleme
+    python benchmark.py --cikti yeni.json --karsilastir onceki.json --esik 20
+"""
+import argparse  # Komut satırı argümanları için
+import json  # Sonuçları dosyaya yazmak için
+import os  # Ortam değişkenleri için
+import platform  # Sonuç dosyasına ortam bilgisi eklemek için
+import random  # Sentetik veri ve istek karışımı için
+import sqlite3  # Sonuç dosyasına SQLite sürümünü eklemek için
+import sys  # Çıkış kodu için
+import threading  # Eşzamanlı istemciler için
+import time  # Süre ölçümü için
+from datetime import datetime, timedelta  # Sentetik işlem tarihleri için
+from decimal import Decimal  # Kuruş hassasiyetinde para hesabı için
+from sqlalchemy import event  # SQL sorgularını saymak için
+from app import uygulama_olustur  # Uygulama fabrikası
+from modeller import db, User, Hesap, Islem  # Veritabanı modelleri
+from sema import veritabani_hazirla  # Şema kurulumu
+from servisler import sifre_hashleyici  # Benchmark kullanıcılarının şifre hash'i için
+
+BENCHMARK_SIFRESI = 'benchmark123'  # Tüm sentetik kullanıcıların şifresi
+ROUTELAR = ['login', 'dashboard', 'transfer', 'transactions', 'account']  # Ölçülen akışlar
+
+
+def argumanlari_oku():
+    """Komut satırı argümanlarını okur"""
+    ayristirici = argparse.ArgumentParser(description='BetikBank temel akışlarının performansını ölçer')
+    ayristirici.add_argument('--veritabani', default='sqlite:///betikbank_benchmark.db',
+                             help='Benchmark veritabanı (DİKKAT: veri yüklenirken tablolar silinir)')
+    ayristirici.add_argument('--kullanici', type=int, default=1000, help='Sentetik kullanıcı sayısı (N)')
+    ayristirici.add_argument('--hesap', type=int, default=2000, help='Sentetik hesap sayısı (M, en az N)')
+    ayristirici.add_argument('--islem', type=int, default=100000, help='Sentetik işlem sayısı (K)')
+    ayristirici.add_argument('--veri-yukleme', dest='veri_yukle', action='store_false',
+                             help='Veri yükleme adımını atla, mevcut benchmark verisini kullan')
+    ayristirici.add_argument('--istemci', type=int, default=20, help='Oturum açan sanal kullanıcı sayısı')
+    ayristirici.add_argument('--tekrar', type=int, default=50, help='Her istemcinin akış tekrar sayısı')
+    ayristirici.add_argument('--eszamanli', type=int, default=1, help='Aynı anda çalışan istemci thread sayısı')
+    ayristirici.add_argument('--tohum', type=int, default=42, help='Rastgele sayı tohumu (tekrarlanabilir çalıştırma)')
+    ayristirici.add_argument('--cikti', default='benchmark_sonuc.json', help='Sonuçların yazılacağı JSON dosyası')
+    ayristirici.add_argument('--karsilastir', help='Karşılaştırılacak önceki sonuç dosyası')
+    ayristirici.add_argument('--esik', type=float, default=20.0, help='Gerileme sayılacak p95 artışı (yüzde)')
+    return ayristirici.parse_args()
+
+
+# Benchmark kendi veritabanıyla ayrı bir uygulama oluşturur (ortam değişkenleri değiştirilmez)
+argumanlar = argumanlari_oku()
+app = uygulama_olustur({
+    'SQLALCHEMY_DATABASE_URI': argumanlar.veritabani,
+    # Hız kuralları değerlendirilsin (maliyeti ölçülsün) ama aynı hesaptan tekrarlanan transferleri engellemesin
+    'DOLANDIRICILIK_KURALLARI': os.environ.get('DOLANDIRICILIK_KURALLARI')
+                                or '[{"ad": "benchmark", "pencere": 86400, "adet": 1000000000}]',
+})
+
+
+# ============================================
+# SENTETİK VERİ
+# ============================================
+
+def veri_yukle(kullanici_sayisi, hesap_sayisi, islem_sayisi, parca=10000):
+    """Tabloları sıfırlar ve sentetik veriyi toplu insert'lerle yükler"""
+    baslangic = time.perf_counter()
+    db.drop_all()
+    veritabani_hazirla()
+
+    # Kullanıcılar - Şifre hash'i bir kez hesaplanır (hepsinin şifresi aynı)
+    sifre_hash = sifre_hashleyici.hashle(BENCHMARK_SIFRESI)
+    kullanicilar = [
+        dict(id=i, tc_no=f'{10000000000 + i}', ad=f'Ad{i}', soyad=f'Soyad{i}', email=f'kullanici{i}@benchmark.local',
+             telefon='05000000000', password_hash=sifre_hash)
+        for i in range(1, kullanici_sayisi + 1)
+    ]
+    for grup in range(0, len(kullanicilar), parca):
+        db.session.execute(db.insert(User), kullanicilar[grup:grup + parca])
+
+    # Hesaplar - Her kullanıcının en az bir vadesiz hesabı olur, kalanlar rastgele dağıtılır
+    sahipler = list(range(1, kullanici_sayisi + 1)) + [random.randint(1, kullanici_sayisi)
+                                                      for _ in range(hesap_sayisi - kullanici_sayisi)]
+    bakiyeler = {hesap_id: Decimal('100000.00') for hesap_id in range(1, len(sahipler) + 1)}
+
+    # İşlemler - Tarihe göre sıralı üretilir; bakiye-sonrası değerleri yürüyen bakiyeden hesaplanır
+    simdi = datetime.utcnow()
+    tarihler = sorted(simdi - timedelta(seconds=random.randint(60, 90 * 86400)) for _ in range(islem_sayisi))
+    islemler = []
+    for tarih in tarihler:
+        gonderen, alici = random.sample(range(1, len(sahipler) + 1), 2)
+        tutar = Decimal(random.randint(100, 50000)).scaleb(-2)  # 1.00 - 500.00 TL
+        bakiyeler[gonderen] -= tutar
+        bakiyeler[alici] += tutar
+        islemler.append(dict(gonderen_hesap_id=gonderen, alici_hesap_id=alici, tutar=tutar, aciklama='Benchmark',
+                             islem_turu='Transfer', tarih=tarih, gonderen_bakiye_sonrasi=bakiyeler[gonderen],
+                             alici_bakiye_sonrasi=bakiyeler[alici]))
+
+    hesaplar = [
+        dict(id=hesap_id, hesap_no=f'5{hesap_id:015d}', kullanici_id=sahip, bakiye=bakiyeler[hesap_id],
+             hesap_turu='Vadesiz' if hesap_id <= kullanici_sayisi else 'Vadeli')
+        for hesap_id, sahip in enumerate(sahipler, start=1)
+    ]
+    for grup in range(0, len(hesaplar), parca):
+        db.session.execute(db.insert(Hesap), hesaplar[grup:grup + parca])
+    for grup in range(0, len(islemler), parca):
+        db.session.execute(db.insert(Islem), islemler[grup:grup + parca])
+    db.session.commit()
+
+    sure = time.perf_counter() - baslangic
+    print(f"Veri yuklendi: {kullanici_sayisi} kullanici, {len(hesaplar)} hesap, {islem_sayisi} islem ({sure:.1f} sn)")
+
+
+# ============================================
+# İSTEK ÖLÇÜMÜ
+# ============================================
+
+_sayac = threading.local()  # Her thread kendi isteğinin SQL sorgularını sayar
+
+
+def _sorgu_say(*_):
+    """Her SQL sorgusunda çağrılır"""
+    _sayac.adet = getattr(_sayac, 'adet', 0) + 1
+
+
+def olc(olcumler, route, istek):
+    """İsteği çalıştırır; süresini ve sorgu sayısını route'un ölçümlerine ekler"""
+    _sayac.adet = 0
+    baslangic = time.perf_counter()
+    yanit = istek()
+    sure = time.perf_counter() - baslangic
+    olcumler[route].append((sure, _sayac.adet, yanit.status_code))
+    return yanit
+
+
+def istemci_calistir(kullanici_id, hesap_sayisi, tekrar, olcumler, kilit):
+    """Bir sanal kullanıcı: giriş yapar ve akışları 'tekrar' kez çalıştırır"""
+    yerel = {route: [] for route in ROUTELAR}
+    istemci = app.test_client()
+    olc(yerel, 'login', lambda: istemci.post('/login', data={'tc_no': f'{10000000000 + kullanici_id}',
+                                                            'password': BENCHMARK_SIFRESI}))
+    with app.app_context():
+        hesap_idleri = db.session.scalars(db.select(Hesap.id).where(Hesap.kullanici_id == kullanici_id)).all()
+
+    for adim in range(tekrar):
+        hesap_id = random.choice(hesap_idleri)
+        alici_no = f'5{random.randint(1, hesap_sayisi):015d}'
+        olc(yerel, 'dashboard', lambda: istemci.get('/dashboard'))
+        olc(yerel, 'transactions', lambda: istemci.get('/transactions'))
+        olc(yerel, 'account', lambda: istemci.get(f'/account/{hesap_id}'))
+        olc(yerel, 'transfer', lambda: istemci.post('/transfer', data={
+            'gonderen_hesap': hesap_id, 'alici_hesap_no': alici_no, 'tutar': '1.00',
+            'aciklama': 'Benchmark', 'islem_anahtari': f'bench-{kullanici_id}-{adim}-{time.time_ns()}'}))
+
+    with kilit:
+        for route, degerler in yerel.items():
+            olcumler[route].extend(degerler)
+
+
+def yuzdelik(sirali, oran):
+    """Sıralı listede verilen yüzdeliği (en yakın sıra yöntemiyle) döndürür"""
+    return sirali[min(len(sirali) - 1, max(0, round(oran / 100 * len(sirali)) - 1))]
+
+
+def ozetle(olcumler, toplam_sure):
+    """Route bazında gecikme, istek/sn ve sorgu sayısı özetini çıkarır"""
+    ozet = {}
+    for route in ROUTELAR:
+        degerler = olcumler[route]
+        if not degerler:
+            continue
+        sureler = sorted(sure for sure, _, _ in degerler)
+        ozet[route] = {
+            'istek': len(degerler),
+            'p50_ms': round(yuzdelik(sureler, 50) * 1000, 2),
+            'p95_ms': round(yuzdelik(sureler, 95) * 1000, 2),
+            'p99_ms': round(yuzdelik(sureler, 99) * 1000, 2),
+            'istek_saniye': round(len(degerler) / sum(sureler), 1),  # Route'un tek başına kapasitesi
+            'sorgu_ortalama': round(sum(adet for _, adet, _ in degerler) / len(degerler), 2),
+            'sorgu_en_fazla': max(adet for _, adet, _ in degerler),
+            'hata': sum(1 for _, _, durum in degerler if durum >= 400),
+        }
+    toplam_istek = sum(len(degerler) for degerler in olcumler.values())
+    return {'routelar': ozet, 'toplam_istek': toplam_istek, 'toplam_sure_sn': round(toplam_sure, 2),
+            'istek_saniye': round(toplam_istek / toplam_sure, 1)}
+
+
+def karsilastir(simdiki, onceki, esik):
+    """Önceki sonuçla karşılaştırır; gerileme varsa True döndürür"""
+    gerileme = False
+    print(f"\nKarsilastirma (esik: p95 +%{esik:g}):")
+    for route, deger in simdiki['routelar'].items():
+        eski = onceki['routelar'].get(route)
+        if not eski:
+            continue
+        p95_degisim = (deger['p95_ms'] - eski['p95_ms']) / eski['p95_ms'] * 100 if eski['p95_ms'] else 0
+        sorgu_artti = deger['sorgu_en_fazla'] > eski['sorgu_en_fazla']  # Ortalama önbellek isabetine göre oynar
+        kotu = p95_degisim > esik or sorgu_artti
+        gerileme = gerileme or kotu
+        print(f"  {route:<13} p95 {eski['p95_ms']:>8} -> {deger['p95_ms']:>8} ms ({p95_degisim:+.1f}%)  "
+              f"en fazla sorgu {eski['sorgu_en_fazla']} -> {deger['sorgu_en_fazla']}  {'GERILEME' if kotu else 'ok'}")
+    return gerileme
+
+
+# Script doğrudan çalıştırılıyorsa
+if __name__ == '__main__':
+    random.seed(argumanlar.tohum)
+    if argumanlar.hesap < argumanlar.kullanici:
+        print("Hesap sayisi kullanici sayisindan az olamaz!")
+        sys.exit(1)
+
+    with app.app_context():
+        if argumanlar.veri_yukle:
+            veri_yukle(argumanlar.kullanici, argumanlar.hesap, argumanlar.islem)
+        hesap_sayisi = db.session.query(db.func.max(Hesap.id)).scalar() or 0
+        kullanici_sayisi = db.session.query(db.func.count(User.id)).scalar()
+        event.listen(db.engine, 'before_cursor_execute', _sorgu_say)
+
+    # Sanal kullanıcılar - Eşzamanlı thread'ler sırayla istemci alır
+    secilenler = random.sample(range(1, kullanici_sayisi + 1), min(argumanlar.istemci, kullanici_sayisi))
+    olcumler = {route: [] for route in ROUTELAR}
+    kilit = threading.Lock()
+    kuyruk = list(secilenler)
+
+    def calisan():
+        while True:
+            with kilit:
+                if not kuyruk:
+                    return
+                kullanici_id = kuyruk.pop()
+            istemci_calistir(kullanici_id, hesap_sayisi, argumanlar.tekrar, olcumler, kilit)
+
+    print(f"{len(secilenler)} istemci x {argumanlar.tekrar} tekrar, {argumanlar.eszamanli} eszamanli...")
+    baslangic = time.perf_counter()
+    thread_listesi = [threading.Thread(target=calisan) for _ in range(argumanlar.eszamanli)]
+    for thread in thread_listesi:
+        thread.start()
+    for thread in thread_listesi:
+        thread.join()
+    sonuc = ozetle(olcumler, time.perf_counter() - baslangic)
+
+    # Sonuç tablosu
+    print(f"\n{'Route':<13} {'istek':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'istek/sn':>9} {'sorgu':>6} {'hata':>5}")
+    for route, deger in sonuc['routelar'].items():
+        print(f"{route:<13} {deger['istek']:>6} {deger['p50_ms']:>9} {deger['p95_ms']:>9} {deger['p99_ms']:>9} "
+              f"{deger['istek_saniye']:>9} {deger['sorgu_ortalama']:>6} {deger['hata']:>5}")
+    print(f"Toplam: {sonuc['toplam_istek']} istek, {sonuc['toplam_sure_sn']} sn, {sonuc['istek_saniye']} istek/sn")
+
+    # Sonuç dosyası - Ayarlar ve ortam bilgisiyle birlikte (farklı çalıştırmalar karşılaştırılabilsin)
+    sonuc['ayarlar'] = {anahtar: deger for anahtar, deger in vars(argumanlar).items() if anahtar not in ('cikti', 'karsilastir')}
+    sonuc['ortam'] = {
+        'tarih': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sqlite': sqlite3.sqlite_version,
+        'sifre_hash_yontemi': app.config['SIFRE_HASH_YONTEMI'],
+        'onbellek_turu': app.config['ONBELLEK_TURU'],
+    }
+    with open(argumanlar.cikti, 'w', encoding='utf-8') as dosya:
+        json.dump(sonuc, dosya, ensure_ascii=False, indent=2)
+    print(f"[Tamamlandi] Sonuclar {argumanlar.cikti} dosyasina yazildi.")
+
+    if argumanlar.karsilastir:
+        with open(argumanlar.karsilastir, encoding='utf-8') as dosya:
+            if karsilastir(sonuc, json.load(dosya), argumanlar.esik):
+                sys.exit(1)
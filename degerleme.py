@@ -0,0 +1,202 @@
+"""
+BetikBank yatırım değerleme motoru
+Yatırım hesaplarının pozisyonlarını (enstrüman, miktar, maliyet) enstrüman bazında dizilerde
+tutar ve her fiyat değişiminde sadece o enstrümanın pozisyonlarının değerini ve kar/zararını
+toplu olarak yeniden hesaplar. NumPy kuruluysa hesap vektörel yapılır; değilse aynı sonuçlar
+saf Python ile üretilir.
+
+Tutarlar kuruş cinsinden tam sayı, miktarlar float olarak tutulur.
+
+Fiyat akışları şu arayüzü sağlar:
+    fiyatlar()  -> (enstrüman, fiyat) çiftleri üreten iterator (fiyat: 1 birimin TL değeri)
+"""
+import csv  # Fiyat dosyasını okumak için
+import math  # Simülatördeki rastgele yürüyüş için
+import random  # Simülatördeki fiyat hareketleri için
+import time  # Simülatör tick aralığı için
+
+# Yatırım türü -> enstrüman kodu
+ENSTRUMANLAR = {
+    'Döviz': 'USDTRY',
+    'Altın': 'XAUTRY',
+    'Borsa': 'BIST100',
+    'Yatırım Fonu': 'FON',
+    'Kripto Para': 'BTCTRY',
+}
+
+# Hiç fiyat gelmemiş enstrümanlar için başlangıç fiyatları (TL)
+VARSAYILAN_FIYATLAR = {
+    'USDTRY': 34.0,
+    'XAUTRY': 2900.0,
+    'BIST100': 9500.0,
+    'FON': 1.0,
+    'BTCTRY': 2200000.0,
+}
+
+
+def numpy_yukle():
+    """NumPy kuruluysa modülü, değilse None döndürür"""
+    try:
+        import numpy  # Opsiyonel bağımlılık - Sadece vektörel hesap için gerekli
+    except ImportError:
+        return None
+    return numpy
+
+
+class DosyaFiyatAkisi:
+    """'enstruman,fiyat' satırlarından oluşan CSV dosyasındaki fiyatları sırayla veren akış
+
+    Başlık satırı varsa atlanır; ek kolonlar (ör. zaman) yok sayılır.
+    """
+
+    def __init__(self, yol):
+        self.yol = yol
+
+    def fiyatlar(self):
+        """Dosyadaki (enstrüman, fiyat) çiftlerini sırayla üretir"""
+        with open(self.yol, newline='', encoding='utf-8') as dosya:
+            for satir in csv.reader(dosya):
+                if len(satir) < 2:
+                    continue
+                try:
+                    yield satir[0].strip(), float(satir[1])
+                except ValueError:
+                    continue  # Başlık veya bozuk satır
+
+
+class SimulatorFiyatAkisi:
+    """Enstrüman fiyatlarını rastgele yürüyüşle (geometrik Brown hareketi) üreten süreç içi akış"""
+
+    def __init__(self, baslangic_fiyatlari=None, oynaklik=0.002, aralik=1.0, tohum=None, adet=None):
+        self.fiyat = dict(baslangic_fiyatlari or VARSAYILAN_FIYATLAR)
+        self.oynaklik = oynaklik  # Tick başına standart sapma (oran)
+        self.aralik = aralik  # Tick'ler arası bekleme (saniye)
+        self.adet = adet  # Üretilecek tick sayısı (None: sınırsız)
+        self._rastgele = random.Random(tohum)
+
+    def fiyatlar(self):
+        """Her tick'te rastgele bir enstrümanın yeni fiyatını üretir"""
+        uretilen = 0
+        while self.adet is None or uretilen < self.adet:
+            enstruman = self._rastgele.choice(sorted(self.fiyat))
+            self.fiyat[enstruman] *= math.exp(self._rastgele.gauss(0, self.oynaklik))
+            yield enstruman, self.fiyat[enstruman]
+            uretilen += 1
+            if self.aralik:
+                time.sleep(self.aralik)
+
+
+class _Pozisyonlar:
+    """Bir enstrümanın pozisyon dizileri (NumPy dizisi veya liste)"""
+
+    def __init__(self, np):
+        self.np = np
+        if np is not None:
+            self.idler = np.empty(0, dtype=np.int64)
+            self.miktar = np.empty(0, dtype=np.float64)
+            self.maliyet = np.empty(0, dtype=np.int64)  # Kuruş
+            self.deger = np.empty(0, dtype=np.int64)  # Kuruş
+        else:
+            self.idler, self.miktar, self.maliyet, self.deger = [], [], [], []
+
+    def ekle(self, idler, miktarlar, maliyetler, fiyat):
+        """Yeni pozisyonları dizilerin sonuna ekler ve verilen fiyatla değerler"""
+        if self.np is not None:
+            np = self.np
+            miktarlar = np.asarray(miktarlar, dtype=np.float64)
+            self.idler = np.concatenate((self.idler, np.asarray(idler, dtype=np.int64)))
+            self.miktar = np.concatenate((self.miktar, miktarlar))
+            self.maliyet = np.concatenate((self.maliyet, np.asarray(maliyetler, dtype=np.int64)))
+            self.deger = np.concatenate((self.deger, np.rint(miktarlar * (fiyat * 100)).astype(np.int64)))
+        else:
+            self.idler.extend(idler)
+            self.miktar.extend(miktarlar)
+            self.maliyet.extend(maliyetler)
+            self.deger.extend(round(miktar * fiyat * 100) for miktar in miktarlar)
+
+    def degerle(self, fiyat):
+        """Tüm pozisyonların kuruş cinsinden değerini yeni fiyatla yeniden hesaplar"""
+        if self.np is not None:
+            self.deger = self.np.rint(self.miktar * (fiyat * 100)).astype(self.np.int64)
+        else:
+            kurus = fiyat * 100
+            self.deger = [round(miktar * kurus) for miktar in self.miktar]
+
+    def kar_zarar(self):
+        """Değer - maliyet (kuruş)"""
+        if self.np is not None:
+            return self.deger - self.maliyet
+        return [deger - maliyet for deger, maliyet in zip(self.deger, self.maliyet)]
+
+    def toplam(self):
+        """Pozisyonların toplam değeri (kuruş)"""
+        return int(self.deger.sum()) if self.np is not None else sum(self.deger)
+
+    def __len__(self):
+        return len(self.idler)
+
+
+class DegerlemeMotoru:
+    """Enstrüman bazında pozisyonları tutan ve fiyat tick'lerinde artımlı değerleme yapan motor
+
+    fiyat_guncelle() sadece fiyatı değişen enstrümanın pozisyonlarını yeniden değerler ve onu
+    'değişti' olarak işaretler; degisenler() son çağrıdan beri değişen enstrümanların
+    (id, değer, kar/zarar) dizilerini bir kez döndürür. Böylece veritabanına yazma tick
+    sıklığından bağımsız, toplu ve seyrek yapılabilir.
+    """
+
+    def __init__(self, fiyatlar=None, vektorel=None):
+        self.np = numpy_yukle() if vektorel is not False else None
+        if vektorel and self.np is None:
+            raise RuntimeError('Vektörel değerleme için numpy kurulu olmalı (pip install numpy).')
+        self.fiyat = dict(VARSAYILAN_FIYATLAR)
+        self.fiyat.update(fiyatlar or {})
+        self._pozisyonlar = {}  # Enstrüman -> _Pozisyonlar
+        self._degisen = set()  # Son degisenler() çağrısından beri değeri değişen enstrümanlar
+
+    @property
+    def vektorel(self):
+        """Hesaplar NumPy ile mi yapılıyor?"""
+        return self.np is not None
+
+    def _portfoy(self, enstruman):
+        """Enstrümanın pozisyon dizilerini döndürür (yoksa oluşturur)"""
+        if enstruman not in self._pozisyonlar:
+            self._pozisyonlar[enstruman] = _Pozisyonlar(self.np)
+        return self._pozisyonlar[enstruman]
+
+    def pozisyon_ekle(self, enstruman, idler, miktarlar, maliyetler):
+        """Bir enstrümanın pozisyonlarını (aynı uzunlukta diziler; maliyet kuruş) ekler"""
+        if len(idler):
+            self._portfoy(enstruman).ekle(idler, miktarlar, maliyetler, self.fiyat_getir(enstruman))
+            self._degisen.add(enstruman)
+
+    def fiyat_getir(self, enstruman):
+        """Enstrümanın bilinen son fiyatı"""
+        return self.fiyat.get(enstruman, 0.0)
+
+    def fiyat_guncelle(self, enstruman, fiyat):
+        """Fiyat tick'ini işler - Sadece bu enstrümanın pozisyonları yeniden değerlenir"""
+        if fiyat <= 0 or self.fiyat.get(enstruman) == fiyat:
+            return
+        self.fiyat[enstruman] = fiyat
+        portfoy = self._pozisyonlar.get(enstruman)
+        if portfoy is not None and len(portfoy):
+            portfoy.degerle(fiyat)
+        self._degisen.add(enstruman)
+
+    def degisenler(self):
+        """Son çağrıdan beri değişen enstrümanlar için (enstrüman, idler, değerler, kar/zararlar) üretir"""
+        degisen, self._degisen = self._degisen, set()
+        for enstruman in sorted(degisen):
+            portfoy = self._pozisyonlar.get(enstruman)
+            if portfoy is not None and len(portfoy):
+                yield enstruman, portfoy.idler, portfoy.deger, portfoy.kar_zarar()
+
+    def pozisyon_sayisi(self):
+        """Motordaki toplam pozisyon sayısı"""
+        return sum(len(portfoy) for portfoy in self._pozisyonlar.values())
+
+    def toplam_deger(self):
+        """Tüm pozisyonların toplam değeri (kuruş)"""
+        return sum(portfoy.toplam() for portfoy in self._pozisyonlar.values())
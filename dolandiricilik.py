@@ -0,0 +1,163 @@
+"""
+BetikBank dolandırıcılık/hız kuralları motoru
+Her hesap için son bir dakika/saat/gün gibi kayan pencerelerde giden işlem sayısını ve toplamını
+bellekte tutar ve bir transferi, veritabanına sorgu atmadan, yapılandırılabilir kurallara göre
+değerlendirir. Kural sonucu 'engelle' (transfer yapılmaz) veya 'isaretle' (transfer yapılır,
+inceleme için işaretlenir) olabilir.
+
+Kural biçimi (JSON veya sözlük):
+    {"ad": "dakika_adet", "pencere": 60, "adet": 10, "sonuc": "engelle"}
+    {"ad": "gun_tutar", "pencere": 86400, "tutar": "250000", "sonuc": "engelle"}
+    {"ad": "tek_islem", "pencere": 0, "tutar": "100000", "sonuc": "isaretle"}
+
+pencere=0 olan kurallar sadece transferin kendi tutarına bakar. adet/tutar sınırı, bu transfer
+de sayıldığında aşılıyorsa kural tetiklenir.
+"""
+import json  # Kuralları ortam değişkeninden okumak için
+import threading  # Sayaçları thread'ler arasında korumak için
+import time  # Pencerelerin şimdiki anı için
+from collections import deque  # Kayan pencere olayları için
+from decimal import Decimal  # Tutar sınırları için
+
+SONUCLAR = ('izin', 'isaretle', 'engelle')  # Artan önem sırasıyla
+
+VARSAYILAN_KURALLAR = [
+    {'ad': 'dakika_adet', 'pencere': 60, 'adet': 10, 'sonuc': 'engelle'},
+    {'ad': 'saat_tutar', 'pencere': 3600, 'tutar': '50000', 'sonuc': 'isaretle'},
+    {'ad': 'gun_adet', 'pencere': 86400, 'adet': 200, 'sonuc': 'engelle'},
+    {'ad': 'gun_tutar', 'pencere': 86400, 'tutar': '250000', 'sonuc': 'engelle'},
+    {'ad': 'tek_islem', 'pencere': 0, 'tutar': '100000', 'sonuc': 'isaretle'},
+]
+
+
+class Kural:
+    """Bir pencerede en fazla işlem sayısı ve/veya toplam tutar sınırı"""
+
+    def __init__(self, ad, pencere=0, adet=None, tutar=None, sonuc='engelle'):
+        if sonuc not in ('isaretle', 'engelle'):
+            raise ValueError(f"Bilinmeyen kural sonucu: {sonuc}")
+        if adet is None and tutar is None:
+            raise ValueError(f"'{ad}' kuralında adet veya tutar sınırı olmalı")
+        self.ad = ad
+        self.pencere = int(pencere)  # Saniye (0: sadece bu işlem)
+        self.adet = int(adet) if adet is not None else None
+        self.tutar = Decimal(str(tutar)) if tutar is not None else None
+        self.sonuc = sonuc
+
+    def tetiklendi_mi(self, adet, toplam, tutar):
+        """Penceredeki (adet, toplam) ile bu işlem birlikte sınırı aşıyor mu?"""
+        if self.pencere == 0:
+            return self.tutar is not None and tutar > self.tutar
+        return ((self.adet is not None and adet + 1 > self.adet)
+                or (self.tutar is not None and toplam + tutar > self.tutar))
+
+
+def kurallari_coz(tanimlar):
+    """JSON metnini veya sözlük listesini Kural listesine çevirir"""
+    if isinstance(tanimlar, str):
+        tanimlar = json.loads(tanimlar)
+    return [Kural(**tanim) for tanim in tanimlar]
+
+
+class Karar:
+    """Bir transferin değerlendirme sonucu"""
+
+    def __init__(self, sonuc='izin', kurallar=()):
+        self.sonuc = sonuc  # izin, isaretle veya engelle
+        self.kurallar = list(kurallar)  # Tetiklenen kural adları
+
+    @property
+    def engellendi(self):
+        """Transfer yapılmamalı mı?"""
+        return self.sonuc == 'engelle'
+
+    @property
+    def isaretlendi(self):
+        """Transfer yapılabilir ama incelenmeli mi?"""
+        return self.sonuc == 'isaretle'
+
+
+class _Pencere:
+    """Tek bir pencere uzunluğu için olaylar ve bunların çalışan toplamları"""
+
+    __slots__ = ('olaylar', 'adet', 'toplam')
+
+    def __init__(self):
+        self.olaylar = deque()  # (zaman, tutar), eskiden yeniye
+        self.adet = 0
+        self.toplam = Decimal(0)
+
+    def ekle(self, zaman, tutar):
+        """Olayı pencerenin sonuna ekler"""
+        self.olaylar.append((zaman, tutar))
+        self.adet += 1
+        self.toplam += tutar
+
+    def temizle(self, sinir):
+        """'sinir' anından eski olayları pencereden çıkarır"""
+        olaylar = self.olaylar
+        while olaylar and olaylar[0][0] <= sinir:
+            _, tutar = olaylar.popleft()
+            self.adet -= 1
+            self.toplam -= tutar
+
+
+class KuralMotoru:
+    """Hesap bazında kayan pencere sayaçlarıyla transferleri değerlendiren thread güvenli motor
+
+    Her kural değerlendirmesi, pencereden süresi geçen olayları çıkarıp çalışan toplamlara
+    bakar; işlem başına amortize sabit zamanlıdır ve veritabanına gitmez.
+    """
+
+    def __init__(self, kurallar):
+        self.kurallar = list(kurallar)
+        self.pencereler = sorted({kural.pencere for kural in self.kurallar if kural.pencere})
+        self._hesaplar = {}  # Hesap id -> {pencere: _Pencere}
+        self._kilit = threading.Lock()
+
+    def _hesap(self, hesap_id):
+        """Hesabın pencerelerini döndürür (yoksa oluşturur)"""
+        hesap = self._hesaplar.get(hesap_id)
+        if hesap is None:
+            hesap = self._hesaplar[hesap_id] = {pencere: _Pencere() for pencere in self.pencereler}
+        return hesap
+
+    def degerlendir(self, hesap_id, tutar, an=None, bekleyen_adet=0, bekleyen_tutar=0):
+        """Hesaptan 'tutar' çıkışını kurallara göre değerlendirir ve Karar döndürür
+
+        bekleyen_adet/bekleyen_tutar: Aynı toplu işlemde kabul edilmiş ama henüz kaydedilmemiş çıkışlar
+        """
+        an = time.time() if an is None else an
+        sonuc, tetiklenen = 'izin', []
+        with self._kilit:
+            hesap = self._hesaplar.get(hesap_id)
+            for kural in self.kurallar:
+                adet, toplam = 0, Decimal(0)
+                if kural.pencere:
+                    adet, toplam = bekleyen_adet, Decimal(bekleyen_tutar)
+                    if hesap is not None:
+                        pencere = hesap[kural.pencere]
+                        pencere.temizle(an - kural.pencere)
+                        adet, toplam = adet + pencere.adet, toplam + pencere.toplam
+                if kural.tetiklendi_mi(adet, toplam, tutar):
+                    tetiklenen.append(kural.ad)
+                    if SONUCLAR.index(kural.sonuc) > SONUCLAR.index(sonuc):
+                        sonuc = kural.sonuc
+        return Karar(sonuc, tetiklenen)
+
+    def kaydet(self, hesap_id, tutar, an=None):
+        """Gerçekleşen bir çıkışı hesabın pencerelerine ekler"""
+        an = time.time() if an is None else an
+        with self._kilit:
+            for pencere_uzunlugu, pencere in self._hesap(hesap_id).items():
+                pencere.temizle(an - pencere_uzunlugu)
+                pencere.ekle(an, tutar)
+
+    def tohumla(self, hareketler):
+        """(hesap_id, zaman, tutar) hareketlerini (eskiden yeniye) pencerelere ekler"""
+        for hesap_id, an, tutar in hareketler:
+            self.kaydet(hesap_id, tutar, an)
+
+    def en_uzun_pencere(self):
+        """Sayaçların kapsadığı en uzun süre (saniye)"""
+        return self.pencereler[-1] if self.pencereler else 0
@@ -0,0 +1,32 @@
+"""
+Hesap günlük özet scripti
+Bu script, henüz özetlenmemiş tamamlanmış günler için her hesabın açılış/kapanış bakiyesini
+ve günlük giriş/çıkış toplamlarını hesap_gunluk_ozet tablosuna yazar. Artımlı çalışır;
+günde bir kez (ör. gece yarısından sonra cron ile) çalıştırılması yeterlidir.
+
+Kullanım:
+    python gunluk_ozet.py              # Düne kadar olan günleri özetle
+    python gunluk_ozet.py 2025-01-31   # Verilen güne kadar olan günleri özetle
+"""
+# Uygulama fabrikasını ve gerekli servisleri import et
+from app import uygulama_olustur  # Uygulama fabrikası (web'e özgü parçalar olmadan)
+from servisler import gunluk_ozetleri_guncelle
+from datetime import date  # Tarih argümanını çözmek için
+
+# Script doğrudan çalıştırılıyorsa
+if __name__ == '__main__':
+    import sys  # Komut satırı argümanları için
+    
+    son_gun = None  # Varsayılan: dün
+    if len(sys.argv) > 1:  # Komut satırından tarih verilmişse
+        try:
+            son_gun = date.fromisoformat(sys.argv[1])  # YYYY-MM-DD formatında tarih
+        except ValueError:
+            print("Geçersiz tarih! YYYY-MM-DD formatında giriniz.")
+            sys.exit(1)  # Programı hata ile sonlandır
+    
+    # Uygulama bağlamı içinde çalış (veritabanı işlemleri için gerekli)
+    with uygulama_olustur(web=False).app_context():
+        gun_sayisi = gunluk_ozetleri_guncelle(son_gun)
+    
+    print(f"[Tamamlandi] {gun_sayisi} gun ozetlendi.")
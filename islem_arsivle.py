@@ -0,0 +1,31 @@
+"""
+İşlem arşivleme scripti
+Bu script, içinde bulunulan aya ek olarak son ISLEM_ARSIV_AY aydan (varsayılan 12) eski
+işlemleri islem tablosundan islem_arsivi tablosuna ay ay taşır. Sıcak tablo ve indeksleri
+küçük kalır; işlem geçmişi ve ekstre sayfaları eski tarihlere gidildiğinde arşivi okur.
+Ayda bir (ör. ayın ilk günü gunluk_ozet.py'den sonra cron ile) çalıştırılması yeterlidir.
+
+Kullanım:
+    python islem_arsivle.py          # ISLEM_ARSIV_AY ayarına göre
+    python islem_arsivle.py --ay 6   # Son 6 aydan eski işlemleri taşı
+"""
+# Uygulama fabrikasını ve gerekli servisleri import et
+from app import uygulama_olustur  # Uygulama fabrikası (web'e özgü parçalar olmadan)
+from servisler import islemleri_arsivle
+import argparse  # Komut satırı argümanları için
+
+# Script doğrudan çalıştırılıyorsa
+if __name__ == '__main__':
+    ayristirici = argparse.ArgumentParser(description='Eski işlemleri arşiv tablosuna taşır')
+    ayristirici.add_argument('--ay', type=int, help='Sıcak tabloda tutulacak ay sayısı (varsayılan: ISLEM_ARSIV_AY)')
+    argumanlar = ayristirici.parse_args()
+
+    def ilerleme(donem, satir_sayisi):
+        """Her taşınan aydan sonra yazdırır"""
+        print(f"  {donem}: {satir_sayisi} islem arsivlendi")
+
+    # Uygulama bağlamı içinde çalış (veritabanı işlemleri için gerekli)
+    with uygulama_olustur(web=False).app_context():
+        donem_sayisi = islemleri_arsivle(argumanlar.ay, ilerleme=ilerleme)
+
+    print(f"[Tamamlandi] {donem_sayisi} ay arsive tasindi.")
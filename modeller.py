@@ -0,0 +1,282 @@
+"""
+BetikBank veritabanı modelleri
+SQLAlchemy nesnesini (db), para kolon tipini ve tüm tabloların modellerini tanımlar. db
+herhangi bir uygulamaya bağlı oluşturulmaz; app.uygulama_olustur() her uygulama için
+db.init_app() çağırır. Bu modül Flask uygulaması, route'lar veya servisler import
+edilmeden kullanılabilir (ör. şema güncellemeleri ve toplu işler).
+"""
+from flask_sqlalchemy import SQLAlchemy  # Veritabanı ORM için
+from flask_login import UserMixin  # Flask-Login kullanıcı arayüzü için
+from datetime import datetime  # Kayıt tarihleri için
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP  # Kuruş hassasiyetinde para hesabı için
+
+db = SQLAlchemy()  # SQLAlchemy ORM nesnesi (uygulamaya init_app ile bağlanır)
+
+# ============================================
+# VERİTABANI MODELLERİ
+# ============================================
+
+# Para tipi - Tutarları float yerine tam sayı kuruş olarak saklar
+class Para(db.TypeDecorator):
+    """Para tutarlarını veritabanında tam sayı kuruş, Python'da Decimal (TL) olarak tutan kolon tipi
+    
+    Float aritmetiği milyonlarca işlemden sonra kuruş altı kaymalara yol açar. Kuruş
+    cinsinden tam sayılar toplama/karşılaştırmada hem kesin hem de daha ucuzdur.
+    """
+    impl = db.BigInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        """TL tutarını (Decimal, int veya float) kuruşa çevirir"""
+        if value is None:
+            return None
+        return int((Decimal(str(value)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+    
+    def process_result_value(self, value, dialect):
+        """Veritabanındaki kuruşu iki ondalıklı Decimal TL tutarına çevirir"""
+        if value is None:
+            return None
+        return Decimal(int(value)).scaleb(-2)
+
+KURUS = Decimal('0.01')  # En küçük para birimi
+
+def tutar_coz(deger):
+    """Formdan gelen tutarı kuruşa yuvarlanmış Decimal'e çevirir; geçersizse None döndürür"""
+    try:
+        tutar = Decimal(str(deger).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    if not tutar.is_finite():  # NaN ve sonsuz değerleri reddet
+        return None
+    return tutar.quantize(KURUS, rounding=ROUND_HALF_UP)
+
+# Kullanıcı modeli - Sistemdeki tüm kullanıcıları temsil eder
+class User(UserMixin, db.Model):
+    """Kullanıcı bilgilerini saklayan veritabanı modeli"""
+    id = db.Column(db.Integer, primary_key=True)  # Birincil anahtar
+    tc_no = db.Column(db.String(11), unique=True, nullable=False)  # TC Kimlik Numarası (benzersiz, zorunlu)
+    ad = db.Column(db.String(100), nullable=False)  # Kullanıcı adı
+    soyad = db.Column(db.String(100), nullable=False)  # Kullanıcı soyadı
+    email = db.Column(db.String(120), unique=True, nullable=False)  # E-posta adresi (benzersiz, zorunlu)
+    telefon = db.Column(db.String(15), nullable=False)  # Telefon numarası
+    password_hash = db.Column(db.String(255), nullable=False)  # Hashlenmiş şifre (düz metin saklanmaz)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Hesap oluşturulma tarihi
+    
+    # İlişkiler - Bir kullanıcının birden fazla hesabı, kartı ve yatırım hesabı olabilir
+    hesaplar = db.relationship('Hesap', backref='kullanici', lazy=True)  # Kullanıcının hesapları
+    kartlar = db.relationship('Kart', backref='kullanici', lazy=True)  # Kullanıcının kartları
+    yatirim_hesaplari = db.relationship('YatirimHesabi', backref='kullanici', lazy=True)  # Kullanıcının yatırım hesapları
+
+# Hesap modeli - Banka hesaplarını temsil eder
+class Hesap(db.Model):
+    """Banka hesaplarını saklayan veritabanı modeli"""
+    id = db.Column(db.Integer, primary_key=True)  # Birincil anahtar
+    hesap_no = db.Column(db.String(16), unique=True, nullable=False)  # Hesap numarası (benzersiz, 16 haneli)
+    kullanici_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # Hesabın sahibi (yabancı anahtar)
+    bakiye = db.Column(Para, default=0, nullable=False)  # Hesap bakiyesi (varsayılan: 0)
+    hesap_turu = db.Column(db.String(20), default='Vadesiz', nullable=False)  # Hesap türü (Vadesiz, Vadeli vb.)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Hesap oluşturulma tarihi
+    
+    # İlişkiler - Bir hesabın birden fazla işlemi ve kartı olabilir
+    gonderilen_islemler = db.relationship('Islem', foreign_keys='Islem.gonderen_hesap_id', backref='gonderen_hesap', lazy=True)  # Bu hesaptan gönderilen işlemler
+    alinan_islemler = db.relationship('Islem', foreign_keys='Islem.alici_hesap_id', backref='alici_hesap', lazy=True)  # Bu hesaba gelen işlemler
+    kartlar = db.relationship('Kart', backref='hesap', lazy=True)  # Bu hesaba bağlı kartlar
+    
+    # Kullanıcının hesaplarını (ve vadesiz hesabını) bulan sorgular için
+    __table_args__ = (
+        db.Index('ix_hesap_kullanici_turu', 'kullanici_id', 'hesap_turu'),
+    )
+
+# İşlem modeli - Para transferi ve diğer işlemleri temsil eder
+class Islem(db.Model):
+    """Para transferi ve diğer işlemleri saklayan veritabanı modeli"""
+    id = db.Column(db.Integer, primary_key=True)  # Birincil anahtar
+    gonderen_hesap_id = db.Column(db.Integer, db.ForeignKey('hesap.id'), nullable=False)  # Gönderen hesap (yabancı anahtar)
+    alici_hesap_id = db.Column(db.Integer, db.ForeignKey('hesap.id'), nullable=False)  # Alıcı hesap (yabancı anahtar)
+    tutar = db.Column(Para, nullable=False)  # İşlem tutarı
+    aciklama = db.Column(db.String(200))  # İşlem açıklaması (opsiyonel)
+    islem_turu = db.Column(db.String(20), default='Transfer', nullable=False)  # İşlem türü (Transfer, Yatırım vb.)
+    tarih = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # İşlem tarihi
+    gonderen_bakiye_sonrasi = db.Column(Para)  # İşlem sonrası gönderen hesabın bakiyesi
+    alici_bakiye_sonrasi = db.Column(Para)  # İşlem sonrası alıcı hesabın bakiyesi
+    
+    # Bileşik indeksler - Hesap bazlı işlem geçmişi sorguları tarihe göre sıralı okunur
+    __table_args__ = (
+        db.Index('ix_islem_gonderen_tarih', 'gonderen_hesap_id', 'tarih'),  # Gönderilen işlemler için
+        db.Index('ix_islem_alici_tarih', 'alici_hesap_id', 'tarih'),  # Alınan işlemler için
+        db.Index('ix_islem_tarih', 'tarih'),  # Gün bazlı özet ve tarih aralığı işleri için
+    )
+
+# Kredi kartı harcamalarının işlem türü - Kartın limitinden düşer, bağlı hesabın bakiyesini değiştirmez.
+# Bu işlemler hesap geçmişinde listelenir ama hesabın giriş/çıkış toplamlarına ve hız sınırlarına sayılmaz.
+KREDI_KARTI_HARCAMASI = 'Kredi Kartı'
+
+# İşlem arşivi modeli - Sıcak tablodan taşınan eski işlemler (kolonlar Islem ile aynıdır)
+class IslemArsivi(db.Model):
+    """ISLEM_ARSIV_AY'dan eski aylara ait işlemleri saklayan arşiv modeli
+    
+    Satırlar özgün id'leriyle taşınır; böylece (tarih, id) imleçleri iki tablo arasında geçerli kalır.
+    """
+    __tablename__ = 'islem_arsivi'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Özgün işlem id'si
+    gonderen_hesap_id = db.Column(db.Integer, db.ForeignKey('hesap.id'), nullable=False)  # Gönderen hesap
+    alici_hesap_id = db.Column(db.Integer, db.ForeignKey('hesap.id'), nullable=False)  # Alıcı hesap
+    tutar = db.Column(Para, nullable=False)  # İşlem tutarı
+    aciklama = db.Column(db.String(200))  # İşlem açıklaması
+    islem_turu = db.Column(db.String(20), nullable=False)  # İşlem türü
+    tarih = db.Column(db.DateTime, nullable=False)  # İşlem tarihi
+    gonderen_bakiye_sonrasi = db.Column(Para)  # İşlem sonrası gönderen hesabın bakiyesi
+    alici_bakiye_sonrasi = db.Column(Para)  # İşlem sonrası alıcı hesabın bakiyesi
+    
+    # Islem ile aynı indeksler - Arşivdeki geçmiş de hesap bazında tarihe göre sıralı okunur
+    __table_args__ = (
+        db.Index('ix_islem_arsivi_gonderen_tarih', 'gonderen_hesap_id', 'tarih'),
+        db.Index('ix_islem_arsivi_alici_tarih', 'alici_hesap_id', 'tarih'),
+        db.Index('ix_islem_arsivi_tarih', 'tarih'),
+    )
+
+# İşlem arşiv dönemi modeli - Arşive taşınmış ayları listeler
+class IslemArsivDonemi(db.Model):
+    """Tamamı islem_arsivi tablosuna taşınmış ayları saklayan model (son dönem arşiv sınırını verir)"""
+    __tablename__ = 'islem_arsiv_donemi'
+    donem = db.Column(db.String(7), primary_key=True)  # Ay (YYYY-MM)
+    satir_sayisi = db.Column(db.Integer, nullable=False)  # Taşınan işlem sayısı
+    arsivlenme_tarihi = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Taşındığı an
+
+# Kart modeli - Banka kartlarını temsil eder
+class Kart(db.Model):
+    """Banka kartlarını saklayan veritabanı modeli"""
+    id = db.Column(db.Integer, primary_key=True)  # Birincil anahtar
+    kart_no = db.Column(db.String(16), unique=True, nullable=False)  # Kart numarası (benzersiz, 16 haneli)
+    kullanici_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # Kart sahibi (yabancı anahtar)
+    hesap_id = db.Column(db.Integer, db.ForeignKey('hesap.id'), nullable=False)  # Bağlı hesap (yabancı anahtar)
+    kart_turu = db.Column(db.String(20), nullable=False)  # Kart türü: Kredi Kartı, Banka Kartı, Sanal Kart
+    son_kullanim_tarihi = db.Column(db.String(5), nullable=False)  # Son kullanım tarihi (MM/YY formatında)
+    cvv = db.Column(db.String(3), nullable=False)  # CVV güvenlik kodu (3 haneli)
+    kart_sahibi_adi = db.Column(db.String(100), nullable=False)  # Kart üzerindeki isim
+    limit = db.Column(Para, default=0)  # Kredi kartı limiti (sadece kredi kartları için)
+    kullanilan_limit = db.Column(Para, default=0)  # Kredi kartı harcamalarıyla kullanılan limit
+    durum = db.Column(db.String(20), default='Aktif', nullable=False)  # Kart durumu: Aktif, Pasif, İptal
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Kart oluşturulma tarihi
+
+# Yatırım Hesabı modeli - Yatırım hesaplarını temsil eder
+class YatirimHesabi(db.Model):
+    """Yatırım hesaplarını saklayan veritabanı modeli"""
+    id = db.Column(db.Integer, primary_key=True)  # Birincil anahtar
+    hesap_no = db.Column(db.String(16), unique=True, nullable=False)  # Yatırım hesap numarası (benzersiz)
+    kullanici_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # Hesap sahibi (yabancı anahtar)
+    yatirim_turu = db.Column(db.String(50), nullable=False)  # Yatırım türü: Döviz, Altın, Borsa, Fon, Kripto Para
+    toplam_bakiye = db.Column(Para, default=0, nullable=False)  # Toplam yatırım bakiyesi
+    kar_zarar = db.Column(Para, default=0)  # Toplam kar/zarar miktarı
+    durum = db.Column(db.String(20), default='Aktif', nullable=False)  # Hesap durumu: Aktif, Pasif
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Hesap oluşturulma tarihi
+    enstruman = db.Column(db.String(20))  # Pozisyonun enstrümanı (ör. XAUTRY)
+    miktar = db.Column(db.Float)  # Pozisyondaki enstrüman miktarı (boşsa değerleme motoru maliyetten hesaplar)
+    maliyet = db.Column(Para, default=0)  # Pozisyonun alış maliyeti
+
+# Enstrüman fiyatı modeli - Değerleme motorunun bildiği son fiyatlar
+class EnstrumanFiyati(db.Model):
+    """Her enstrümanın son fiyatını saklayan model (yeni pozisyonlar bu fiyattan açılır)"""
+    __tablename__ = 'enstruman_fiyati'
+    enstruman = db.Column(db.String(20), primary_key=True)  # Enstrüman kodu
+    fiyat = db.Column(db.Float, nullable=False)  # 1 birimin TL fiyatı
+    guncelleme_tarihi = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Fiyatın geldiği an
+
+# Hesap günlük özeti modeli - Her hesabın gün sonu bakiyesi ve günlük hareket toplamları
+class HesapGunlukOzet(db.Model):
+    """Hesap bazında günlük açılış/kapanış bakiyesi ve giriş/çıkış toplamlarını saklayan model
+    
+    Sadece hareket olan günler için satır oluşturulur; bir tarihteki bakiye o tarihe kadarki
+    en son özetin kapanış bakiyesidir.
+    """
+    __tablename__ = 'hesap_gunluk_ozet'
+    hesap_id = db.Column(db.Integer, db.ForeignKey('hesap.id'), primary_key=True)  # Özetin ait olduğu hesap
+    tarih = db.Column(db.Date, primary_key=True)  # Özet günü
+    acilis_bakiye = db.Column(Para, nullable=False)  # Gün başı bakiye
+    kapanis_bakiye = db.Column(Para, nullable=False)  # Gün sonu bakiye
+    toplam_giris = db.Column(Para, nullable=False)  # Gün içinde hesaba gelen toplam tutar
+    toplam_cikis = db.Column(Para, nullable=False)  # Gün içinde hesaptan çıkan toplam tutar
+    islem_sayisi = db.Column(db.Integer, nullable=False)  # Gün içindeki işlem sayısı
+
+# İşlem anahtarı modeli - Tekrar gönderilen transfer isteklerinin iki kez uygulanmasını engeller
+class IslemAnahtari(db.Model):
+    """İstemcinin gönderdiği idempotency anahtarını oluşan işlemle ve isteğin özetiyle eşleştiren model"""
+    __tablename__ = 'islem_anahtari'
+    kullanici_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)  # İsteği yapan kullanıcı
+    kapsam = db.Column(db.String(30), primary_key=True, default='transfer', server_default='transfer')  # Anahtarın ad alanı (ör. 'transfer')
+    anahtar = db.Column(db.String(64), primary_key=True)  # İstemcinin ürettiği benzersiz anahtar
+    parmak_izi = db.Column(db.String(64), nullable=False)  # İsteğin özeti (işlem türü, kaynak, hedef, tutar)
+    islem_id = db.Column(db.Integer, db.ForeignKey('islem.id'), nullable=False)  # Anahtarla oluşturulan işlem
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Kayıt tarihi
+
+# API token modeli - Mobil istemcilerin JSON API'ye erişim anahtarları
+class ApiTokeni(db.Model):
+    """JSON API için kullanıcıya verilen erişim token'larını saklayan model (token'ın kendisi değil, özeti saklanır)"""
+    __tablename__ = 'api_tokeni'
+    id = db.Column(db.Integer, primary_key=True)  # Birincil anahtar
+    kullanici_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)  # Token sahibi
+    token_ozeti = db.Column(db.String(64), unique=True, nullable=False)  # Token'ın SHA-256 özeti
+    ad = db.Column(db.String(100))  # İstemci/cihaz adı (opsiyonel)
+    son_kullanma = db.Column(db.DateTime, nullable=False)  # Bu tarihten sonra geçersiz
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Oluşturulma tarihi
+
+# Numara sayacı modeli - Kart ve yatırım hesabı numaralarının sıra numaralarını tutar
+class NumaraSayaci(db.Model):
+    """Her numara türü için dağıtılmış son sıra numarasını saklayan model"""
+    __tablename__ = 'numara_sayaci'
+    ad = db.Column(db.String(30), primary_key=True)  # Numara türü (kart, yatirim_hesabi)
+    deger = db.Column(db.BigInteger, nullable=False)  # Ayrılmış son sıra numarası
+
+# Olay kutusu modeli - İşlemle aynı commit'te yazılan ve arka planda teslim edilen olaylar
+class OlayKutusu(db.Model):
+    """Transfer sonrası yan etkiler (bildirim, dolandırıcılık skoru, defter aktarımı) için bekleyen olaylar"""
+    __tablename__ = 'olay_kutusu'
+    id = db.Column(db.Integer, primary_key=True)  # Birincil anahtar (olayın teslim sırası)
+    olay_turu = db.Column(db.String(50), nullable=False)  # Olay türü (transfer.tamamlandi, yatirim.acildi)
+    veri = db.Column(db.Text, nullable=False)  # Olay verisi (JSON)
+    durum = db.Column(db.String(20), default='Bekliyor', nullable=False)  # Bekliyor, İşleniyor, Gönderildi, Başarısız
+    deneme_sayisi = db.Column(db.Integer, default=0, nullable=False)  # Başarısız teslim denemesi sayısı
+    sonraki_deneme = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Bekliyor: en erken deneme, İşleniyor: kira sonu
+    isleyici = db.Column(db.String(32))  # Olayı sahiplenen worker'ın anahtarı
+    son_hata = db.Column(db.Text)  # Son başarısız denemenin hatası
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Olayın oluştuğu an
+    gonderilme_tarihi = db.Column(db.DateTime)  # Tüm işleyicilerin başarıyla çalıştığı an
+    
+    # Worker sadece zamanı gelmiş bekleyen olayları okur
+    __table_args__ = (
+        db.Index('ix_olay_kutusu_durum_deneme', 'durum', 'sonraki_deneme'),
+    )
+
+# Transfer talimatı modeli - İleri tarihli ve düzenli transferler
+class TransferTalimati(db.Model):
+    """İleri tarihli (tek seferlik) ve düzenli (günlük, haftalık, aylık) transfer talimatları"""
+    __tablename__ = 'transfer_talimati'
+    id = db.Column(db.Integer, primary_key=True)  # Birincil anahtar
+    kullanici_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # Talimatı veren kullanıcı
+    gonderen_hesap_id = db.Column(db.Integer, db.ForeignKey('hesap.id'), nullable=False)  # Gönderen hesap
+    alici_hesap_id = db.Column(db.Integer, db.ForeignKey('hesap.id'), nullable=False)  # Alıcı hesap
+    tutar = db.Column(Para, nullable=False)  # Her çalışmada transfer edilecek tutar
+    aciklama = db.Column(db.String(200))  # İşleme yazılacak açıklama
+    siklik = db.Column(db.String(20), nullable=False)  # Tek Sefer, Günlük, Haftalık, Aylık
+    ayin_gunu = db.Column(db.Integer)  # Aylık talimatın çalıştığı gün (kısa aylarda ayın son günü)
+    planlanan_tarih = db.Column(db.DateTime, nullable=False)  # Sıradaki çalışmanın planlandığı an
+    sonraki_calisma = db.Column(db.DateTime, nullable=False)  # Aktif: en erken çalışma (planlanan veya tekrar), İşleniyor: kira sonu
+    durum = db.Column(db.String(20), default='Aktif', nullable=False)  # Aktif, İşleniyor, Tamamlandı, Başarısız, İptal
+    deneme_sayisi = db.Column(db.Integer, default=0, nullable=False)  # Sıradaki çalışmanın başarısız deneme sayısı
+    isleyici = db.Column(db.String(32))  # Talimatı sahiplenen zamanlayıcının anahtarı
+    son_calisma = db.Column(db.DateTime)  # Son başarılı çalışma
+    son_hata = db.Column(db.String(200))  # Son başarısız denemenin sebebi
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Talimatın oluşturulma tarihi
+    
+    # Zamanlayıcı sadece zamanı gelmiş talimatları okur; kullanıcı sayfası kendi talimatlarını listeler
+    __table_args__ = (
+        db.Index('ix_transfer_talimati_durum_sonraki', 'durum', 'sonraki_calisma'),
+        db.Index('ix_transfer_talimati_kullanici', 'kullanici_id'),
+    )
+
+# Şema sürümü modeli - Uygulanmış veritabanı güncellemelerini takip eder
+class SemaSurumu(db.Model):
+    """Mevcut veritabanına uygulanan şema güncellemelerini saklayan model"""
+    __tablename__ = 'sema_surumu'
+    surum = db.Column(db.Integer, primary_key=True)  # Güncelleme numarası
+    uygulanma_tarihi = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Uygulandığı tarih
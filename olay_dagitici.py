@@ -0,0 +1,57 @@
+"""
+Olay dağıtıcı (arka plan worker) scripti
+Bu script, transfer ve yatırım işlemleriyle aynı commit'te olay_kutusu tablosuna yazılan
+olayları kayıtlı işleyicilere (bildirim, dolandırıcılık skoru, defter aktarımı vb.) teslim eder.
+Başarısız olaylar artan aralıklarla yeniden denenir. Birden fazla kopya aynı anda çalışabilir;
+her olay tek bir worker tarafından sahiplenilir.
+
+Kullanım:
+    python olay_dagitici.py                 # Sürekli çalış (Ctrl+C ile durdurulur)
+    python olay_dagitici.py --bir-kez       # Bekleyen olayları işle ve çık (ör. cron ile)
+    python olay_dagitici.py --aralik 0.5 --parca 500
+"""
+# Uygulama fabrikasını ve gerekli servisleri import et
+from app import uygulama_olustur  # Uygulama fabrikası (web'e özgü parçalar olmadan)
+from servisler import olaylari_isle, gonderilmis_olaylari_temizle
+import argparse  # Komut satırı argümanları için
+import time  # Bekleme için
+
+def calistir(aralik=1.0, parca_boyutu=100, bir_kez=False):
+    """Bekleyen olayları işler; bir_kez değilse kuyruk boşaldığında 'aralik' saniye bekleyip devam eder"""
+    son_temizlik = 0
+    toplam = {'Gönderildi': 0, 'Bekliyor': 0, 'Başarısız': 0}
+
+    # Uygulama bağlamı içinde çalış (veritabanı işlemleri için gerekli)
+    with uygulama_olustur(web=False).app_context():
+        while True:
+            ozet = olaylari_isle(parca_boyutu)
+            for durum, adet in ozet.items():
+                toplam[durum] += adet
+            if any(ozet.values()):
+                print(f"  {ozet['Gönderildi']} gonderildi, {ozet['Bekliyor']} yeniden denenecek, "
+                      f"{ozet['Başarısız']} basarisiz")
+
+            # Teslim edilmiş eski olayları saatte bir temizle
+            if time.monotonic() - son_temizlik > 3600:
+                gonderilmis_olaylari_temizle()
+                son_temizlik = time.monotonic()
+
+            if sum(ozet.values()) < parca_boyutu:  # Kuyrukta zamanı gelmiş olay kalmadı
+                if bir_kez:
+                    return toplam
+                time.sleep(aralik)
+
+# Script doğrudan çalıştırılıyorsa
+if __name__ == '__main__':
+    ayristirici = argparse.ArgumentParser(description='Olay kutusundaki bekleyen olayları işleyicilere teslim eder')
+    ayristirici.add_argument('--aralik', type=float, default=1.0, help='Kuyruk boşken yoklama aralığı (saniye)')
+    ayristirici.add_argument('--parca', type=int, default=100, help='Tek seferde sahiplenilecek olay sayısı')
+    ayristirici.add_argument('--bir-kez', action='store_true', help='Bekleyen olayları işle ve çık')
+    argumanlar = ayristirici.parse_args()
+
+    try:
+        toplam = calistir(argumanlar.aralik, argumanlar.parca, argumanlar.bir_kez)
+    except KeyboardInterrupt:  # Ctrl+C ile durduruldu
+        print("Durduruldu.")
+    else:
+        print(f"[Tamamlandi] {toplam['Gönderildi']} olay gonderildi, {toplam['Başarısız']} olay basarisiz.")
@@ -0,0 +1,118 @@
+"""
+BetikBank istek ölçümleri
+Route bazında istek süresi, SQL sorgu sayısı/süresi ve şablon render süresini toplar ve
+Prometheus metin biçiminde (/metrics) dışa verir.
+
+Ölçümler süreç içinde tutulur; birden fazla worker ile çalışırken her worker kendi sayaçlarını
+raporlar (Prometheus tarafında 'instance' etiketiyle toplanır).
+"""
+import threading  # Sayaçları thread'ler arasında korumak için
+from collections import defaultdict  # Route bazlı sayaçlar için
+
+# Histogram sınırları
+SURE_SINIRLARI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # İstek süresi (saniye)
+SORGU_SINIRLARI = (0, 1, 2, 5, 10, 20, 50, 100)  # İstek başına SQL sorgu sayısı
+
+
+class Histogram:
+    """Sabit sınırlı Prometheus histogramı (kümülatif olmayan kova sayıları tutar)"""
+
+    def __init__(self, sinirlar):
+        self.sinirlar = sinirlar
+        self.kovalar = [0] * (len(sinirlar) + 1)  # Son kova: +Inf
+        self.toplam = 0.0
+        self.adet = 0
+
+    def ekle(self, deger):
+        """Değeri ilk uygun kovaya ekler"""
+        for sira, sinir in enumerate(self.sinirlar):
+            if deger <= sinir:
+                break
+        else:
+            sira = len(self.sinirlar)
+        self.kovalar[sira] += 1
+        self.toplam += deger
+        self.adet += 1
+
+    def satirlar(self, ad, etiketler):
+        """Histogramın Prometheus satırlarını üretir"""
+        kumulatif = 0
+        for sinir, adet in zip(self.sinirlar + ('+Inf',), self.kovalar):
+            kumulatif += adet
+            yield f'{ad}_bucket{{{etiketler},le="{sinir}"}} {kumulatif}'
+        yield f'{ad}_sum{{{etiketler}}} {self.toplam:.6f}'
+        yield f'{ad}_count{{{etiketler}}} {self.adet}'
+
+
+def _etiket(deger):
+    """Prometheus etiket değerindeki özel karakterleri kaçırır"""
+    return str(deger).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class IstekOlcumleri:
+    """Route bazlı istek ölçümlerinin thread güvenli toplayıcısı"""
+
+    def __init__(self, onek='betikbank'):
+        self.onek = onek  # Metrik adlarının öneki
+        self._kilit = threading.Lock()
+        self._istek_sayisi = defaultdict(int)  # (route, metod, durum kodu) -> istek sayısı
+        self._sure = defaultdict(lambda: Histogram(SURE_SINIRLARI))  # (route, metod) -> istek süresi
+        self._sorgu = defaultdict(lambda: Histogram(SORGU_SINIRLARI))  # (route, metod) -> istek başına sorgu
+        self._sql_suresi = defaultdict(float)  # (route, metod) -> toplam SQL süresi
+        self._sablon_suresi = defaultdict(float)  # (route, metod) -> toplam şablon render süresi
+        self._yavas_sorgu = 0  # Eşiği aşan sorgu sayısı
+
+    def istek_ekle(self, route, metod, durum, sure, sorgu_sayisi, sql_suresi, sablon_suresi):
+        """Tamamlanan bir isteğin ölçümlerini ekler (süreler saniye cinsinden)"""
+        anahtar = (route, metod)
+        with self._kilit:
+            self._istek_sayisi[(route, metod, durum)] += 1
+            self._sure[anahtar].ekle(sure)
+            self._sorgu[anahtar].ekle(sorgu_sayisi)
+            self._sql_suresi[anahtar] += sql_suresi
+            self._sablon_suresi[anahtar] += sablon_suresi
+
+    def yavas_sorgu_ekle(self):
+        """Eşiği aşan bir sorguyu sayar"""
+        with self._kilit:
+            self._yavas_sorgu += 1
+
+    def prometheus_metni(self):
+        """Tüm ölçümleri Prometheus metin biçiminde döndürür"""
+        o = self.onek
+        with self._kilit:
+            satirlar = [f'# HELP {o}_istek_toplam Tamamlanan HTTP istekleri',
+                        f'# TYPE {o}_istek_toplam counter']
+            for (route, metod, durum), adet in sorted(self._istek_sayisi.items()):
+                satirlar.append(f'{o}_istek_toplam{{route="{_etiket(route)}",metod="{metod}",durum="{durum}"}} {adet}')
+
+            for ad, aciklama, histogramlar in (
+                (f'{o}_istek_suresi_saniye', 'İstek süresi (saniye)', self._sure),
+                (f'{o}_istek_sql_sorgu', 'İstek başına SQL sorgu sayısı', self._sorgu),
+            ):
+                satirlar += [f'# HELP {ad} {aciklama}', f'# TYPE {ad} histogram']
+                for (route, metod), histogram in sorted(histogramlar.items()):
+                    satirlar.extend(histogram.satirlar(ad, f'route="{_etiket(route)}",metod="{metod}"'))
+
+            for ad, aciklama, toplamlar in (
+                (f'{o}_sql_suresi_saniye_toplam', 'SQL sorgularında geçen toplam süre (saniye)', self._sql_suresi),
+                (f'{o}_sablon_suresi_saniye_toplam', 'Şablon render süresi toplamı (saniye)', self._sablon_suresi),
+            ):
+                satirlar += [f'# HELP {ad} {aciklama}', f'# TYPE {ad} counter']
+                for (route, metod), toplam in sorted(toplamlar.items()):
+                    satirlar.append(f'{ad}{{route="{_etiket(route)}",metod="{metod}"}} {toplam:.6f}')
+
+            satirlar += [f'# HELP {o}_yavas_sorgu_toplam Eşiği aşan SQL sorguları',
+                         f'# TYPE {o}_yavas_sorgu_toplam counter',
+                         f'{o}_yavas_sorgu_toplam {self._yavas_sorgu}']
+        return '\n'.join(satirlar) + '\n'
+
+    def temizle(self):
+        """Tüm ölçümleri sıfırlar"""
+        with self._kilit:
+            self._istek_sayisi.clear()
+            self._sure.clear()
+            self._sorgu.clear()
+            self._sql_suresi.clear()
+            self._sablon_suresi.clear()
+            self._yavas_sorgu = 0
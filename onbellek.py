@@ -0,0 +1,111 @@
+"""
+BetikBank önbellek altyapısı
+Sık okunan ve nadiren değişen verilerin (ör. dashboard) veritabanına gitmeden sunulması için
+süreç içi LRU önbellek ile aynı arayüzü sağlayan Redis önbelleği tanımlar.
+
+Tüm önbellekler şu arayüzü sağlar:
+    getir(anahtar)              -> değer veya None
+    koy(anahtar, deger, sure)   -> değeri 'sure' saniye boyunca saklar
+    sil(*anahtarlar)            -> verilen anahtarları siler
+    temizle()                   -> tüm kayıtları siler
+"""
+import pickle  # Redis'e yazılan değerleri serileştirmek için
+import threading  # Süreç içi önbelleği thread'ler arasında korumak için
+import time  # Süre sonu (TTL) hesabı için
+from collections import OrderedDict  # En az kullanılan kaydı bulmak için
+
+
+class BellekOnbellek:
+    """Süreç içi, boyutu sınırlı (LRU) ve süre sonlu (TTL) önbellek
+    
+    Her worker süreci kendi kopyasını tutar; bir worker'da silinen kayıt diğerlerinde
+    süresi dolana kadar kalabilir. Süreçler arası tutarlılık gerekiyorsa RedisOnbellek kullanılır.
+    """
+    
+    def __init__(self, boyut=10000, varsayilan_sure=60):
+        self.boyut = boyut  # En fazla kayıt sayısı
+        self.varsayilan_sure = varsayilan_sure  # Saniye
+        self._kayitlar = OrderedDict()  # anahtar -> (bitiş zamanı, değer), en son kullanılan sonda
+        self._kilit = threading.Lock()
+    
+    def getir(self, anahtar):
+        """Anahtarın değerini döndürür; yoksa veya süresi dolmuşsa None döner"""
+        with self._kilit:
+            kayit = self._kayitlar.get(anahtar)
+            if kayit is None:
+                return None
+            bitis, deger = kayit
+            if bitis < time.monotonic():  # Süresi dolmuş kayıt
+                del self._kayitlar[anahtar]
+                return None
+            self._kayitlar.move_to_end(anahtar)  # En son kullanılan olarak işaretle
+            return deger
+    
+    def koy(self, anahtar, deger, sure=None):
+        """Değeri saklar; önbellek doluysa en uzun süredir kullanılmayan kaydı atar"""
+        bitis = time.monotonic() + (sure or self.varsayilan_sure)
+        with self._kilit:
+            self._kayitlar[anahtar] = (bitis, deger)
+            self._kayitlar.move_to_end(anahtar)
+            while len(self._kayitlar) > self.boyut:
+                self._kayitlar.popitem(last=False)
+    
+    def sil(self, *anahtarlar):
+        """Verilen anahtarları önbellekten siler"""
+        with self._kilit:
+            for anahtar in anahtarlar:
+                self._kayitlar.pop(anahtar, None)
+    
+    def temizle(self):
+        """Tüm kayıtları siler"""
+        with self._kilit:
+            self._kayitlar.clear()
+
+
+class RedisOnbellek:
+    """Redis (veya aynı komutları destekleyen yerel bir sunucu) üzerinde paylaşılan önbellek
+    
+    Tüm worker süreçleri aynı kayıtları gördüğünden bir süreçte yapılan silme hepsine yansır.
+    """
+    
+    def __init__(self, istemci, varsayilan_sure=60, onek='betikbank:'):
+        self.istemci = istemci  # redis.Redis uyumlu istemci (get/set/delete/scan_iter)
+        self.varsayilan_sure = varsayilan_sure  # Saniye
+        self.onek = onek  # Diğer uygulamaların anahtarlarıyla çakışmamak için
+    
+    def getir(self, anahtar):
+        """Anahtarın değerini döndürür; yoksa None döner"""
+        ham = self.istemci.get(self.onek + anahtar)
+        return pickle.loads(ham) if ham is not None else None
+    
+    def koy(self, anahtar, deger, sure=None):
+        """Değeri süre sonuyla birlikte saklar"""
+        self.istemci.set(self.onek + anahtar, pickle.dumps(deger), ex=sure or self.varsayilan_sure)
+    
+    def sil(self, *anahtarlar):
+        """Verilen anahtarları önbellekten siler"""
+        if anahtarlar:
+            self.istemci.delete(*(self.onek + anahtar for anahtar in anahtarlar))
+    
+    def temizle(self):
+        """Bu uygulamaya ait tüm kayıtları siler"""
+        anahtarlar = list(self.istemci.scan_iter(match=self.onek + '*'))
+        if anahtarlar:
+            self.istemci.delete(*anahtarlar)
+
+
+def onbellek_olustur(ayarlar):
+    """Uygulama ayarlarına göre önbellek nesnesini oluşturur
+    
+    ONBELLEK_TURU 'bellek' (varsayılan) veya 'redis' olabilir. 'redis' için redis paketi
+    kurulu olmalı ve ONBELLEK_REDIS_URL ayarlanmış olmalıdır.
+    """
+    tur = ayarlar.get('ONBELLEK_TURU', 'bellek')
+    sure = ayarlar.get('ONBELLEK_SURESI', 60)
+    if tur == 'redis':
+        import redis  # Opsiyonel bağımlılık - Sadece Redis kullanılıyorsa gerekli
+        istemci = redis.Redis.from_url(ayarlar['ONBELLEK_REDIS_URL'])
+        return RedisOnbellek(istemci, varsayilan_sure=sure)
+    if tur == 'bellek':
+        return BellekOnbellek(boyut=ayarlar.get('ONBELLEK_BOYUTU', 10000), varsayilan_sure=sure)
+    raise ValueError(f"Bilinmeyen önbellek türü: {tur}")
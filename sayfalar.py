@@ -0,0 +1,618 @@
+"""
+BetikBank web sayfaları
+Tarayıcı arayüzünün route'larını ve Flask-Login kullanıcı yükleyicisini tanımlar. Route'lar
+modül import edilirken bir uygulamaya bağlanmaz; app.uygulama_olustur() web arayüzü
+istendiğinde sayfalari_kaydet() ile ekler. Endpoint adları (url_for('dashboard') vb.)
+fonksiyon adlarıdır.
+"""
+from flask import current_app, render_template, request, redirect, url_for, flash, session, Response, stream_with_context, jsonify, abort  # Web route'ları için
+from flask_login import LoginManager, login_user, login_required, logout_user, current_user  # Kullanıcı oturum yönetimi için
+from datetime import datetime, date, timedelta  # Tarih/saat işlemleri için
+import csv  # Hesap ekstresi dışa aktarımı için
+import io  # CSV satırlarını bellekte oluşturmak için
+from decimal import Decimal  # Kuruş hassasiyetinde para hesabı için
+import secrets  # Tahmin edilemeyen anahtarlar üretmek için
+from degerleme import ENSTRUMANLAR, VARSAYILAN_FIYATLAR  # Yatırım türü -> enstrüman ve başlangıç fiyatları
+from modeller import db, tutar_coz, User, Hesap, Islem, Kart, YatirimHesabi, EnstrumanFiyati, TransferTalimati
+from servisler import (sifre_hashleyici, TransferHatasi, transfer_yap, bakiye_dus, hesaplari_kilitle, olay_ekle,
+                       islem_anahtari_gecerli_mi, GECERSIZ_ISLEM_ANAHTARI,
+                       hareket_sorgusu, hareket_tablolari, islem_sayfasi, bakiye_tarihinde, kart_numarasi_uret,
+                       cvv_uret, yatirim_hesap_no_uret, kart_onbellegini_temizle, TALIMAT_SIKLIKLARI,
+                       talimat_olustur, dashboard_verisi, dashboard_onbellegini_temizle, ay_coz, aylik_analiz,
+                       toplam_bakiye, kullanici_getir, kullanici_onbellegini_temizle, kimlik_dogrula)
+
+# Login manager - Her web uygulamasına sayfalari_kaydet() ile bağlanır
+login_manager = LoginManager()  # Login manager nesnesi
+login_manager.login_view = 'login'  # Giriş gerektiren sayfalarda yönlendirilecek sayfa
+login_manager.login_message = 'Bu sayfaya erişmek için giriş yapmalısınız.'  # Giriş gerektiren sayfalarda gösterilecek mesaj
+
+ROTALAR = []  # (kural, fonksiyon, seçenekler) - sayfalari_kaydet() ile uygulamaya eklenir
+
+def rota(kural, **secenekler):
+    """Fonksiyonu web route'u olarak kaydeden dekoratör (app.route ile aynı seçenekleri alır)"""
+    def kaydet(fonksiyon):
+        ROTALAR.append((kural, fonksiyon, secenekler))
+        return fonksiyon
+    return kaydet
+
+def sayfalari_kaydet(app):
+    """Web route'larını ve login manager'ı uygulamaya ekler"""
+    login_manager.init_app(app)  # Login manager'ı uygulamaya bağla
+    for kural, fonksiyon, secenekler in ROTALAR:
+        app.add_url_rule(kural, fonksiyon.__name__, fonksiyon, **secenekler)
+
+# ============================================
+# KULLANICI YÜKLEME FONKSİYONU
+# ============================================
+
+@login_manager.user_loader
+def load_user(user_id):
+    """Session'dan kullanıcı ID'sini alıp oturum kullanıcısını döndürür (önbellekten veya veritabanından)"""
+    return kullanici_getir(user_id, session.get('kullanici_surumu', 0))
+
+# ============================================
+# ROUTE FONKSİYONLARI
+# ============================================
+
+# Ana Sayfa - Giriş yapılmamışsa ana sayfa, yapılmışsa dashboard'a yönlendir
+@rota('/')
+def index():
+    """Ana sayfa route'u - Giriş yapılmışsa dashboard'a yönlendirir"""
+    if current_user.is_authenticated:  # Kullanıcı giriş yapmışsa
+        return redirect(url_for('dashboard'))  # Dashboard'a yönlendir
+    return render_template('index.html')  # Giriş yapılmamışsa ana sayfayı göster
+
+# Kayıt Ol - Yeni kullanıcı kaydı için route
+@rota('/register', methods=['GET', 'POST'])
+def register():
+    """Kullanıcı kayıt sayfası - GET: form gösterir, POST: kayıt işlemini yapar"""
+    if request.method == 'POST':  # Form gönderildiyse
+        # Form verilerini al
+        tc_no = request.form.get('tc_no')
+        ad = request.form.get('ad')
+        soyad = request.form.get('soyad')
+        email = request.form.get('email')
+        telefon = request.form.get('telefon')
+        password = request.form.get('password')
+        password_confirm = request.form.get('password_confirm')
+        
+        # Validasyon kontrolleri
+        # TC Kimlik Numarası kontrolü - Aynı TC ile kayıt var mı?
+        if User.query.filter_by(tc_no=tc_no).first():
+            flash('Bu TC Kimlik Numarası ile zaten bir hesap bulunmaktadır.', 'error')
+            return redirect(url_for('register'))
+        
+        # E-posta kontrolü - Aynı e-posta ile kayıt var mı?
+        if User.query.filter_by(email=email).first():
+            flash('Bu e-posta adresi ile zaten bir hesap bulunmaktadır.', 'error')
+            return redirect(url_for('register'))
+        
+        # Şifre eşleşme kontrolü
+        if password != password_confirm:
+            flash('Şifreler eşleşmiyor.', 'error')
+            return redirect(url_for('register'))
+        
+        # TC Kimlik Numarası format kontrolü - 11 haneli ve sadece rakam olmalı
+        if len(tc_no) != 11 or not tc_no.isdigit():
+            flash('TC Kimlik Numarası 11 haneli olmalıdır.', 'error')
+            return redirect(url_for('register'))
+        
+        # Yeni kullanıcı oluştur
+        new_user = User(
+            tc_no=tc_no,
+            ad=ad,
+            soyad=soyad,
+            email=email,
+            telefon=telefon,
+            password_hash=sifre_hashleyici.hashle(password)  # Şifreyi hashle ve sakla
+        )
+        
+        db.session.add(new_user)  # Kullanıcıyı veritabanına ekle
+        db.session.commit()  # Değişiklikleri kaydet
+        
+        # Otomatik hesap oluştur - Her yeni kullanıcıya otomatik vadesiz hesap açılır
+        hesap_no = f"{tc_no}{new_user.id:05d}"[:16]  # TC + kullanıcı ID'sinden hesap numarası oluştur
+        new_hesap = Hesap(
+            hesap_no=hesap_no,
+            kullanici_id=new_user.id,
+            bakiye=0,  # Başlangıç bakiyesi sıfır
+            hesap_turu='Vadesiz'
+        )
+        
+        db.session.add(new_hesap)  # Hesabı veritabanına ekle
+        db.session.commit()  # Değişiklikleri kaydet
+        
+        flash('Kayıt başarılı! Giriş yapabilirsiniz.', 'success')
+        return redirect(url_for('login'))  # Giriş sayfasına yönlendir
+    
+    return render_template('register.html')  # GET isteği için kayıt formunu göster
+
+# Giriş Yap - Kullanıcı girişi için route
+@rota('/login', methods=['GET', 'POST'])
+def login():
+    """Kullanıcı giriş sayfası - GET: form gösterir, POST: giriş işlemini yapar"""
+    if request.method == 'POST':  # Form gönderildiyse
+        # Form verilerini al
+        tc_no = request.form.get('tc_no')
+        password = request.form.get('password')
+        
+        # Kullanıcı var mı ve şifre doğru mu kontrol et
+        user = kimlik_dogrula(tc_no, password)
+        if user:
+            login_user(user)  # Kullanıcıyı oturuma al
+            kullanici_onbellegini_temizle(user.id)  # Oturum kullanıcısı bir sonraki istekte güncel haliyle yüklenir
+            flash(f'Hoş geldiniz, {user.ad} {user.soyad}!', 'success')
+            return redirect(url_for('dashboard'))  # Dashboard'a yönlendir
+        else:
+            flash('TC Kimlik Numarası veya şifre hatalı.', 'error')
+    
+    return render_template('login.html')  # GET isteği için giriş formunu göster
+
+# Çıkış Yap - Kullanıcı oturumunu sonlandırır
+@rota('/logout')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def logout():
+    """Kullanıcı çıkış işlemi - Oturumu sonlandırır ve ana sayfaya yönlendirir"""
+    kullanici_onbellegini_temizle(current_user.id)  # Oturum kapanınca önbellekteki kullanıcıyı bırak
+    logout_user()  # Kullanıcı oturumunu kapat
+    flash('Başarıyla çıkış yaptınız.', 'info')
+    return redirect(url_for('index'))  # Ana sayfaya yönlendir
+
+# Dashboard - Ana kontrol paneli
+@rota('/dashboard')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def dashboard():
+    """Kullanıcı dashboard sayfası - Hesaplar, kartlar, yatırımlar ve son işlemleri gösterir"""
+    # Hesaplar, aktif kartlar, aktif yatırım hesapları ve son 10 işlem (önbellekten)
+    veri = dashboard_verisi(current_user.id)
+    return render_template('dashboard.html', **veri)
+
+# Para Transferi - Hesaplar arası para transferi
+@rota('/transfer', methods=['GET', 'POST'])
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def transfer():
+    """Para transferi sayfası - GET: form gösterir, POST: transfer işlemini yapar"""
+    if request.method == 'POST':  # Form gönderildiyse
+        # Form verilerini al
+        gonderen_hesap_id = request.form.get('gonderen_hesap', type=int)
+        alici_hesap_no = request.form.get('alici_hesap_no')
+        tutar = tutar_coz(request.form.get('tutar'))
+        aciklama = request.form.get('aciklama', '')  # Açıklama opsiyonel
+        # İstemci anahtarı - Aynı formun tekrar gönderilmesi transferi ikinci kez uygulamaz
+        islem_anahtari = request.headers.get('Idempotency-Key') or request.form.get('islem_anahtari')
+        if not islem_anahtari_gecerli_mi(islem_anahtari):  # Anahtar form tarafından üretilir; bozuksa istek geçersiz
+            abort(400, GECERSIZ_ISLEM_ANAHTARI)
+        
+        # Validasyon kontrolleri
+        # Tutar kontrolü - Sayısal bir değer girilmiş mi?
+        if tutar is None:
+            flash('Geçersiz transfer tutarı.', 'error')
+            return redirect(url_for('transfer'))
+        
+        # Gönderen hesap kontrolü - Hesap kullanıcıya ait mi? (oturumdaki hesap listesinden, sorgusuz)
+        if not current_user.hesabi_mi(gonderen_hesap_id):
+            flash('Geçersiz gönderen hesap.', 'error')
+            return redirect(url_for('transfer'))
+        
+        # Alıcı hesap kontrolü - Hesap bulunuyor mu?
+        alici_hesap = Hesap.query.filter_by(hesap_no=alici_hesap_no).first()
+        if not alici_hesap:
+            flash('Alıcı hesap bulunamadı.', 'error')
+            return redirect(url_for('transfer'))
+        
+        # İleri tarihli veya düzenli transfer - Talimat kaydedilir, zamanlayıcı çalıştırır
+        zamanlama = request.form.get('zamanlama', 'Hemen')
+        if zamanlama != 'Hemen':
+            try:
+                ilk_calisma = datetime.fromisoformat(request.form.get('ilk_tarih', ''))
+                talimat_olustur(current_user.id, gonderen_hesap_id, alici_hesap.id, tutar, zamanlama,
+                                ilk_calisma, aciklama=aciklama)
+            except ValueError:
+                flash('Geçersiz talimat tarihi.', 'error')
+                return redirect(url_for('transfer'))
+            except TransferHatasi as hata:
+                flash(str(hata), 'error')
+                return redirect(url_for('transfer'))
+            flash('Transfer talimatı oluşturuldu.', 'success')
+            return redirect(url_for('scheduled_transfers'))
+        
+        # Transfer işlemi - Bakiye kontrolü ve güncelleme veritabanında atomik olarak yapılır
+        try:
+            yeni_islem, yeni_mi = transfer_yap(
+                gonderen_hesap_id,
+                alici_hesap.id,
+                tutar,
+                aciklama=aciklama,
+                kullanici_id=current_user.id,
+                anahtar=islem_anahtari
+            )
+        except TransferHatasi as hata:
+            flash(str(hata), 'error')
+            return redirect(url_for('transfer'))
+        
+        dashboard_onbellegini_temizle(current_user.id, alici_hesap.kullanici_id)  # Her iki tarafın bakiyesi değişti
+        
+        if yeni_mi:
+            flash(f'{tutar:.2f} TL başarıyla transfer edildi.', 'success')
+        else:
+            flash('Bu transfer daha önce gerçekleştirildi, tekrar uygulanmadı.', 'info')
+        return redirect(url_for('dashboard'))  # Dashboard'a yönlendir
+    
+    # GET isteği için transfer formunu göster (her form için yeni bir işlem anahtarı üretilir)
+    hesaplar = Hesap.query.filter_by(kullanici_id=current_user.id).all()  # Gönderen hesap seçimi için
+    return render_template('transfer.html', hesaplar=hesaplar, islem_anahtari=secrets.token_urlsafe(16),
+                           siklikler=TALIMAT_SIKLIKLARI, bugun=datetime.utcnow().date())
+
+# Transfer Talimatları - İleri tarihli ve düzenli transferleri listele
+@rota('/transfer/scheduled')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def scheduled_transfers():
+    """Talimatlar sayfası - Kullanıcının iptal edilmemiş transfer talimatlarını gösterir"""
+    gonderen = db.aliased(Hesap)
+    alici = db.aliased(Hesap)
+    talimatlar = db.session.execute(
+        db.select(TransferTalimati.id, TransferTalimati.tutar, TransferTalimati.aciklama, TransferTalimati.siklik,
+                  TransferTalimati.planlanan_tarih, TransferTalimati.durum, TransferTalimati.son_calisma,
+                  TransferTalimati.son_hata, gonderen.hesap_no.label('gonderen_hesap_no'),
+                  alici.hesap_no.label('alici_hesap_no'))
+        .join(gonderen, gonderen.id == TransferTalimati.gonderen_hesap_id)
+        .join(alici, alici.id == TransferTalimati.alici_hesap_id)
+        .where(TransferTalimati.kullanici_id == current_user.id, TransferTalimati.durum != 'İptal')
+        .order_by(TransferTalimati.planlanan_tarih)
+    ).all()
+    return render_template('scheduled_transfers.html', talimatlar=talimatlar)
+
+# Talimat İptali
+@rota('/transfer/scheduled/<int:talimat_id>/cancel', methods=['POST'])
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def cancel_scheduled_transfer(talimat_id):
+    """Kullanıcının aktif talimatını iptal eder (zamanlayıcının o an çalıştırdığı talimat iptal edilemez)"""
+    kullanicinin = db.and_(TransferTalimati.id == talimat_id, TransferTalimati.kullanici_id == current_user.id)
+    iptal_edilen = db.session.execute(
+        db.update(TransferTalimati)
+        .where(kullanicinin, TransferTalimati.durum == 'Aktif')
+        .values(durum='İptal', isleyici=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if iptal_edilen:
+        flash('Talimat iptal edildi.', 'success')
+    elif db.session.scalar(db.select(TransferTalimati.durum).where(kullanicinin)) == 'İşleniyor':
+        flash('Talimat şu anda çalıştırılıyor. Birkaç saniye sonra tekrar deneyin.', 'error')
+    else:
+        flash('Talimat bulunamadı veya zaten sonlanmış.', 'error')
+    return redirect(url_for('scheduled_transfers'))
+
+# İşlem Geçmişi - Tüm işlemleri görüntüleme
+@rota('/transactions')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def transactions():
+    """İşlem geçmişi sayfası - Tüm hesaplardan veya seçili hesaptan işlemleri gösterir"""
+    # Kullanıcının tüm hesaplarını getir
+    hesaplar = Hesap.query.filter_by(kullanici_id=current_user.id).all()
+    
+    # URL parametresinden hesap ID'sini al (filtreleme için)
+    hesap_id = request.args.get('hesap_id', type=int)
+    
+    if hesap_id:  # Belirli bir hesap seçilmişse
+        # Hesap kullanıcıya ait mi kontrol et (oturumdaki hesap listesinden, sorgusuz)
+        if current_user.hesabi_mi(hesap_id):
+            sayfa = islem_sayfasi([hesap_id])  # Bu hesabın gönderdiği ve aldığı işlemler
+        else:
+            sayfa = islem_sayfasi([])  # Geçersiz hesap seçilmişse boş sayfa
+    else:
+        # Tüm hesaplardan işlemleri getir (tarihe göre sıralı, en yeni önce)
+        sayfa = islem_sayfasi(sorted(current_user.hesap_idleri))
+    
+    return render_template('transactions.html', hesaplar=hesaplar, islemler=sayfa['islemler'], sayfa=sayfa, selected_hesap_id=hesap_id)
+
+# Hesap Detayları - Belirli bir hesabın detaylarını göster
+@rota('/account/<int:hesap_id>')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def account_detail(hesap_id):
+    """Hesap detay sayfası - Hesap bilgilerini ve işlem geçmişini gösterir"""
+    # Hesabı veritabanından getir (yoksa 404 hatası)
+    hesap = Hesap.query.get_or_404(hesap_id)
+    
+    # Yetki kontrolü - Hesap kullanıcıya ait mi?
+    if not current_user.hesabi_mi(hesap.id):
+        flash('Bu hesaba erişim yetkiniz yok.', 'error')
+        return redirect(url_for('dashboard'))
+    
+    # Bu hesaptan gönderilen ve alınan işlemlerin bir sayfasını getir (tarihe göre sıralı, en yeni önce)
+    sayfa = islem_sayfasi([hesap.id])
+    
+    return render_template('account_detail.html', hesap=hesap, islemler=sayfa['islemler'], sayfa=sayfa)
+
+# Hesap Ekstresi - Belirli bir hesabın işlem geçmişini CSV olarak indir
+@rota('/account/<int:hesap_id>/statement.csv')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def account_statement(hesap_id):
+    """Hesap ekstresi - Seçilen tarih aralığındaki işlemleri CSV dosyası olarak akış halinde gönderir"""
+    # Hesabı veritabanından getir (yoksa 404 hatası)
+    hesap = Hesap.query.get_or_404(hesap_id)
+    
+    # Yetki kontrolü - Hesap kullanıcıya ait mi?
+    if not current_user.hesabi_mi(hesap.id):
+        flash('Bu hesaba erişim yetkiniz yok.', 'error')
+        return redirect(url_for('dashboard'))
+    
+    # Tarih aralığını al (YYYY-MM-DD, her iki uç dahil) - Verilmezse tüm geçmiş
+    baslangic = request.args.get('baslangic', type=date.fromisoformat)  # Geçersizse None döner
+    bitis = request.args.get('bitis', type=date.fromisoformat)
+    if (request.args.get('baslangic') and baslangic is None) or (request.args.get('bitis') and bitis is None):
+        flash('Geçersiz tarih aralığı.', 'error')
+        return redirect(url_for('account_detail', hesap_id=hesap.id))
+    
+    baslangic_ani = datetime.combine(baslangic, datetime.min.time()) if baslangic else None
+    bitis_ani = datetime.combine(bitis + timedelta(days=1), datetime.min.time()) if bitis else None
+    
+    # Eskiden yeniye sıralı, sınırsız sorgular - Aralık arşive uzanıyorsa önce arşiv okunur
+    sorgular = [hareket_sorgusu([hesap.id], yon='yeni', baslangic=baslangic_ani, bitis=bitis_ani, tablo=tablo)
+                for tablo in hareket_tablolari(baslangic_ani, bitis_ani)]
+    acilis_bakiye = bakiye_tarihinde(hesap.id, baslangic_ani - timedelta(microseconds=1)) if baslangic_ani else None
+    
+    def satirlar():
+        """CSV satırlarını üretir - Bellekte en fazla bir parça satır tutulur"""
+        tampon = io.StringIO()
+        yazici = csv.writer(tampon)
+        
+        def _bosalt():
+            veri = tampon.getvalue()
+            tampon.seek(0)
+            tampon.truncate()
+            return veri
+        
+        tampon.write('\ufeff')  # Excel'in UTF-8 olarak açması için BOM
+        yazici.writerow(['Tarih', 'Açıklama', 'İşlem Türü', 'Gönderen Hesap', 'Alıcı Hesap', 'Tutar', 'Bakiye'])
+        if acilis_bakiye is not None:
+            yazici.writerow([baslangic_ani.strftime('%d.%m.%Y %H:%M'), 'Açılış Bakiyesi', '', '', '', '', acilis_bakiye])
+        yield _bosalt()
+        
+        parca_boyutu = current_app.config['EKSTRE_PARCA_BOYUTU']
+        # ORM katmanı atlanarak doğrudan bağlantı üzerinden okunur (satır başına daha az iş)
+        for sorgu in sorgular:
+            sonuc = db.session.connection().execute(sorgu, execution_options={'yield_per': parca_boyutu})
+            for parca in sonuc.partitions():
+                for islem in parca:
+                    yazici.writerow([
+                        islem.tarih.strftime('%d.%m.%Y %H:%M'),
+                        islem.aciklama or '',
+                        islem.islem_turu,
+                        islem.gonderen_hesap_no,
+                        islem.alici_hesap_no,
+                        islem.tutar if islem.gelen else -islem.tutar,
+                        islem.bakiye_sonrasi if islem.bakiye_sonrasi is not None else '',
+                    ])
+                yield _bosalt()
+    
+    dosya_adi = f"ekstre_{hesap.hesap_no}.csv"
+    return Response(
+        stream_with_context(satirlar()),  # Uzunluk bilinmediği için parça parça (chunked) gönderilir
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={dosya_adi}'}
+    )
+
+# Harcama Analizi - Aylık giriş/çıkış özetleri
+@rota('/analytics')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def analytics():
+    """Harcama analizi sayfası - Seçilen ayın hesap ve işlem türü bazında toplamlarını gösterir"""
+    # Ay parametresi (YYYY-MM) - Verilmezse içinde bulunulan ay
+    secilen = ay_coz(request.args.get('ay') or datetime.utcnow().strftime('%Y-%m'))
+    if secilen is None:
+        flash('Geçersiz ay.', 'error')
+        return redirect(url_for('analytics'))
+    yil, ay = secilen
+    
+    analiz = aylik_analiz(current_user.id, current_user.hesap_idleri, yil, ay)
+    onceki_ay = f'{yil - 1}-12' if ay == 1 else f'{yil}-{ay - 1:02d}'
+    sonraki_ay = f'{yil + 1}-01' if ay == 12 else f'{yil}-{ay + 1:02d}'
+    return render_template('analytics.html', analiz=analiz, toplam_bakiye=toplam_bakiye(current_user.id),
+                           onceki_ay=onceki_ay, sonraki_ay=sonraki_ay)
+
+# Harcama Analizi (JSON) - Aynı verinin JSON hali
+@rota('/analytics.json')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def analytics_json():
+    """Harcama analizi verisini JSON olarak döndürür (tutarlar metin olarak, ör. "125.50")"""
+    secilen = ay_coz(request.args.get('ay') or datetime.utcnow().strftime('%Y-%m'))
+    if secilen is None:
+        return jsonify({'hata': 'Geçersiz ay. YYYY-MM biçiminde olmalıdır.'}), 400
+    analiz = aylik_analiz(current_user.id, current_user.hesap_idleri, *secilen)
+    return jsonify(dict(analiz, toplam_bakiye=toplam_bakiye(current_user.id)))
+
+# Profil - Kullanıcı profil bilgilerini göster
+@rota('/profile')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def profile():
+    """Kullanıcı profil sayfası - Kullanıcı bilgilerini gösterir"""
+    return render_template('profile.html', user=current_user)
+
+# Kartlar - Kullanıcının tüm kartlarını listele
+@rota('/cards')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def cards():
+    """Kartlar listesi sayfası - Kullanıcının tüm kartlarını gösterir"""
+    # Kullanıcının tüm kartlarını getir (en yeni olanlar önce)
+    kartlar = Kart.query.filter_by(kullanici_id=current_user.id).order_by(Kart.created_at.desc()).all()
+    return render_template('cards.html', kartlar=kartlar)
+
+# Yeni Kart Oluştur - Yeni banka kartı oluşturma
+@rota('/cards/new', methods=['GET', 'POST'])
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def new_card():
+    """Yeni kart oluşturma sayfası - GET: form gösterir, POST: kart oluşturur"""
+    if request.method == 'POST':  # Form gönderildiyse
+        # Form verilerini al
+        hesap_id = request.form.get('hesap_id', type=int)
+        kart_turu = request.form.get('kart_turu')
+        
+        # Hesap kontrolü - Hesap kullanıcıya ait mi? (oturumdaki hesap listesinden, sorgusuz)
+        if not current_user.hesabi_mi(hesap_id):
+            flash('Geçersiz hesap seçimi.', 'error')
+            return redirect(url_for('new_card'))
+        
+        # Kart numarası oluştur (16 haneli, sayaçtan üretildiği için benzersiz - yoklama sorgusu yok)
+        kart_no = kart_numarasi_uret()
+        
+        # Son kullanım tarihi hesapla (3 yıl sonra)
+        son_kullanim = datetime.now() + timedelta(days=3*365)
+        son_kullanim_str = son_kullanim.strftime('%m/%y')  # MM/YY formatında
+        
+        # CVV oluştur (3 haneli, tahmin edilemez rastgele sayı)
+        cvv = cvv_uret()
+        
+        # Limit belirleme - Sadece kredi kartları için limit var
+        limit = Decimal(0)
+        if kart_turu == 'Kredi Kartı':
+            limit = tutar_coz(request.form.get('limit', 10000))  # Varsayılan limit: 10000 TL
+            if limit is None or limit < 0:
+                flash('Geçersiz kart limiti.', 'error')
+                return redirect(url_for('new_card'))
+        
+        # Yeni kart oluştur
+        yeni_kart = Kart(
+            kart_no=kart_no,
+            kullanici_id=current_user.id,
+            hesap_id=hesap_id,
+            kart_turu=kart_turu,
+            son_kullanim_tarihi=son_kullanim_str,
+            cvv=cvv,
+            kart_sahibi_adi=f"{current_user.ad} {current_user.soyad}",  # Kart sahibi adı
+            limit=limit,
+            durum='Aktif'  # Yeni kartlar aktif olarak oluşturulur
+        )
+        
+        db.session.add(yeni_kart)  # Kartı veritabanına ekle
+        db.session.commit()  # Değişiklikleri kaydet
+        dashboard_onbellegini_temizle(current_user.id)  # Dashboard'daki kart listesi değişti
+        kart_onbellegini_temizle(kart_no)  # Numara daha önce 'bilinmeyen kart' olarak önbelleğe alınmış olabilir
+        
+        flash(f'{kart_turu} başarıyla oluşturuldu!', 'success')
+        return redirect(url_for('cards'))  # Kartlar sayfasına yönlendir
+    
+    # Kullanıcının hesaplarını getir (kart bağlanacak hesap seçimi için)
+    hesaplar = Hesap.query.filter_by(kullanici_id=current_user.id).all()
+    return render_template('new_card.html', hesaplar=hesaplar)  # GET isteği için form göster
+
+# Yatırım Hesapları - Kullanıcının yatırım hesaplarını listele
+@rota('/investment')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def investment():
+    """Yatırım hesapları listesi sayfası - Kullanıcının tüm yatırım hesaplarını gösterir"""
+    # Kullanıcının tüm yatırım hesaplarını getir (en yeni olanlar önce)
+    yatirim_hesaplari = YatirimHesabi.query.filter_by(kullanici_id=current_user.id).order_by(YatirimHesabi.created_at.desc()).all()
+    return render_template('investment.html', yatirim_hesaplari=yatirim_hesaplari)
+
+# Yeni Yatırım Hesabı Aç - Yeni yatırım hesabı oluşturma
+@rota('/investment/new', methods=['GET', 'POST'])
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def new_investment():
+    """Yeni yatırım hesabı açma sayfası - GET: form gösterir, POST: hesap açar"""
+    if request.method == 'POST':  # Form gönderildiyse
+        # Form verilerini al
+        yatirim_turu = request.form.get('yatirim_turu')
+        baslangic_tutar = tutar_coz(request.form.get('baslangic_tutar') or 0)  # Başlangıç tutarı (opsiyonel)
+        if yatirim_turu not in ENSTRUMANLAR:
+            flash('Geçersiz yatırım türü.', 'error')
+            return redirect(url_for('new_investment'))
+        if baslangic_tutar is None or baslangic_tutar < 0:
+            flash('Geçersiz başlangıç tutarı.', 'error')
+            return redirect(url_for('new_investment'))
+        
+        # Hesap numarası oluştur (Y + 15 haneli sıra numarası) - Bakiye düşülmeden önce alınır
+        hesap_no = yatirim_hesap_no_uret()
+        
+        # Ana hesaptan para çek (eğer başlangıç tutarı belirtilmişse)
+        if baslangic_tutar > 0:
+            # Vadesiz hesabı bul
+            ana_hesap = Hesap.query.filter_by(kullanici_id=current_user.id, hesap_turu='Vadesiz').first()
+            if not ana_hesap:
+                flash('Vadesiz hesabınız bulunamadı.', 'error')
+                return redirect(url_for('new_investment'))
+            
+            # Vadesiz hesaptan para çek - Bakiye kontrolü ve düşme tek bir koşullu UPDATE ile yapılır
+            hesaplari_kilitle([ana_hesap.id])
+            yeni_bakiye = bakiye_dus(ana_hesap.id, baslangic_tutar)
+            if yeni_bakiye is None:
+                flash('Yetersiz bakiye. Yatırım hesabını başlangıç tutarı olmadan açabilirsiniz.', 'error')
+                return redirect(url_for('new_investment'))
+            
+            # İşlem kaydı oluştur
+            yeni_islem = Islem(
+                gonderen_hesap_id=ana_hesap.id,
+                alici_hesap_id=ana_hesap.id,  # Yatırım hesabına geçti sayılır (aynı hesap)
+                tutar=baslangic_tutar,
+                aciklama=f'Yatırım Hesabı Açılışı - {yatirim_turu}',
+                islem_turu='Yatırım',
+                gonderen_bakiye_sonrasi=yeni_bakiye,
+                alici_bakiye_sonrasi=yeni_bakiye
+            )
+            db.session.add(yeni_islem)  # İşlemi veritabanına ekle
+        
+        # Yeni yatırım hesabı oluştur - Başlangıç tutarıyla enstrümanın güncel fiyatından alım yapılır
+        enstruman = ENSTRUMANLAR[yatirim_turu]
+        fiyat = db.session.get(EnstrumanFiyati, enstruman)
+        yeni_yatirim = YatirimHesabi(
+            hesap_no=hesap_no,
+            kullanici_id=current_user.id,
+            yatirim_turu=yatirim_turu,
+            toplam_bakiye=baslangic_tutar,  # Başlangıç bakiyesi
+            kar_zarar=0,  # Başlangıçta kar/zarar yok
+            durum='Aktif',  # Yeni hesaplar aktif olarak açılır
+            enstruman=enstruman,
+            miktar=float(baslangic_tutar) / (fiyat.fiyat if fiyat else VARSAYILAN_FIYATLAR[enstruman]),
+            maliyet=baslangic_tutar
+        )
+        
+        db.session.add(yeni_yatirim)  # Yatırım hesabını veritabanına ekle
+        db.session.flush()  # Olay için id'leri al
+        olay_ekle('yatirim.acildi', {
+            'yatirim_hesabi_id': yeni_yatirim.id,
+            'hesap_no': hesap_no,
+            'kullanici_id': current_user.id,
+            'yatirim_turu': yatirim_turu,
+            'baslangic_tutar': baslangic_tutar,
+            'islem_id': yeni_islem.id if baslangic_tutar > 0 else None,
+        })
+        db.session.commit()  # Bakiye, işlem, yatırım hesabı ve olay birlikte kaydedilir
+        dashboard_onbellegini_temizle(current_user.id)  # Bakiye ve yatırım listesi değişti
+        
+        flash(f'{yatirim_turu} yatırım hesabı başarıyla açıldı!', 'success')
+        return redirect(url_for('investment'))  # Yatırım hesapları sayfasına yönlendir
+    
+    # GET isteği için toplam bakiyeyi hesapla (formda gösterilmek üzere)
+    # Tüm hesapların toplam bakiyesi (veritabanında toplanır)
+    return render_template('new_investment.html', toplam_bakiye=toplam_bakiye(current_user.id))
+
+# Kart Detay - Belirli bir kartın detaylarını göster
+@rota('/card/<int:kart_id>')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def card_detail(kart_id):
+    """Kart detay sayfası - Kart bilgilerini gösterir"""
+    # Kartı veritabanından getir (yoksa 404 hatası)
+    kart = Kart.query.get_or_404(kart_id)
+    
+    # Yetki kontrolü - Kart kullanıcıya ait mi?
+    if kart.kullanici_id != current_user.id:
+        flash('Bu karta erişim yetkiniz yok.', 'error')
+        return redirect(url_for('cards'))
+    
+    return render_template('card_detail.html', kart=kart)
+
+# Yatırım Hesabı Detay - Belirli bir yatırım hesabının detaylarını göster
+@rota('/investment/<int:yatirim_id>')
+@login_required  # Sadece giriş yapmış kullanıcılar erişebilir
+def investment_detail(yatirim_id):
+    """Yatırım hesabı detay sayfası - Yatırım hesabı bilgilerini gösterir"""
+    # Yatırım hesabını veritabanından getir (yoksa 404 hatası)
+    yatirim = YatirimHesabi.query.get_or_404(yatirim_id)
+    
+    # Yetki kontrolü - Yatırım hesabı kullanıcıya ait mi?
+    if yatirim.kullanici_id != current_user.id:
+        flash('Bu yatırım hesabına erişim yetkiniz yok.', 'error')
+        return redirect(url_for('investment'))
+    
+    fiyat = db.session.get(EnstrumanFiyati, yatirim.enstruman) if yatirim.enstruman else None  # Son değerleme fiyatı
+    return render_template('investment_detail.html', yatirim=yatirim, fiyat=fiyat)
@@ -0,0 +1,305 @@
+"""
+BetikBank şema güncellemeleri (migration)
+Veritabanı şemasını modellerle aynı sürüme getiren numaralı güncellemeleri ve bunları
+uygulayan veritabani_hazirla() fonksiyonunu tanımlar. Uygulanan sürümler sema_surumu
+tablosunda tutulur. Güncellemeler uygulama açılışında değil, 'flask --app yonetim
+sema-guncelle' (veya geliştirmede 'python app.py') ile çalıştırılır.
+"""
+from sqlalchemy.schema import CreateTable  # Şema güncellemelerinde tablo yeniden oluşturmak için
+from degerleme import ENSTRUMANLAR  # Yatırım türü -> enstrüman kodu
+from modeller import (db, Hesap, Islem, IslemArsivi, IslemArsivDonemi, Kart, YatirimHesabi, EnstrumanFiyati,
+                      HesapGunlukOzet, IslemAnahtari, ApiTokeni, NumaraSayaci, OlayKutusu, TransferTalimati,
+                      SemaSurumu, KREDI_KARTI_HARCAMASI)
+from servisler import gunluk_ozetleri_yeniden_hesapla, istek_parmak_izi, kart_anahtar_kapsami  # Veri düzelten güncellemeler için
+
+# ============================================
+# ŞEMA GÜNCELLEMELERİ
+# ============================================
+
+# Şema yalnızca bu güncellemelerle değişir; uygulama açılırken tablo oluşturulmaz veya
+# şemaya bakılmaz. Sıfırdan kurulumda tüm tablolar güncel modellerle bir kez oluşturulur ve
+# bütün güncellemeler uygulanmış sayılır. Mevcut veritabanına sadece henüz uygulanmamış
+# güncellemeler sırayla uygulanır. Modele yeni tablo, kolon veya indeks eklendiğinde
+# SEMA_GUNCELLEMELERI listesinin sonuna bir güncelleme eklenmelidir.
+
+def _guncelleme_islem_indeksleri():
+    """Islem tablosuna (hesap, tarih) bileşik indekslerini ekler"""
+    for indeks in Islem.__table__.indexes:
+        indeks.create(db.engine, checkfirst=True)  # Varsa atla
+
+def _guncelleme_hesap_indeksleri():
+    """Hesap tablosuna (kullanıcı, hesap türü) indeksini ekler"""
+    for indeks in Hesap.__table__.indexes:
+        indeks.create(db.engine, checkfirst=True)  # Varsa atla
+
+def _guncelleme_yatirim_pozisyonlari():
+    """Yatırım hesaplarına enstrüman, miktar ve maliyet kolonlarını ekler ve mevcut hesaplar için doldurur
+    
+    Maliyet, kayıtlı bakiye ile kar/zarar farkıdır. Miktar boş bırakılır; değerleme motoru
+    ilk yüklemede maliyeti güncel fiyata bölerek hesaplar.
+    """
+    tablo = YatirimHesabi.__table__
+    with db.engine.begin() as baglanti:
+        for kolon in ('enstruman', 'miktar', 'maliyet'):
+            _kolon_ekle(baglanti, tablo, tablo.c[kolon])
+        baglanti.execute(
+            db.update(tablo).values(
+                enstruman=db.case(*((tablo.c.yatirim_turu == tur, kod) for tur, kod in ENSTRUMANLAR.items()), else_='FON'),
+                maliyet=tablo.c.toplam_bakiye - db.func.coalesce(tablo.c.kar_zarar, 0),
+            )
+        )
+
+# Float'tan kuruş cinsinden tam sayıya taşınan para kolonları
+PARA_KOLONLARI = {
+    'hesap': ('bakiye',),
+    'islem': ('tutar',),
+    'kart': ('limit',),
+    'yatirim_hesabi': ('toplam_bakiye', 'kar_zarar'),
+}
+
+def _tablo_yeniden_olustur(baglanti, tablo, donusumler):
+    """Tabloyu güncel model tanımıyla yeniden oluşturur ve verileri taşır (SQLite kolon tipi değiştiremez)
+    
+    donusumler: {kolon adı: eski değeri dönüştüren SQL ifadesi}
+    Tablo yeni adla oluşturulup doldurulduktan sonra eskisi silinir ve yenisi yeniden
+    adlandırılır; böylece diğer tablolardaki yabancı anahtarlar doğru tabloyu göstermeye devam eder.
+    """
+    tirnak = baglanti.dialect.identifier_preparer.quote
+    
+    # Yabancı anahtarların çözülebilmesi için diğer tablolar da geçici metadata'ya kopyalanır
+    gecici = db.MetaData()
+    for diger in db.metadata.tables.values():
+        if diger is not tablo:
+            diger.to_metadata(gecici)
+    yeni = tablo.to_metadata(gecici, name=f'_yeni_{tablo.name}')
+    baglanti.execute(CreateTable(yeni))
+    
+    mevcut = {kolon['name'] for kolon in db.inspect(baglanti).get_columns(tablo.name)}
+    kolonlar = [kolon.name for kolon in tablo.columns if kolon.name in mevcut]
+    hedef = ', '.join(tirnak(kolon) for kolon in kolonlar)
+    kaynak = ', '.join(donusumler.get(kolon, tirnak(kolon)) for kolon in kolonlar)
+    baglanti.exec_driver_sql(f'INSERT INTO {tirnak(yeni.name)} ({hedef}) SELECT {kaynak} FROM {tirnak(tablo.name)}')
+    baglanti.exec_driver_sql(f'DROP TABLE {tirnak(tablo.name)}')
+    baglanti.exec_driver_sql(f'ALTER TABLE {tirnak(yeni.name)} RENAME TO {tirnak(tablo.name)}')
+    
+    for indeks in tablo.indexes:  # Eski tabloyla silinen indeksleri yeniden oluştur
+        indeks.create(baglanti)
+
+def _guncelleme_para_kurus():
+    """Float para kolonlarını kuruş cinsinden tam sayıya çevirir (ör. 12.34 TL -> 1234)"""
+    with db.engine.begin() as baglanti:
+        tirnak = baglanti.dialect.identifier_preparer.quote
+        for tablo_adi, kolonlar in PARA_KOLONLARI.items():
+            if baglanti.dialect.name == 'sqlite':
+                donusumler = {kolon: f'CAST(ROUND({tirnak(kolon)} * 100) AS INTEGER)' for kolon in kolonlar}
+                _tablo_yeniden_olustur(baglanti, db.metadata.tables[tablo_adi], donusumler)
+            else:
+                for kolon in kolonlar:
+                    baglanti.exec_driver_sql(
+                        f'ALTER TABLE {tirnak(tablo_adi)} ALTER COLUMN {tirnak(kolon)} '
+                        f'TYPE BIGINT USING CAST(ROUND({tirnak(kolon)} * 100) AS BIGINT)'
+                    )
+
+def _kolon_ekle(baglanti, tablo, kolon):
+    """Model kolonunu mevcut tabloya ekler (zaten varsa atlar)"""
+    mevcut = {k['name'] for k in db.inspect(baglanti).get_columns(tablo.name)}
+    if kolon.name in mevcut:
+        return
+    tirnak = baglanti.dialect.identifier_preparer.quote
+    tip = kolon.type.compile(dialect=baglanti.dialect)
+    baglanti.exec_driver_sql(f'ALTER TABLE {tirnak(tablo.name)} ADD COLUMN {tirnak(kolon.name)} {tip}')
+
+def _guncelleme_bakiye_sonrasi():
+    """Islem tablosuna işlem sonrası bakiye kolonlarını ekler ve geçmiş kayıtlar için doldurur
+    
+    Her hesabın güncel bakiyesinden başlanarak işlemler en yeniden en eskiye doğru geri
+    sarılır. Doğrudan bakiyeye yazılmış (işlem kaydı olmayan) eski yüklemeler varsa
+    hesaplanan değerler o yüklemeden önceki işlemler için yaklaşık olur.
+    """
+    islem_tablosu = Islem.__table__
+    with db.engine.begin() as baglanti:
+        _kolon_ekle(baglanti, islem_tablosu, islem_tablosu.c.gonderen_bakiye_sonrasi)
+        _kolon_ekle(baglanti, islem_tablosu, islem_tablosu.c.alici_bakiye_sonrasi)
+        for indeks in islem_tablosu.indexes:  # Modeldeki indeks kullanılır; yeni Index nesnesi metadata'ya eklenirdi
+            if indeks.name == 'ix_islem_tarih':
+                indeks.create(baglanti, checkfirst=True)
+        
+        bakiyeler = dict(baglanti.execute(db.select(Hesap.id, Hesap.bakiye)).all())  # Hesap id -> güncel bakiye
+        sorgu = (db.select(islem_tablosu.c.id, islem_tablosu.c.gonderen_hesap_id,
+                           islem_tablosu.c.alici_hesap_id, islem_tablosu.c.tutar)
+                 .order_by(islem_tablosu.c.tarih.desc(), islem_tablosu.c.id.desc()))
+        guncelleme = (db.update(islem_tablosu)
+                      .where(islem_tablosu.c.id == db.bindparam('i_id'))
+                      .values(gonderen_bakiye_sonrasi=db.bindparam('i_gonderen'),
+                              alici_bakiye_sonrasi=db.bindparam('i_alici')))
+        
+        degerler = []
+        for islem_id, gonderen_id, alici_id, tutar in baglanti.execute(sorgu).all():
+            degerler.append({'i_id': islem_id, 'i_gonderen': bakiyeler.get(gonderen_id),
+                             'i_alici': bakiyeler.get(alici_id)})
+            # İşlemi geri sar - Aynı hesaplı işlemler (yatırım çıkışı) sadece hesaptan düşer
+            if gonderen_id in bakiyeler:
+                bakiyeler[gonderen_id] += tutar
+            if alici_id != gonderen_id and alici_id in bakiyeler:
+                bakiyeler[alici_id] -= tutar
+        
+        for baslangic in range(0, len(degerler), 10000):
+            baglanti.execute(guncelleme, degerler[baslangic:baslangic + 10000])
+
+def _guncelleme_kart_limiti():
+    """Kart tablosuna kredi kartlarının kullanılan limit kolonunu ekler"""
+    kart_tablosu = Kart.__table__
+    with db.engine.begin() as baglanti:
+        _kolon_ekle(baglanti, kart_tablosu, kart_tablosu.c.kullanilan_limit)
+        baglanti.execute(db.update(kart_tablosu).where(kart_tablosu.c.kullanilan_limit.is_(None))
+                         .values(kullanilan_limit=0))
+
+def _guncelleme_eksik_tablolar():
+    """Kendi güncellemesi olmadan eklenmiş tabloları oluşturur (zaten varsa atlar)
+
+    Bu tablolar eskiden uygulama her açıldığında db.create_all() ile oluşturuluyordu.
+    Bu sürümden sonra eklenen her tablonun kendi güncellemesi olmalıdır.
+    """
+    tablolar = [model.__table__ for model in (HesapGunlukOzet, IslemAnahtari, ApiTokeni, NumaraSayaci, OlayKutusu,
+                                              IslemArsivi, IslemArsivDonemi, EnstrumanFiyati, TransferTalimati)]
+    with db.engine.begin() as baglanti:
+        db.metadata.create_all(baglanti, tables=tablolar, checkfirst=True)  # İndeksleriyle birlikte
+
+def _guncelleme_kredi_karti_harcamalari():
+    """Kredi kartı harcamalarını ayrı işlem türüne taşır ve etkilenen günlük özetleri yeniden hesaplar
+
+    Önceden kredi kartı harcamaları da 'Kart Harcaması' türüyle kaydediliyor ve hesaptan çıkış
+    sayılıyordu. Kredi kartı harcaması hesap bakiyesini değiştirmediğinden işlem sonrası bakiyesi
+    hesabın bir önceki işleminden sonraki bakiyeye eşittir; banka kartı harcamasında tutar kadar
+    düşüktür. Sadece sıcak tablodaki işlemler düzeltilir (kart harcamaları arşiv süresinden yenidir).
+    """
+    harcamalar = db.session.execute(
+        db.select(Islem.id, Islem.gonderen_hesap_id, Islem.tarih, Islem.tutar, Islem.gonderen_bakiye_sonrasi)
+        .where(Islem.islem_turu == 'Kart Harcaması', Islem.gonderen_hesap_id == Islem.alici_hesap_id)
+    ).all()
+
+    kredi_karti_idleri = []
+    gunler = set()
+    for islem_id, hesap_id, tarih, tutar, bakiye_sonrasi in harcamalar:
+        onceki = db.tuple_(Islem.tarih, Islem.id) < db.tuple_(tarih, islem_id)
+        gonderilen = (db.select(Islem.tarih, Islem.id, Islem.gonderen_bakiye_sonrasi.label('bakiye'))
+                      .where(Islem.gonderen_hesap_id == hesap_id, onceki)
+                      .order_by(Islem.tarih.desc(), Islem.id.desc()).limit(1).subquery())
+        alinan = (db.select(Islem.tarih, Islem.id, Islem.alici_bakiye_sonrasi.label('bakiye'))
+                  .where(Islem.alici_hesap_id == hesap_id, onceki)
+                  .order_by(Islem.tarih.desc(), Islem.id.desc()).limit(1).subquery())
+        birlesik = db.union_all(db.select(gonderilen), db.select(alinan)).subquery()
+        onceki_bakiye = db.session.execute(
+            db.select(birlesik.c.bakiye).order_by(birlesik.c.tarih.desc(), birlesik.c.id.desc()).limit(1)
+        ).scalar()
+        if (onceki_bakiye if onceki_bakiye is not None else 0) == bakiye_sonrasi and tutar:  # Bakiye değişmemiş
+            kredi_karti_idleri.append(islem_id)
+            gunler.add(tarih.date())
+    if not kredi_karti_idleri:
+        return
+
+    for baslangic in range(0, len(kredi_karti_idleri), 10000):
+        db.session.execute(db.update(Islem).where(Islem.id.in_(kredi_karti_idleri[baslangic:baslangic + 10000]))
+                           .values(islem_turu=KREDI_KARTI_HARCAMASI))
+    gunluk_ozetleri_yeniden_hesapla(gunler)  # Daha önce özetlenmiş günler düzeltilmiş işlemlerle yeniden hesaplanır
+
+def _guncelleme_islem_anahtari_kapsami():
+    """İşlem anahtarlarına kapsam (birincil anahtarın parçası) ve istek özeti kolonlarını ekler
+
+    Mevcut anahtarların özeti bağlı oldukları işlemden hesaplanır; işlemi silinmiş anahtarlar
+    atılır. Birincil anahtar değiştiği için tablo yeniden oluşturulur; eski anahtarlar
+    'transfer' kapsamına düşer. Kart harcaması anahtarları harcamanın kartının kapsamına
+    taşınır; işlemde kart tutulmadığından hesapta aynı türden tek kart yoksa anahtar atılır.
+    """
+    anahtar_tablosu = IslemAnahtari.__table__
+    with db.engine.begin() as baglanti:
+        _kolon_ekle(baglanti, anahtar_tablosu, anahtar_tablosu.c.parmak_izi)
+        baglanti.execute(db.delete(anahtar_tablosu)
+                         .where(anahtar_tablosu.c.islem_id.not_in(db.select(Islem.id))))
+        anahtarlar = baglanti.execute(
+            db.select(anahtar_tablosu.c.kullanici_id, anahtar_tablosu.c.anahtar, Islem.islem_turu,
+                      Islem.gonderen_hesap_id, Islem.alici_hesap_id, Islem.tutar)
+            .join(Islem, Islem.id == anahtar_tablosu.c.islem_id)
+        ).all()
+        guncelleme = (db.update(anahtar_tablosu)
+                      .where(anahtar_tablosu.c.kullanici_id == db.bindparam('k_id'),
+                             anahtar_tablosu.c.anahtar == db.bindparam('k_anahtar'))
+                      .values(parmak_izi=db.bindparam('k_parmak_izi')))
+        degerler = [{'k_id': kullanici_id, 'k_anahtar': anahtar, 'k_parmak_izi': istek_parmak_izi(*istek)}
+                    for kullanici_id, anahtar, *istek in anahtarlar]
+        for baslangic in range(0, len(degerler), 10000):
+            baglanti.execute(guncelleme, degerler[baslangic:baslangic + 10000])
+        _tablo_yeniden_olustur(baglanti, anahtar_tablosu, {})  # kapsam sunucu varsayılanıyla dolar
+
+        kart_tablosu = Kart.__table__
+        kredi_karti = kart_tablosu.c.kart_turu == 'Kredi Kartı'
+        harcamalar = baglanti.execute(
+            db.select(anahtar_tablosu.c.kullanici_id, anahtar_tablosu.c.anahtar, Islem.islem_turu, Islem.gonderen_hesap_id)
+            .join(Islem, Islem.id == anahtar_tablosu.c.islem_id)
+            .where(Islem.islem_turu.in_(['Kart Harcaması', KREDI_KARTI_HARCAMASI]))
+        ).all()
+        for kullanici_id, anahtar, islem_turu, hesap_id in harcamalar:
+            kartlar = baglanti.execute(
+                db.select(kart_tablosu.c.id).where(kart_tablosu.c.hesap_id == hesap_id,
+                                                   kredi_karti if islem_turu == KREDI_KARTI_HARCAMASI else ~kredi_karti)
+            ).scalars().all()
+            kosul = (anahtar_tablosu.c.kullanici_id == kullanici_id, anahtar_tablosu.c.anahtar == anahtar)
+            if len(kartlar) == 1:
+                baglanti.execute(db.update(anahtar_tablosu).where(*kosul)
+                                 .values(kapsam=kart_anahtar_kapsami(kartlar[0])))
+            else:
+                baglanti.execute(db.delete(anahtar_tablosu).where(*kosul))
+
+# (sürüm, fonksiyon) çiftleri - Yeni güncellemeler listenin sonuna eklenir
+SEMA_GUNCELLEMELERI = [
+    (1, _guncelleme_islem_indeksleri),
+    (2, _guncelleme_para_kurus),
+    (3, _guncelleme_bakiye_sonrasi),
+    (4, _guncelleme_hesap_indeksleri),
+    (5, _guncelleme_yatirim_pozisyonlari),
+    (6, _guncelleme_kart_limiti),
+    (7, _guncelleme_eksik_tablolar),
+    (8, _guncelleme_kredi_karti_harcamalari),
+    (9, _guncelleme_islem_anahtari_kapsami),
+]
+
+def sema_surumu():
+    """Veritabanına uygulanmış son güncellemenin numarasını döndürür (şema hiç kurulmamışsa None)"""
+    denetci = db.inspect(db.engine)
+    if not denetci.has_table('user'):
+        return None
+    if not denetci.has_table(SemaSurumu.__tablename__):
+        return 0  # Güncellemeler başlamadan önce kurulmuş veritabanı
+    return db.session.query(db.func.max(SemaSurumu.surum)).scalar() or 0
+
+def bekleyen_guncellemeler():
+    """Henüz uygulanmamış güncellemelerin numaralarını döndürür (sıfırdan kurulumda tümü)"""
+    son_surum = sema_surumu() or 0
+    return [surum for surum, _ in SEMA_GUNCELLEMELERI if surum > son_surum]
+
+def veritabani_hazirla():
+    """Şemayı kurar veya bekleyen güncellemeleri uygular; uygulanan sürüm numaralarını döndürür
+
+    Sıfırdan kurulumda tablolar güncel modellerle oluşturulur ve tüm güncellemeler uygulanmış
+    olarak işaretlenir. Mevcut veritabanında her güncelleme ayrı commit edilir; yarıda kalan
+    bir çalıştırma tekrarlandığında kaldığı güncellemeden devam eder.
+    """
+    son_surum = sema_surumu()
+    if son_surum is None:  # Hiç tablo yok - Sıfırdan kurulum
+        db.create_all()
+        surumler = [surum for surum, _ in SEMA_GUNCELLEMELERI]
+        db.session.add_all(SemaSurumu(surum=surum) for surum in surumler)
+        db.session.commit()
+        return surumler
+
+    if son_surum == 0:
+        SemaSurumu.__table__.create(db.engine, checkfirst=True)
+    uygulanan = []
+    for surum, guncelleme in SEMA_GUNCELLEMELERI:
+        if surum <= son_surum:
+            continue  # Daha önce uygulanmış
+        guncelleme()
+        db.session.add(SemaSurumu(surum=surum))
+        db.session.commit()
+        uygulanan.append(surum)
+    return uygulanan
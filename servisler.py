@@ -0,0 +1,1839 @@
+"""
+BetikBank servisleri
+Transfer, kart yetkilendirme, talimat, olay kutusu, arşiv, değerleme, analiz ve kullanıcı
+yükleme iş kurallarını tanımlar. Fonksiyonlar o anki uygulamanın (current_app) ayarları ve
+veritabanıyla çalışır; web route'ları, JSON API, toplu işler ve 'flask' komutları aynı
+fonksiyonları kullanır. Bu modül route tanımlamaz ve web'e özgü parçaları başlatmaz.
+"""
+from flask import current_app, g, request, session, has_request_context  # Uygulama ve istek bağlamı için
+from flask_login import UserMixin, current_user  # Oturum kullanıcısı için
+from werkzeug.local import LocalProxy  # Uygulamaya bağlı nesneleri modül adıyla kullanmak için
+from datetime import datetime, date, timedelta, timezone  # Tarih/saat işlemleri için
+import os  # Fork edilmiş worker'ları ayırt etmek için
+import base64  # Sayfalama imleçlerini URL'de taşımak için
+import calendar  # Aylık talimatlarda ayın gün sayısı için
+import json  # Olay kutusundaki olay verilerini saklamak için
+import time  # Hız kontrolü tazeleme aralığı için
+import threading  # Numara bloklarını thread'ler arasında korumak için
+from collections import defaultdict  # Toplu işlemlerde hesap bazlı toplamlar için
+from decimal import Decimal  # Kuruş hassasiyetinde para hesabı için
+import secrets  # Tahmin edilemeyen anahtarlar üretmek için
+import hashlib  # Kart önbellek anahtarları için
+import hmac  # Önbellekteki kart doğrulama özetleri için
+import re  # İstemci anahtarlarının biçim kontrolü için
+from sqlalchemy.exc import IntegrityError  # Benzersizlik ihlallerini yakalamak için
+from onbellek import onbellek_olustur  # Dashboard vb. veriler için önbellek
+from sifreleme import sifre_hashleyici_olustur  # Ayarlanabilir şifre hashleme için
+from dolandiricilik import KuralMotoru, kurallari_coz, VARSAYILAN_KURALLAR  # Transfer hız/limit kuralları için
+from degerleme import DegerlemeMotoru, VARSAYILAN_FIYATLAR  # Yatırım değerlemesi için
+from modeller import (db, Para, KURUS, tutar_coz, User, Hesap, Islem, IslemArsivi, IslemArsivDonemi, Kart, YatirimHesabi,
+                      EnstrumanFiyati, HesapGunlukOzet, IslemAnahtari, NumaraSayaci, OlayKutusu, TransferTalimati,
+                      KREDI_KARTI_HARCAMASI)
+
+# ============================================
+# UYGULAMA DURUMU
+# ============================================
+
+# Önbellek, şifre hashleyici, numara ayırıcı ve hız kontrolü modül seviyesinde değil, her
+# uygulama için ayrı tutulur (app.extensions['betikbank']); böylece aynı süreçte farklı
+# ayarlarla birden fazla uygulama çalışabilir. Her nesne ilk kullanıldığında oluşturulur,
+# toplu işler kullanmadıkları parçaları (ör. şifre doğrulama havuzu) hiç başlatmaz. Aşağıdaki
+# modül adları o anki uygulamanın nesnesini gösteren vekillerdir.
+
+def _hiz_kontrolu_olustur(ayarlar):
+    """DOLANDIRICILIK_KONTROLU açıksa ayarlardaki kurallarla hız kontrolünü oluşturur (kapalıysa None)"""
+    if not ayarlar['DOLANDIRICILIK_KONTROLU']:
+        return None
+    return HizKontrolu(kurallari_coz(ayarlar['DOLANDIRICILIK_KURALLARI'] or VARSAYILAN_KURALLAR),
+                       ayarlar['DOLANDIRICILIK_TAZELEME_SURESI'])
+
+# Durum adı -> uygulama ayarlarından nesneyi oluşturan fonksiyon
+DURUM_OLUSTURUCULARI = {
+    'onbellek': onbellek_olustur,
+    'sifre_hashleyici': sifre_hashleyici_olustur,
+    'numara_ayirici': lambda ayarlar: NumaraAyirici(ayarlar['NUMARA_BLOK_BOYUTU']),
+    'hiz_kontrolu': _hiz_kontrolu_olustur,
+}
+
+_durum_kilidi = threading.Lock()  # Aynı nesnenin iki thread'de birden oluşturulmaması için
+
+def uygulama_durumu(ad):
+    """O anki uygulamanın 'ad' nesnesini döndürür; henüz yoksa uygulama ayarlarıyla oluşturur"""
+    durum = current_app.extensions['betikbank']
+    if ad not in durum:
+        with _durum_kilidi:
+            if ad not in durum:
+                durum[ad] = DURUM_OLUSTURUCULARI[ad](current_app.config)
+    return durum[ad]
+
+onbellek = LocalProxy(lambda: uygulama_durumu('onbellek'))  # Uygulama genelinde kullanılan önbellek
+sifre_hashleyici = LocalProxy(lambda: uygulama_durumu('sifre_hashleyici'))  # Şifre hashleme ve doğrulama
+numara_ayirici = LocalProxy(lambda: uygulama_durumu('numara_ayirici'))  # Kart/yatırım hesap numarası dağıtıcısı
+hiz_kontrolu = LocalProxy(lambda: uygulama_durumu('hiz_kontrolu'))  # Transfer hız/limit kuralları (kapalıysa None)
+
+# ============================================
+# İŞLEM GEÇMİŞİ SORGULARI
+# ============================================
+
+# İşlem geçmişi tablolarında gösterilen Islem (ve IslemArsivi) kolonları
+HAREKET_KOLONLARI = (
+    'id',
+    'tarih',
+    'tutar',
+    'aciklama',
+    'islem_turu',
+    'gonderen_hesap_id',
+    'alici_hesap_id',
+    'gonderen_bakiye_sonrasi',
+    'alici_bakiye_sonrasi',
+)
+
+def hareket_sorgusu(hesap_idleri, limit=None, imlec=None, yon='eski', baslangic=None, bitis=None, tablo=Islem):
+    """Verilen hesaplardan gönderilen ve alınan işlemleri getiren tek SELECT ifadesini oluşturur
+    
+    Gönderilen ve alınan işlemler UNION ALL ile birleştirilir; her iki kol da kendi
+    (hesap, tarih) indeksinden sıralı okunur ve sıralama/limit veritabanında yapılır.
+    Hesaplar arası (kendi hesapları arasında) işlemler listede yalnızca bir kez yer alır.
+    
+    Sonuç yon='eski' ise en yeni önce, yon='yeni' ise en eski önce sıralıdır. imlec
+    verilirse (tarih, id) anahtarına göre sayfalama yapılır: yon='eski' imleçten daha
+    eski, yon='yeni' imleçten daha yeni işlemleri getirir. baslangic/bitis verilirse
+    sadece [baslangic, bitis) aralığındaki işlemler okunur.
+    
+    ORM nesneleri yerine yalnızca ekranda gereken kolonlar döner: gönderen/alıcı hesap
+    numaraları aynı sorguda join ile alınır ve 'gelen' bayrağı (alıcı hesap listedeki
+    hesaplardan biri mi) veritabanında hesaplanır. Böylece şablonlar satır başına
+    ilişki yüklemesi (N+1 sorgu) yapmaz. tablo=IslemArsivi ile aynı sorgu arşivde çalışır.
+    """
+    yeniye_dogru = yon == 'yeni'  # Önceki sayfa ve ekstre için eskiden yeniye doğru okunur
+    
+    def _sirala(tarih, id_):
+        """Okuma yönüne göre (tarih, id) sıralamasını döndürür"""
+        if yeniye_dogru:
+            return tarih.asc(), id_.asc()
+        return tarih.desc(), id_.desc()
+    
+    def _kol(kosul):
+        """UNION ALL'un bir kolunu oluşturur (limit varsa her kol en fazla limit kadar satır okur)"""
+        if imlec is not None:
+            anahtar = db.tuple_(tablo.tarih, tablo.id)
+            kosul = db.and_(kosul, anahtar > db.tuple_(*imlec) if yeniye_dogru else anahtar < db.tuple_(*imlec))
+        if baslangic is not None:
+            kosul = db.and_(kosul, tablo.tarih >= baslangic)
+        if bitis is not None:
+            kosul = db.and_(kosul, tablo.tarih < bitis)
+        sorgu = (db.select(*(getattr(tablo, kolon) for kolon in HAREKET_KOLONLARI))
+                 .where(kosul).order_by(*_sirala(tablo.tarih, tablo.id)))
+        if limit:
+            sorgu = sorgu.limit(limit)
+        return db.select(sorgu.subquery())  # SQLite, UNION kollarında ORDER BY/LIMIT için alt sorgu ister
+    
+    gonderilen = _kol(tablo.gonderen_hesap_id.in_(hesap_idleri))  # Hesaplardan gönderilen işlemler
+    alinan = _kol(db.and_(tablo.alici_hesap_id.in_(hesap_idleri),
+                          tablo.gonderen_hesap_id.not_in(hesap_idleri)))  # Dışarıdan gelen işlemler
+    
+    birlesik = db.union_all(gonderilen, alinan).subquery()
+    gonderen = db.aliased(Hesap)  # Gönderen hesap numarası için
+    alici = db.aliased(Hesap)  # Alıcı hesap numarası için
+    sorgu = (
+        db.select(
+            birlesik,
+            gonderen.hesap_no.label('gonderen_hesap_no'),
+            alici.hesap_no.label('alici_hesap_no'),
+            birlesik.c.alici_hesap_id.in_(hesap_idleri).label('gelen'),  # Tutar + mı - mi gösterilecek
+            db.case(  # Listedeki hesabın işlem sonrası bakiyesi
+                (birlesik.c.gonderen_hesap_id.in_(hesap_idleri), birlesik.c.gonderen_bakiye_sonrasi),
+                else_=birlesik.c.alici_bakiye_sonrasi
+            ).label('bakiye_sonrasi'),
+        )
+        .join(gonderen, gonderen.id == birlesik.c.gonderen_hesap_id)
+        .join(alici, alici.id == birlesik.c.alici_hesap_id)
+        .order_by(*_sirala(birlesik.c.tarih, birlesik.c.id))
+    )
+    if limit:
+        sorgu = sorgu.limit(limit)
+    return sorgu
+
+def hesap_hareketleri(hesap_idleri, limit=None, imlec=None, yon='eski'):
+    """Verilen hesapların işlem geçmişini en yeni önce olacak şekilde döndürür (bkz. hareket_sorgusu)
+    
+    Önce sıcak islem tablosu okunur; arşiv yalnızca sayfa orada dolmazsa (geçmişin sonuna
+    gelindiyse) veya imleç zaten arşiv sınırından eskiyse sorgulanır. Arşivdeki tüm satırlar
+    sıcak tablodakilerden eski olduğundan iki sonuç sırayla eklenir.
+    """
+    hesap_idleri = list(hesap_idleri)
+    if not hesap_idleri:  # Hesap yoksa sorgu atmaya gerek yok
+        return []
+    
+    sinir = arsiv_siniri()
+    if sinir is None:  # Arşivlenmiş dönem yok
+        tablolar = (Islem,)
+    elif yon == 'yeni':  # İmleçten yeniye doğru - Arşivdeki imleçte önce arşivin kalanı okunur
+        tablolar = (Islem,) if imlec and imlec[0] >= sinir else (IslemArsivi, Islem)
+    else:  # İmleçten eskiye doğru - Sıcak tablo bitince arşivden devam edilir
+        tablolar = (IslemArsivi,) if imlec and imlec[0] < sinir else (Islem, IslemArsivi)
+    
+    islemler = []
+    for tablo in tablolar:
+        kalan = limit - len(islemler) if limit else None
+        if kalan is not None and kalan <= 0:
+            break  # Sayfa doldu, sonraki tabloya gerek yok
+        islemler += db.session.execute(
+            hareket_sorgusu(hesap_idleri, limit=kalan, imlec=imlec, yon=yon, tablo=tablo)
+        ).all()
+    if yon == 'yeni':
+        islemler.reverse()  # Ekranda her zaman en yeni önce gösterilir
+    return islemler
+
+def imlec_olustur(islem):
+    """İşlemin (tarih, id) anahtarını URL'de taşınabilir bir imlece çevirir"""
+    ham = f"{islem.tarih.isoformat()}|{islem.id}"
+    return base64.urlsafe_b64encode(ham.encode()).decode().rstrip('=')
+
+def imlec_coz(imlec):
+    """URL'deki imleci (tarih, id) anahtarına çevirir; geçersizse None döndürür"""
+    if not imlec:
+        return None
+    try:
+        ham = base64.urlsafe_b64decode(imlec + '=' * (-len(imlec) % 4)).decode()
+        tarih, islem_id = ham.split('|')
+        return datetime.fromisoformat(tarih), int(islem_id)
+    except ValueError:
+        return None  # Bozuk imleç - ilk sayfa gösterilir
+
+def islem_sayfasi(hesap_idleri):
+    """İstek parametrelerine (sonraki/onceki/adet) göre bir işlem geçmişi sayfası hazırlar
+    
+    Sayfa boyutu sabit olduğundan geçmiş ne kadar uzun olursa olsun her sayfa aynı
+    maliyetle okunur. Bir fazla satır istenerek bir sonraki sayfanın olup olmadığı anlaşılır.
+    """
+    adet = request.args.get('adet', current_app.config['ISLEM_SAYFA_BOYUTU'], type=int)
+    adet = max(1, min(adet, current_app.config['ISLEM_SAYFA_BOYUTU_MAKS']))  # Sayfa boyutunu sınırla
+    
+    onceki = imlec_coz(request.args.get('onceki'))
+    sonraki = imlec_coz(request.args.get('sonraki'))
+    
+    if onceki:  # Daha yeni işlemlere geri dönülüyor
+        islemler = hesap_hareketleri(hesap_idleri, limit=adet + 1, imlec=onceki, yon='yeni')
+        daha_yeni_var = len(islemler) > adet
+        islemler = islemler[-adet:] if daha_yeni_var else islemler  # Fazladan okunan en yeni satırı at
+        daha_eski_var = True  # İmlecin kendisi daha eski bir satırdır
+    else:  # İlk sayfa veya daha eski işlemlere ilerleniyor
+        islemler = hesap_hareketleri(hesap_idleri, limit=adet + 1, imlec=sonraki)
+        daha_eski_var = len(islemler) > adet
+        islemler = islemler[:adet]  # Fazladan okunan en eski satırı at
+        daha_yeni_var = sonraki is not None
+    
+    return {
+        'islemler': islemler,
+        'adet': adet,
+        'sonraki_imlec': imlec_olustur(islemler[-1]) if islemler and daha_eski_var else None,
+        'onceki_imlec': imlec_olustur(islemler[0]) if islemler and daha_yeni_var else None,
+    }
+
+# ============================================
+# İŞLEM ARŞİVİ
+# ============================================
+
+# Tamamlanmış eski aylar islem tablosundan islem_arsivi tablosuna ay ay taşınır; böylece
+# sıcak tablo ve indeksleri içinde bulunulan ay ile son ISLEM_ARSIV_AY ay kadar kalır.
+# Bir ay her zaman tamamen tek bir tabloda olduğundan okuma tarafı hangi tabloya gideceğini
+# arşiv sınırından (taşınmamış ilk ayın başlangıcı) bilir. Sınır worker önbelleğinde tutulmaz:
+# arşivleme ayrı bir süreçte çalışır ve eski sınırı kullanan worker taşınan ayları hiç
+# göstermez. Her istekte islem_arsiv_donemi'nin birincil anahtarından bir kez okunur.
+
+def arsiv_siniri():
+    """Arşive taşınmamış ilk ayın başlangıç anını döndürür; hiç arşiv yoksa None (istek içinde bir kez okunur)"""
+    if has_request_context() and 'arsiv_siniri' in g:
+        return g.arsiv_siniri
+    son_donem = db.session.query(db.func.max(IslemArsivDonemi.donem)).scalar()
+    sinir = ay_araligi(*map(int, son_donem.split('-')))[1] if son_donem else None
+    if has_request_context():
+        g.arsiv_siniri = sinir
+    return sinir
+
+def hareket_tablolari(baslangic=None, bitis=None):
+    """[baslangic, bitis) aralığındaki işlemleri içeren tabloları eskiden yeniye sırayla döndürür"""
+    sinir = arsiv_siniri()
+    if sinir is None:
+        return [Islem]
+    tablolar = []
+    if baslangic is None or baslangic < sinir:
+        tablolar.append(IslemArsivi)
+    if bitis is None or bitis > sinir:
+        tablolar.append(Islem)
+    return tablolar
+
+def islemleri_arsivle(ay_sayisi=None, ilerleme=None):
+    """İçinde bulunulan aya ek olarak son ay_sayisi aydan eski işlemleri arşive taşır
+    
+    Her ay tek bir veritabanı işleminde (INSERT ... SELECT + DELETE) taşınır ve arşiv
+    dönemi olarak kaydedilir. Taşınacak günlerin günlük özetleri önce tamamlanır; eski
+    işlemlere ait idempotency anahtarları silinir. ilerleme verilirse her aydan sonra
+    (dönem, satır sayısı) ile çağrılır. Taşınan dönem sayısını döndürür.
+    """
+    ay_sayisi = current_app.config['ISLEM_ARSIV_AY'] if ay_sayisi is None else ay_sayisi
+    bugun = datetime.utcnow()
+    toplam_ay = bugun.year * 12 + bugun.month - 1 - ay_sayisi
+    ufuk = datetime(toplam_ay // 12, toplam_ay % 12 + 1, 1)  # Bu andan eski işlemler taşınır
+    
+    ilk_islem = db.session.query(db.func.min(Islem.tarih)).scalar()
+    if ilk_islem is None or ilk_islem >= ufuk:
+        return 0
+    gunluk_ozetleri_guncelle(ufuk.date() - timedelta(days=1))  # Özetler taşınacak günleri okuyabilsin
+    
+    sinir = arsiv_siniri()
+    baslangic = datetime(ilk_islem.year, ilk_islem.month, 1)
+    if sinir is not None:
+        baslangic = min(baslangic, sinir)  # Sınır öncesine geç yazılmış işlem varsa onun ayından başla
+    kolonlar = [kolon.name for kolon in IslemArsivi.__table__.columns]
+    islem_tablosu = Islem.__table__
+    
+    tasinan = 0
+    while baslangic < ufuk:
+        ay_baslangic, ay_bitis = ay_araligi(baslangic.year, baslangic.month)
+        aralikta = db.and_(islem_tablosu.c.tarih >= ay_baslangic, islem_tablosu.c.tarih < ay_bitis)
+        db.session.execute(
+            db.insert(IslemArsivi.__table__).from_select(
+                kolonlar, db.select(*(islem_tablosu.c[kolon] for kolon in kolonlar)).where(aralikta)
+            )
+        )
+        db.session.execute(
+            db.delete(IslemAnahtari).where(IslemAnahtari.islem_id.in_(db.select(islem_tablosu.c.id).where(aralikta)))
+            .execution_options(synchronize_session=False)
+        )
+        satir_sayisi = db.session.execute(db.delete(islem_tablosu).where(aralikta)).rowcount
+        donem = ay_baslangic.strftime('%Y-%m')
+        kayit = db.session.get(IslemArsivDonemi, donem)
+        if kayit:  # Daha önce taşınmış aya sonradan yazılmış satırlar
+            kayit.satir_sayisi += satir_sayisi
+        else:
+            db.session.add(IslemArsivDonemi(donem=donem, satir_sayisi=satir_sayisi))
+        db.session.commit()
+        
+        tasinan += 1
+        if ilerleme:
+            ilerleme(donem, satir_sayisi)
+        baslangic = ay_bitis
+    return tasinan
+
+# ============================================
+# NUMARA ÜRETİMİ
+# ============================================
+
+# Kart ve yatırım hesabı numaraları numara_sayaci tablosundaki sayaçlardan üretilir. Her
+# worker bir seferde NUMARA_BLOK_BOYUTU kadar sıra numarasını tek bir UPDATE ile ayırır ve
+# bunları bellekten dağıtır; böylece numara almak çoğu zaman hiç sorgu gerektirmez ve
+# benzersizlik için veritabanı yoklanmaz. Kullanılmadan kalan blok numaraları atlanır.
+
+class NumaraAyirici:
+    """Sayaç tablosundan blok blok numara ayıran, süreç içi numara dağıtıcısı"""
+    
+    def __init__(self, blok_boyutu=100):
+        self.blok_boyutu = blok_boyutu
+        self._bloklar = {}  # Sayaç adı -> [sıradaki numara, blok sonu (hariç)]
+        self._kilit = threading.Lock()
+        self._pid = os.getpid()  # Fork sonrası kopyalanan bloklar tekrar kullanılmasın diye
+    
+    def sonraki(self, ad):
+        """Sayacın sıradaki numarasını döndürür (1'den başlar)"""
+        with self._kilit:
+            if self._pid != os.getpid():  # Fork edilmiş worker - Ebeveynin blokları paylaşılamaz
+                self._bloklar, self._pid = {}, os.getpid()
+            blok = self._bloklar.get(ad)
+            if blok is None or blok[0] >= blok[1]:
+                blok = self._bloklar[ad] = self._blok_ayir(ad)
+            numara = blok[0]
+            blok[0] += 1
+            return numara
+    
+    def _blok_ayir(self, ad):
+        """Sayacı blok boyutu kadar artırır ve ayrılan aralığı döndürür
+        
+        Ayrı bir bağlantıda hemen commit edilir; çağıranın veritabanı işlemi geri alınsa da
+        numaralar tekrar dağıtılmaz. Bu yüzden çağıran, kendi yazmalarından önce numara almalıdır.
+        """
+        tablo = NumaraSayaci.__table__
+        while True:
+            with db.engine.begin() as baglanti:
+                guncellenen = baglanti.execute(
+                    db.update(tablo).where(tablo.c.ad == ad).values(deger=tablo.c.deger + self.blok_boyutu)
+                ).rowcount
+                if guncellenen:
+                    son = baglanti.execute(db.select(tablo.c.deger).where(tablo.c.ad == ad)).scalar()
+                    return [son - self.blok_boyutu + 1, son + 1]
+            try:
+                with db.engine.begin() as baglanti:  # İlk kullanım - Sayacı ilk blokla oluştur
+                    baglanti.execute(db.insert(tablo).values(ad=ad, deger=self.blok_boyutu))
+                return [1, self.blok_boyutu + 1]
+            except IntegrityError:
+                continue  # Başka bir worker aynı anda oluşturdu, artırmayı tekrar dene
+
+
+def luhn_kontrol_hanesi(govde):
+    """Rakamlardan oluşan gövde için Luhn (mod 10) kontrol hanesini döndürür"""
+    toplam = 0
+    for sira, rakam in enumerate(reversed(govde)):
+        deger = int(rakam)
+        if sira % 2 == 0:  # Kontrol hanesi eklendiğinde sağdan ikinci, dördüncü... haneler
+            deger = deger * 2 - 9 if deger > 4 else deger * 2
+        toplam += deger
+    return str((10 - toplam % 10) % 10)
+
+def kart_numarasi_uret():
+    """IIN öneki + 9 haneli sıra numarası + Luhn kontrol hanesinden oluşan 16 haneli kart numarası üretir"""
+    sira = numara_ayirici.sonraki('kart')
+    if sira >= 10 ** 9:
+        raise RuntimeError('Kart numarası aralığı tükendi, KART_IIN değiştirilmeli.')
+    govde = f"{current_app.config['KART_IIN']}{sira:09d}"
+    return govde + luhn_kontrol_hanesi(govde)
+
+def cvv_uret():
+    """Kriptografik olarak güvenli 3 haneli CVV üretir"""
+    return f'{secrets.randbelow(1000):03d}'
+
+def yatirim_hesap_no_uret():
+    """'Y' + 15 haneli sıra numarasından oluşan yatırım hesap numarası üretir"""
+    return f"Y{numara_ayirici.sonraki('yatirim_hesabi'):015d}"
+
+# ============================================
+# OLAY KUTUSU (OUTBOX)
+# ============================================
+
+# Para hareketlerinin yan etkileri (bildirim, dolandırıcılık skoru, defter aktarımı) istek
+# içinde çalıştırılmaz. Olay, Islem kaydıyla aynı commit'te olay_kutusu tablosuna yazılır;
+# olay_dagitici.py worker'ı bekleyen olayları kayıtlı işleyicilere teslim eder. İşlem geri
+# alınırsa olay da yazılmaz, commit edilen her olay en az bir kez teslim edilir. Bir işleyici
+# hata verirse olay artan aralıklarla yeniden denenir ve tüm işleyicileri yeniden çalışır;
+# bu yüzden işleyiciler olay id'sine göre tekrarı tolere etmelidir.
+
+OLAY_ISLEYICILERI = defaultdict(list)  # Olay türü -> işleyici fonksiyonları
+
+def olay_isleyici_ekle(*olay_turleri):
+    """Fonksiyonu verilen olay türleri için işleyici olarak kaydeden dekoratör
+    
+    İşleyici {'id', 'olay_turu', 'veri', 'created_at'} sözlüğüyle, uygulama bağlamı içinde
+    çağrılır. Hata fırlatırsa olay yeniden denenir.
+    """
+    def kaydet(fonksiyon):
+        for olay_turu in olay_turleri:
+            OLAY_ISLEYICILERI[olay_turu].append(fonksiyon)
+        return fonksiyon
+    return kaydet
+
+def olay_ekle(olay_turu, veri):
+    """Olayı oturuma ekler - Çağıranın commit'iyle birlikte kaydedilir (commit edilmez)"""
+    db.session.add(OlayKutusu(olay_turu=olay_turu, veri=json.dumps(veri, default=str, ensure_ascii=False)))
+
+def olaylari_ekle(olaylar):
+    """(olay_turu, veri) listesini tek bir toplu INSERT ile oturuma ekler (commit edilmez)"""
+    simdi = datetime.utcnow()
+    kayitlar = [{'olay_turu': olay_turu, 'veri': json.dumps(veri, default=str, ensure_ascii=False),
+                 'durum': 'Bekliyor', 'deneme_sayisi': 0, 'sonraki_deneme': simdi, 'created_at': simdi}
+                for olay_turu, veri in olaylar]
+    if kayitlar:
+        db.session.execute(db.insert(OlayKutusu), kayitlar)
+
+def _olaylari_sahiplen(limit):
+    """Zamanı gelmiş en fazla limit olayı bu worker adına işaretler ve döndürür
+    
+    Sahiplenme tek bir koşullu UPDATE ile yapılır; aynı anda çalışan worker'lar aynı olayı
+    alamaz. Kira süresi içinde bitirilemeyen (ör. worker çöktü) olaylar yeniden sahiplenilebilir.
+    """
+    simdi = datetime.utcnow()
+    zamani_gelen = db.and_(OlayKutusu.durum.in_(('Bekliyor', 'İşleniyor')), OlayKutusu.sonraki_deneme <= simdi)
+    adaylar = db.session.scalars(
+        db.select(OlayKutusu.id).where(zamani_gelen).order_by(OlayKutusu.id).limit(limit)
+    ).all()
+    if not adaylar:
+        return []
+    
+    isleyici = secrets.token_hex(16)
+    db.session.execute(
+        db.update(OlayKutusu).where(OlayKutusu.id.in_(adaylar), zamani_gelen)
+        .values(durum='İşleniyor', isleyici=isleyici,
+                sonraki_deneme=simdi + timedelta(seconds=current_app.config['OLAY_KIRA_SURESI']))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return db.session.execute(
+        db.select(OlayKutusu.id, OlayKutusu.olay_turu, OlayKutusu.veri, OlayKutusu.created_at,
+                  OlayKutusu.deneme_sayisi, OlayKutusu.isleyici)
+        .where(OlayKutusu.isleyici == isleyici, OlayKutusu.durum == 'İşleniyor').order_by(OlayKutusu.id)
+    ).all()
+
+def olaylari_isle(limit=100):
+    """Bekleyen olayları işleyicilerine teslim eder ve {durum: olay sayısı} özeti döndürür
+    
+    Sonuç sadece olay hâlâ bu worker'a aitse yazılır: kira süresi dolup başka bir worker'ın
+    sahiplendiği olayın durumu geç kalan worker tarafından değiştirilmez ve özete sayılmaz.
+    """
+    ozet = {'Gönderildi': 0, 'Bekliyor': 0, 'Başarısız': 0}
+    for satir in _olaylari_sahiplen(limit):
+        olay = {'id': satir.id, 'olay_turu': satir.olay_turu, 'veri': json.loads(satir.veri),
+                'created_at': satir.created_at}
+        degerler = {'isleyici': None}
+        try:
+            for fonksiyon in OLAY_ISLEYICILERI.get(satir.olay_turu, ()):
+                fonksiyon(olay)
+            degerler.update(durum='Gönderildi', gonderilme_tarihi=datetime.utcnow(), son_hata=None)
+        except Exception as hata:
+            db.session.rollback()  # İşleyicinin yarım bıraktığı veritabanı değişikliklerini geri al
+            deneme = satir.deneme_sayisi + 1
+            bekleme = min(current_app.config['OLAY_TEKRAR_BEKLEME'] * 2 ** (deneme - 1), 3600)  # En fazla 1 saat
+            degerler.update(
+                durum='Başarısız' if deneme >= current_app.config['OLAY_AZAMI_DENEME'] else 'Bekliyor',
+                deneme_sayisi=deneme,
+                sonraki_deneme=datetime.utcnow() + timedelta(seconds=bekleme),
+                son_hata=f'{type(hata).__name__}: {hata}'[:1000],
+            )
+            current_app.logger.warning('Olay %s (%s) teslim edilemedi: %s', satir.id, satir.olay_turu, hata)
+        yazildi = db.session.execute(
+            db.update(OlayKutusu)
+            .where(OlayKutusu.id == satir.id, OlayKutusu.isleyici == satir.isleyici, OlayKutusu.durum == 'İşleniyor')
+            .values(**degerler)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if yazildi:
+            ozet[degerler['durum']] += 1
+        else:  # Kira süresi doldu, olay başka bir worker'a geçti
+            current_app.logger.warning('Olay %s başka bir worker tarafından sahiplenildi, sonuç yazılmadı', satir.id)
+    return ozet
+
+def gonderilmis_olaylari_temizle(gun=None):
+    """Teslim edilmesinin üzerinden 'gun' günden fazla geçmiş olayları siler ve silinen sayısını döndürür"""
+    sinir = datetime.utcnow() - timedelta(days=current_app.config['OLAY_SAKLAMA_GUN'] if gun is None else gun)
+    silinen = db.session.execute(
+        db.delete(OlayKutusu).where(OlayKutusu.durum == 'Gönderildi', OlayKutusu.gonderilme_tarihi < sinir)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return silinen
+
+# Defter aktarımı - OLAY_DEFTER_DOSYASI ayarlıysa para hareketleri JSON satırları olarak dosyaya eklenir
+@olay_isleyici_ekle('transfer.tamamlandi', 'kart.harcama', 'yatirim.acildi')
+def defter_disa_aktar(olay):
+    """Olayı defter dosyasına bir JSON satırı olarak ekler (tekrarlar olay id'siyle ayıklanabilir)"""
+    if not current_app.config['OLAY_DEFTER_DOSYASI']:
+        return  # Defter aktarımı kapalı
+    with open(current_app.config['OLAY_DEFTER_DOSYASI'], 'a', encoding='utf-8') as dosya:
+        dosya.write(json.dumps(olay, default=str, ensure_ascii=False) + '\n')
+
+# ============================================
+# YATIRIM DEĞERLEMESİ
+# ============================================
+
+# Yatırım hesaplarının değeri istek sırasında hesaplanmaz. yatirim_degerleme.py süreci
+# tüm aktif pozisyonları bir kez belleğe yükler (degerleme.DegerlemeMotoru), her fiyat
+# tick'inde sadece o enstrümanın pozisyonlarını yeniden değerler ve değişen değerleri
+# belirli aralıklarla toplu UPDATE'lerle toplam_bakiye ve kar_zarar kolonlarına yazar.
+# Sayfalar bu kolonları okumaya devam eder.
+
+def enstruman_fiyatlari():
+    """Bilinen son enstrüman fiyatlarını döndürür (hiç fiyat gelmemişse varsayılan fiyat)"""
+    fiyatlar = dict(VARSAYILAN_FIYATLAR)
+    fiyatlar.update(db.session.execute(db.select(EnstrumanFiyati.enstruman, EnstrumanFiyati.fiyat)).all())
+    return fiyatlar
+
+def pozisyonlari_yukle(motor, son_id=0, parca_boyutu=50000):
+    """id'si son_id'den büyük aktif yatırım hesaplarını motora ekler ve en büyük id'yi döndürür
+    
+    Miktarı boş (eski) hesapların miktarı maliyetin güncel fiyata bölünmesiyle bulunur ve yazılır.
+    """
+    tablo = YatirimHesabi.__table__
+    while True:
+        # Para dönüşümü atlanarak kuruş değerleri doğrudan okunur (satır başına Decimal oluşturulmaz)
+        satirlar = db.session.execute(
+            db.select(tablo.c.id, tablo.c.enstruman, tablo.c.miktar,
+                      db.type_coerce(tablo.c.maliyet, db.BigInteger))
+            .where(tablo.c.id > son_id, tablo.c.durum == 'Aktif').order_by(tablo.c.id).limit(parca_boyutu)
+        ).all()
+        if not satirlar:
+            return son_id
+        son_id = satirlar[-1][0]
+        
+        enstrumanlar = defaultdict(lambda: ([], [], []))  # Enstrüman -> (idler, miktarlar, maliyetler)
+        eksik_miktarlar = []
+        for hesap_id, enstruman, miktar, maliyet in satirlar:
+            enstruman = enstruman or 'FON'
+            if miktar is None:
+                fiyat = motor.fiyat_getir(enstruman)
+                miktar = (maliyet or 0) / 100 / fiyat if fiyat else 0.0
+                eksik_miktarlar.append({'y_id': hesap_id, 'y_miktar': miktar})
+            idler, miktarlar, maliyetler = enstrumanlar[enstruman]
+            idler.append(hesap_id)
+            miktarlar.append(miktar)
+            maliyetler.append(maliyet or 0)
+        for enstruman, (idler, miktarlar, maliyetler) in enstrumanlar.items():
+            motor.pozisyon_ekle(enstruman, idler, miktarlar, maliyetler)
+        
+        if eksik_miktarlar:
+            db.session.execute(
+                db.update(tablo).where(tablo.c.id == db.bindparam('y_id')).values(miktar=db.bindparam('y_miktar')),
+                eksik_miktarlar
+            )
+        db.session.commit()
+
+def degerleme_motoru_olustur(vektorel=None):
+    """Son fiyatlar ve tüm aktif pozisyonlarla yüklenmiş motoru ve en büyük hesap id'sini döndürür"""
+    motor = DegerlemeMotoru(enstruman_fiyatlari(), vektorel=vektorel)
+    return motor, pozisyonlari_yukle(motor)
+
+def degerlemeleri_yaz(motor, parca_boyutu=50000):
+    """Son yazmadan beri değeri değişen pozisyonları ve fiyatları veritabanına yazar; yazılan satır sayısını döndürür"""
+    tablo = YatirimHesabi.__table__
+    guncelleme = (
+        db.update(tablo).where(tablo.c.id == db.bindparam('y_id'))
+        .values(toplam_bakiye=db.bindparam('y_deger', type_=db.BigInteger),  # Kuruş - Para dönüşümü gerekmez
+                kar_zarar=db.bindparam('y_kar', type_=db.BigInteger))
+    )
+    yazilan = 0
+    fiyatlar = {}
+    for enstruman, idler, degerler, karlar in motor.degisenler():
+        fiyatlar[enstruman] = motor.fiyat_getir(enstruman)
+        idler, degerler, karlar = (dizi.tolist() if motor.vektorel else dizi for dizi in (idler, degerler, karlar))
+        for baslangic in range(0, len(idler), parca_boyutu):
+            bitis = baslangic + parca_boyutu
+            db.session.execute(guncelleme, [
+                {'y_id': hesap_id, 'y_deger': deger, 'y_kar': kar}
+                for hesap_id, deger, kar in zip(idler[baslangic:bitis], degerler[baslangic:bitis], karlar[baslangic:bitis])
+            ])
+        yazilan += len(idler)
+    
+    simdi = datetime.utcnow()
+    for enstruman, fiyat in fiyatlar.items():
+        db.session.merge(EnstrumanFiyati(enstruman=enstruman, fiyat=fiyat, guncelleme_tarihi=simdi))
+    db.session.commit()
+    return yazilan
+
+# ============================================
+# DOLANDIRICILIK KURALLARI
+# ============================================
+
+# Transferler commit edilmeden önce hesabın son dakika/saat/gün içindeki giden işlemlerine göre
+# değerlendirilir (dolandiricilik.KuralMotoru). Sayaçlar worker belleğinde tutulur: ilk
+# transferde son işlemlerden tohumlanır, bu worker'ın transferleri commit sonrası eklenir,
+# diğer worker'ların ve toplu işlerin işlemleri en fazla DOLANDIRICILIK_TAZELEME_SURESI
+# saniyede bir tek sorguyla eklenir. Bu yüzden birden fazla worker'da sınırlar bu süre kadar
+# gecikmeli uygulanır.
+
+class HizKontrolu:
+    """Kural motorunu veritabanındaki işlemlerle tohumlayan ve güncel tutan süreç içi sarmalayıcı"""
+    
+    def __init__(self, kurallar, tazeleme_suresi=5):
+        self.kurallar = kurallar
+        self.tazeleme_suresi = tazeleme_suresi
+        self._motor = None
+        self._pid = None  # Fork sonrası sayaçlar yeniden tohumlanır
+        self._son_id = 0  # Sayaçlara eklenmiş en büyük işlem id'si
+        self._son_tazeleme = 0.0
+        self._yerel = set()  # Bu worker'ın eklediği, tazelemede atlanacak işlem id'leri
+        self._kilit = threading.Lock()
+    
+    @staticmethod
+    def _giden_hareketler(kosul):
+        """Hesaplardan çıkış sayılan işlemlerin (id, gönderen hesap, tarih, tutar) sorgusu"""
+        giden = db.or_(Islem.gonderen_hesap_id != Islem.alici_hesap_id,
+                       Islem.islem_turu.not_in(('Yükleme', KREDI_KARTI_HARCAMASI)))
+        return db.session.execute(
+            db.select(Islem.id, Islem.gonderen_hesap_id, Islem.tarih, Islem.tutar).where(kosul, giden).order_by(Islem.id)
+        ).all()
+    
+    @staticmethod
+    def _an(tarih):
+        """Veritabanındaki UTC tarihini epoch saniyesine çevirir"""
+        return tarih.replace(tzinfo=timezone.utc).timestamp()
+    
+    def _hazirla(self):
+        """Motoru gerekirse oluşturup tohumlar veya tazeleme zamanı geldiyse yeni işlemleri ekler"""
+        with self._kilit:
+            if self._motor is None or self._pid != os.getpid():
+                motor = KuralMotoru(self.kurallar)
+                baslangic = datetime.utcnow() - timedelta(seconds=motor.en_uzun_pencere())
+                satirlar = self._giden_hareketler(Islem.tarih >= baslangic)
+                motor.tohumla((hesap_id, self._an(tarih), tutar) for _, hesap_id, tarih, tutar in
+                              sorted(satirlar, key=lambda satir: satir.tarih))
+                self._motor, self._pid, self._yerel = motor, os.getpid(), set()
+                self._son_id = satirlar[-1].id if satirlar else (db.session.query(db.func.max(Islem.id)).scalar() or 0)
+                self._son_tazeleme = time.monotonic()
+            elif self.tazeleme_suresi and time.monotonic() - self._son_tazeleme >= self.tazeleme_suresi:
+                for islem_id, hesap_id, tarih, tutar in self._giden_hareketler(Islem.id > self._son_id):
+                    if islem_id in self._yerel:
+                        self._yerel.discard(islem_id)  # Commit sonrası zaten eklendi
+                    else:
+                        self._motor.kaydet(hesap_id, tutar, self._an(tarih))
+                    self._son_id = islem_id
+                self._son_tazeleme = time.monotonic()
+    
+    def degerlendir(self, hesap_id, tutar, bekleyen_adet=0, bekleyen_tutar=0):
+        """Hesaptan 'tutar' çıkışını kurallara göre değerlendirir (bkz. dolandiricilik.Karar)"""
+        self._hazirla()
+        return self._motor.degerlendir(hesap_id, tutar, bekleyen_adet=bekleyen_adet, bekleyen_tutar=bekleyen_tutar)
+    
+    def kaydet(self, islem_id, hesap_id, tutar):
+        """Commit edilen çıkışı sayaçlara ekler"""
+        self._motor.kaydet(hesap_id, tutar)
+        if self.tazeleme_suresi:
+            with self._kilit:
+                self._yerel.add(islem_id)
+
+# ============================================
+# TRANSFER SERVİSİ
+# ============================================
+
+# Bakiye değişiklikleri "oku - Python'da kontrol et - yaz" yerine veritabanında tek bir
+# koşullu UPDATE ile yapılır. Böylece aynı anda çalışan istekler (birden fazla worker)
+# bakiye kontrolünü birlikte geçip hesabı eksiye düşüremez veya birbirinin
+# güncellemesini ezemez.
+
+class TransferHatasi(Exception):
+    """Transfer kurallarına uymayan isteklerde fırlatılır; mesajı kullanıcıya gösterilir"""
+
+def hesaplari_kilitle(hesap_idleri):
+    """Satır kilidi destekleyen veritabanlarında (PostgreSQL) hesapları artan id sırasıyla kilitler
+    
+    Tüm işlemler kilitleri aynı sırayla aldığından karşılıklı bekleme (deadlock) oluşmaz.
+    SQLite yazma sırasında veritabanının tamamını kilitlediği için orada ek sorgu atılmaz.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        return
+    db.session.execute(
+        db.select(Hesap.id).where(Hesap.id.in_(hesap_idleri)).order_by(Hesap.id).with_for_update()
+    )
+
+def _bakiye_guncelle(guncelleme, hesap_id):
+    """Bakiye UPDATE'ini çalıştırır ve güncellenen satırın yeni bakiyesini döndürür (satır yoksa None)
+    
+    RETURNING destekleyen veritabanlarında yeni bakiye aynı ifadeyle okunur; diğerlerinde
+    satır bu işlem tarafından kilitli olduğundan ayrı bir SELECT ile okunur.
+    """
+    guncelleme = guncelleme.execution_options(synchronize_session=False)
+    if db.engine.dialect.update_returning:
+        return db.session.execute(guncelleme.returning(Hesap.bakiye)).scalar()
+    if db.session.execute(guncelleme).rowcount != 1:
+        return None
+    return db.session.execute(db.select(Hesap.bakiye).where(Hesap.id == hesap_id)).scalar()
+
+def bakiye_dus(hesap_id, tutar):
+    """Bakiye yeterliyse tutarı tek bir koşullu UPDATE ile düşer ve yeni bakiyeyi döndürür; yetersizse None döner"""
+    return _bakiye_guncelle(
+        db.update(Hesap).where(Hesap.id == hesap_id, Hesap.bakiye >= tutar).values(bakiye=Hesap.bakiye - tutar),
+        hesap_id
+    )
+
+def bakiye_ekle(hesap_id, tutar):
+    """Tutarı tek bir UPDATE ile hesabın bakiyesine ekler ve yeni bakiyeyi döndürür"""
+    return _bakiye_guncelle(
+        db.update(Hesap).where(Hesap.id == hesap_id).values(bakiye=Hesap.bakiye + tutar),
+        hesap_id
+    )
+
+def borclari_dus(borclar):
+    """{hesap id: tutar} borçlarını bakiyesi yeten hesaplardan düşer ve {hesap id: yeni bakiye} döndürür
+    
+    RETURNING destekleyen veritabanlarında hesaplar, VALUES listesiyle birleştirilen tek bir
+    koşullu UPDATE ile düşülür; bakiyesi yetmeyen hesaplar sonuçta yer almaz. Diğerlerinde
+    hesaplar artan id sırasıyla tek tek düşülür.
+    """
+    yeni_bakiyeler = {}
+    if not db.engine.dialect.update_returning:
+        for hesap_id in sorted(borclar):
+            bakiye = bakiye_dus(hesap_id, borclar[hesap_id])
+            if bakiye is not None:
+                yeni_bakiyeler[hesap_id] = bakiye
+        return yeni_bakiyeler
+    
+    for parca in parcala(sorted(borclar.items()), 5000):  # Çok büyük listelerde parametre sınırını aşmamak için
+        borc = db.values(db.column('h_id', db.Integer), db.column('h_tutar', Para()), name='borc').data(parca).cte('borc')
+        yeni_bakiyeler.update(db.session.execute(
+            db.update(Hesap).where(Hesap.id == borc.c.h_id, Hesap.bakiye >= borc.c.h_tutar)
+            .values(bakiye=Hesap.bakiye - borc.c.h_tutar).returning(Hesap.id, Hesap.bakiye)
+            .execution_options(synchronize_session=False)
+        ).all())
+    return yeni_bakiyeler
+
+# İstemcinin gönderdiği idempotency anahtarları - IslemAnahtari.anahtar kolonuna (String(64)) sığmalı
+ISLEM_ANAHTARI_DESENI = re.compile(r'[A-Za-z0-9._:~-]{1,%d}' % IslemAnahtari.anahtar.type.length)
+GECERSIZ_ISLEM_ANAHTARI = 'Geçersiz işlem anahtarı: en fazla 64 harf, rakam veya . _ : ~ - karakteri olmalı.'
+
+def islem_anahtari_gecerli_mi(anahtar):
+    """Anahtar yoksa veya kolona sığan, izin verilen karakterlerden oluşuyorsa True döndürür"""
+    return not anahtar or ISLEM_ANAHTARI_DESENI.fullmatch(anahtar) is not None
+
+class IslemAnahtariCakismasi(TransferHatasi):
+    """Aynı idempotency anahtarı farklı bir istekle (tutar, hesap vb.) tekrar gönderildiğinde fırlatılır"""
+
+def istek_parmak_izi(islem_turu, gonderen_hesap_id, alici_hesap_id, tutar):
+    """Anahtarla birlikte saklanan istek özetini döndürür - Aynı anahtarla gelen farklı istek bununla ayırt edilir"""
+    ham = f'{islem_turu}|{gonderen_hesap_id}|{alici_hesap_id}|{Decimal(tutar).quantize(KURUS)}'
+    return hashlib.sha256(ham.encode()).hexdigest()
+
+def kart_anahtar_kapsami(kart_id):
+    """POS'un gönderdiği anahtarların kapsamı - Kart başına ayrıdır, kart sahibinin transfer anahtarlarıyla çakışmaz"""
+    return f'kart:{kart_id}'
+
+def anahtarli_islem(kullanici_id, anahtar, parmak_izi, kapsam='transfer'):
+    """Daha önce aynı idempotency anahtarıyla oluşturulmuş işlemi döndürür (yoksa None)
+    
+    Anahtar kullanıcı ve kapsam bazında tekildir. Anahtar daha önce farklı bir istekle
+    kullanıldıysa (saklanan özet veya oluşan işlem bu istekle eşleşmiyorsa) ilk işlem
+    başarılı bir tekrar gibi döndürülmez, IslemAnahtariCakismasi fırlatılır.
+    """
+    if not anahtar:
+        return None
+    kayit = db.session.get(IslemAnahtari, (kullanici_id, kapsam, anahtar))
+    if kayit is None:
+        return None
+    islem = db.session.get(Islem, kayit.islem_id)
+    if kayit.parmak_izi != parmak_izi or istek_parmak_izi(islem.islem_turu, islem.gonderen_hesap_id,
+                                                           islem.alici_hesap_id, islem.tutar) != parmak_izi:
+        raise IslemAnahtariCakismasi('Bu işlem anahtarı daha önce farklı bir istek için kullanıldı.')
+    return islem
+
+def _transfer_olayi(islem_id, gonderen_hesap_id, alici_hesap_id, tutar, islem_turu, tarih, kullanici_id=None):
+    """'transfer.tamamlandi' olayının verisi"""
+    return {'islem_id': islem_id, 'gonderen_hesap_id': gonderen_hesap_id, 'alici_hesap_id': alici_hesap_id,
+            'tutar': tutar, 'islem_turu': islem_turu, 'tarih': tarih.isoformat(), 'kullanici_id': kullanici_id}
+
+def transfer_yap(gonderen_hesap_id, alici_hesap_id, tutar, aciklama='', islem_turu='Transfer',
+                 kullanici_id=None, anahtar=None):
+    """İki hesap arasında atomik para transferi yapar ve (işlem, yeni_mi) döndürür
+    
+    Gönderen hesaptan düşme, alıcı hesaba ekleme, Islem kaydı ve idempotency anahtarı
+    tek bir veritabanı işleminde (transaction) yazılır. Aynı anahtarla tekrar gelen
+    istekte transfer yeniden uygulanmaz; ilk istekte oluşan işlem yeni_mi=False ile döner.
+    Anahtar farklı bir tutar/hesapla tekrar gelirse IslemAnahtariCakismasi, kurallara uymayan
+    diğer isteklerde TransferHatasi fırlatılır.
+    """
+    # Tekrar gönderilmiş istek mi? (ör. ağ hatası sonrası yeniden gönderilen form)
+    parmak_izi = istek_parmak_izi(islem_turu, gonderen_hesap_id, alici_hesap_id, tutar)
+    onceki_islem = anahtarli_islem(kullanici_id, anahtar, parmak_izi)
+    if onceki_islem:
+        return onceki_islem, False
+    
+    # Aynı hesaba transfer kontrolü - Kendi hesabına transfer yapılamaz
+    if gonderen_hesap_id == alici_hesap_id:
+        raise TransferHatasi('Kendi hesabınıza transfer yapamazsınız.')
+    
+    # Tutar kontrolü - Tutar pozitif olmalı
+    if tutar <= 0:
+        raise TransferHatasi('Transfer tutarı 0\'dan büyük olmalıdır.')
+    
+    # Hız/limit kuralları - Bellekteki sayaçlarla, veritabanına yazmadan önce
+    karar = hiz_kontrolu.degerlendir(gonderen_hesap_id, tutar) if hiz_kontrolu else None
+    if karar and karar.engellendi:
+        current_app.logger.warning('Transfer engellendi (hesap %s, %s TL): %s', gonderen_hesap_id, tutar, ', '.join(karar.kurallar))
+        raise TransferHatasi('Transfer güvenlik limitlerini aştığı için engellendi.')
+    
+    try:
+        hesaplari_kilitle([gonderen_hesap_id, alici_hesap_id])
+        
+        # Bakiyeler artan hesap id sırasıyla güncellenir (tutarlı kilit sırası)
+        yeni_bakiyeler = {}
+        for hesap_id in sorted((gonderen_hesap_id, alici_hesap_id)):
+            if hesap_id == alici_hesap_id:
+                yeni_bakiyeler[hesap_id] = bakiye_ekle(hesap_id, tutar)  # Alıcı hesaba ekle
+            else:
+                yeni_bakiyeler[hesap_id] = bakiye_dus(hesap_id, tutar)  # Gönderen hesaptan düş (bakiye yeterliyse)
+                if yeni_bakiyeler[hesap_id] is None:
+                    raise TransferHatasi('Yetersiz bakiye.')
+        
+        # İşlem kaydı oluştur (işlem sonrası bakiyelerle birlikte)
+        islem = Islem(
+            gonderen_hesap_id=gonderen_hesap_id,
+            alici_hesap_id=alici_hesap_id,
+            tutar=tutar,
+            aciklama=aciklama,
+            islem_turu=islem_turu,
+            gonderen_bakiye_sonrasi=yeni_bakiyeler[gonderen_hesap_id],
+            alici_bakiye_sonrasi=yeni_bakiyeler[alici_hesap_id]
+        )
+        db.session.add(islem)
+        db.session.flush()  # islem.id'yi al
+        
+        if anahtar:
+            db.session.add(IslemAnahtari(kullanici_id=kullanici_id, anahtar=anahtar, parmak_izi=parmak_izi,
+                                         islem_id=islem.id))
+        
+        olay_ekle('transfer.tamamlandi', _transfer_olayi(islem.id, gonderen_hesap_id, alici_hesap_id, tutar,
+                                                        islem_turu, islem.tarih, kullanici_id))
+        if karar and karar.isaretlendi:  # İnceleme için işaretlenen transfer
+            olay_ekle('transfer.isaretlendi', dict(_transfer_olayi(islem.id, gonderen_hesap_id, alici_hesap_id, tutar,
+                                                                   islem_turu, islem.tarih, kullanici_id),
+                                                   kurallar=karar.kurallar))
+        
+        db.session.commit()  # Hepsi (olay dahil) birlikte kaydedilir ya da hiçbiri kaydedilmez
+    except TransferHatasi:
+        db.session.rollback()  # Yapılan bakiye değişikliklerini geri al
+        raise
+    except IntegrityError:
+        # Aynı anahtarla eşzamanlı gelen başka bir istek önce kaydedildi
+        db.session.rollback()
+        onceki_islem = anahtarli_islem(kullanici_id, anahtar, parmak_izi)
+        if onceki_islem is None:
+            raise
+        return onceki_islem, False
+    
+    if hiz_kontrolu:
+        hiz_kontrolu.kaydet(islem.id, gonderen_hesap_id, tutar)
+    return islem, True
+
+def parcala(liste, boyut):
+    """Listeyi en fazla 'boyut' elemanlı parçalara böler"""
+    for baslangic in range(0, len(liste), boyut):
+        yield liste[baslangic:baslangic + boyut]
+
+def toplu_transfer(talimatlar, parca_boyutu=1000, islem_turu='Transfer'):
+    """Çok sayıda transfer talimatını (maaş ödemesi vb.) toplu olarak uygular ve satır bazında rapor döndürür
+    
+    Her talimat gonderen_hesap_no, alici_hesap_no, tutar ve aciklama anahtarlarını içerir.
+    Tüm hesaplar tek bir IN sorgusuyla çözülür, bakiyeler tek geçişte kontrol edilir;
+    geçerli talimatlar parca_boyutu'luk parçalar halinde toplu UPDATE/INSERT ile yazılır
+    ve her parça ayrı commit edilir. Her talimat transfer_yap'taki hız/limit kurallarından da
+    geçer (dosyadaki önceki talimatlar da sayılır); engellenen satır 'Hata' olur, işaretlenen
+    için 'transfer.isaretlendi' olayı yazılır. Rapordaki her satırın durumu 'Başarılı' veya 'Hata'dır.
+    """
+    talimatlar = list(talimatlar)
+    
+    # Talimatlardaki tüm hesap numaralarını tek sorguda çöz
+    hesap_nolari = sorted({talimat.get(alan) for talimat in talimatlar
+                           for alan in ('gonderen_hesap_no', 'alici_hesap_no') if talimat.get(alan)})
+    hesaplar = {}  # hesap_no -> (id, bakiye)
+    hesap_sahipleri = {}  # hesap id -> kullanıcı id (önbellek temizliği için)
+    for parca in parcala(hesap_nolari, 10000):  # Çok büyük listelerde parametre sınırını aşmamak için
+        sorgu = db.select(Hesap.hesap_no, Hesap.id, Hesap.bakiye, Hesap.kullanici_id).where(Hesap.hesap_no.in_(parca))
+        for hesap_no, hesap_id, bakiye, kullanici_id in db.session.execute(sorgu):
+            hesaplar[hesap_no] = (hesap_id, bakiye)
+            hesap_sahipleri[hesap_id] = kullanici_id
+    
+    # Tek geçişte doğrulama ve bakiye kontrolü (talimat sırasına göre)
+    rapor = []
+    gecerliler = []  # (rapor satırı, gönderen id, alıcı id, tutar, açıklama)
+    kalan_bakiye = {}  # Gönderen hesap id -> bu çalışmada kalan bakiye
+    bekleyen = defaultdict(lambda: (0, Decimal(0)))  # Gönderen hesap id -> bu çalışmada kabul edilen (adet, tutar)
+    isaretlenenler = {}  # Rapor satır no -> tetiklenen kurallar (inceleme için işaretlenen talimatlar)
+    for sira, talimat in enumerate(talimatlar, start=1):
+        satir = {
+            'satir': sira,
+            'gonderen_hesap_no': talimat.get('gonderen_hesap_no'),
+            'alici_hesap_no': talimat.get('alici_hesap_no'),
+            'tutar': talimat.get('tutar'),
+            'durum': 'Hata',
+            'mesaj': '',
+        }
+        rapor.append(satir)
+        
+        tutar = tutar_coz(talimat.get('tutar'))
+        gonderen = hesaplar.get(satir['gonderen_hesap_no'])
+        alici = hesaplar.get(satir['alici_hesap_no'])
+        if tutar is None or tutar <= 0:
+            satir['mesaj'] = 'Geçersiz tutar.'
+        elif gonderen is None:
+            satir['mesaj'] = 'Gönderen hesap bulunamadı.'
+        elif alici is None:
+            satir['mesaj'] = 'Alıcı hesap bulunamadı.'
+        elif gonderen[0] == alici[0]:
+            satir['mesaj'] = 'Gönderen ve alıcı hesap aynı olamaz.'
+        elif kalan_bakiye.get(gonderen[0], gonderen[1]) < tutar:
+            satir['mesaj'] = 'Yetersiz bakiye.'
+        else:
+            # Hız/limit kuralları - Dosyadaki önceki talimatlar henüz sayaçlarda olmadığından bekleyen olarak eklenir
+            karar = hiz_kontrolu.degerlendir(gonderen[0], tutar, *bekleyen[gonderen[0]]) if hiz_kontrolu else None
+            if karar and karar.engellendi:
+                current_app.logger.warning('Toplu transfer engellendi (satır %s, hesap %s, %s TL): %s', sira,
+                                           gonderen[0], tutar, ', '.join(karar.kurallar))
+                satir['mesaj'] = 'Transfer güvenlik limitlerini aştığı için engellendi.'
+                continue
+            if karar and karar.isaretlendi:
+                isaretlenenler[sira] = karar.kurallar
+            adet, toplam = bekleyen[gonderen[0]]
+            bekleyen[gonderen[0]] = (adet + 1, toplam + tutar)
+            kalan_bakiye[gonderen[0]] = kalan_bakiye.get(gonderen[0], gonderen[1]) - tutar
+            gecerliler.append((satir, gonderen[0], alici[0], tutar, talimat.get('aciklama') or ''))
+    
+    # Geçerli talimatları parça parça uygula - Uygulananlar commit sonrası hız sayaçlarına eklenir
+    for parca in parcala(gecerliler, parca_boyutu):
+        for islem_id, gonderen_id, tutar in _toplu_transfer_parcasi(parca, islem_turu, isaretlenenler=isaretlenenler):
+            if hiz_kontrolu:
+                hiz_kontrolu.kaydet(islem_id, gonderen_id, tutar)
+    
+    # Bakiyesi değişen kullanıcıların dashboard önbelleğini temizle
+    dashboard_onbellegini_temizle(*{
+        hesap_sahipleri[hesap_id]
+        for satir, gonderen_id, alici_id, _, _ in gecerliler if satir['durum'] == 'Başarılı'
+        for hesap_id in (gonderen_id, alici_id)
+    })
+    
+    return rapor
+
+def _toplu_transfer_parcasi(parca, islem_turu, commit=True, isaretlenenler=None):
+    """Bir parça transfer talimatını tek bir veritabanı işleminde (transaction) uygular
+    
+    Gönderen hesaplardan düşülecek tutarlar hesap bazında toplanıp koşullu UPDATE ile
+    düşülür. Bu sırada bakiyesi başka bir işlemle azalmış olan hesabın talimatları
+    'Yetersiz bakiye' ile reddedilir; diğer talimatlar etkilenmez. commit=False ise
+    commit'i, aynı işlemde başka değişiklikler de yazan çağıran yapar. isaretlenenler
+    ({rapor satır no: kurallar}) içindeki talimatlar için 'transfer.isaretlendi' olayı da yazılır.
+    Uygulanan talimatları [(işlem id, gönderen id, tutar)] olarak döndürür.
+    """
+    borclar = defaultdict(Decimal)  # Gönderen id -> toplam tutar
+    for _, gonderen_id, _, tutar, _ in parca:
+        borclar[gonderen_id] += tutar
+    
+    hesaplari_kilitle(sorted(set(borclar) | {alici_id for _, _, alici_id, _, _ in parca}))
+    
+    # Gönderen hesaplardan düş (tek koşullu UPDATE ile)
+    yetersiz = set(borclar) - set(borclari_dus(borclar))
+    uygulananlar = [talimat for talimat in parca if talimat[1] not in yetersiz]
+    
+    # Alıcı hesaplara ekle - Hesap başına tek satır, tek executemany çağrısı
+    alacaklar = defaultdict(Decimal)  # Alıcı id -> toplam tutar
+    for _, _, alici_id, tutar, _ in uygulananlar:
+        alacaklar[alici_id] += tutar
+    if alacaklar:
+        hesap_tablosu = Hesap.__table__
+        db.session.execute(
+            db.update(hesap_tablosu)
+            .where(hesap_tablosu.c.id == db.bindparam('h_id'))
+            .values(bakiye=hesap_tablosu.c.bakiye + db.bindparam('h_tutar', type_=Para())),
+            [{'h_id': alici_id, 'h_tutar': tutar} for alici_id, tutar in sorted(alacaklar.items())]
+        )
+    
+    # İşlem kayıtlarını toplu ekle
+    islem_idleri = []
+    if uygulananlar:
+        # İşlem sonrası bakiyeler - Parça sonundaki bakiyelerden geriye doğru parça başı bakiyesi
+        # bulunur, ardından talimatlar sırayla uygulanarak her satırın sonrası hesaplanır
+        hesap_idleri = {alici_id for _, _, alici_id, _, _ in uygulananlar} | (set(borclar) - yetersiz)
+        bakiyeler = dict(db.session.execute(
+            db.select(Hesap.id, Hesap.bakiye).where(Hesap.id.in_(hesap_idleri))
+        ).all())
+        for _, gonderen_id, alici_id, tutar, _ in uygulananlar:
+            bakiyeler[gonderen_id] += tutar
+            bakiyeler[alici_id] -= tutar
+        
+        tarih = datetime.utcnow()
+        kayitlar = []
+        for _, gonderen_id, alici_id, tutar, aciklama in uygulananlar:
+            bakiyeler[gonderen_id] -= tutar
+            bakiyeler[alici_id] += tutar
+            kayitlar.append({
+                'gonderen_hesap_id': gonderen_id,
+                'alici_hesap_id': alici_id,
+                'tutar': tutar,
+                'aciklama': aciklama,
+                'islem_turu': islem_turu,
+                'gonderen_bakiye_sonrasi': bakiyeler[gonderen_id],
+                'alici_bakiye_sonrasi': bakiyeler[alici_id],
+                'tarih': tarih,
+            })
+        islem_idleri = db.session.scalars(
+            db.insert(Islem).returning(Islem.id, sort_by_parameter_order=True), kayitlar
+        ).all()
+        olaylar = []
+        for (satir, _, _, _, _), islem_id, kayit in zip(uygulananlar, islem_idleri, kayitlar):
+            olay = _transfer_olayi(islem_id, kayit['gonderen_hesap_id'], kayit['alici_hesap_id'],
+                                   kayit['tutar'], islem_turu, tarih)
+            olaylar.append(('transfer.tamamlandi', olay))
+            if isaretlenenler and satir.get('satir') in isaretlenenler:  # İnceleme için işaretlenen transfer
+                olaylar.append(('transfer.isaretlendi', dict(olay, kurallar=isaretlenenler[satir['satir']])))
+        olaylari_ekle(olaylar)
+    
+    if commit:
+        db.session.commit()
+    
+    for satir, gonderen_id, _, _, _ in parca:
+        if gonderen_id in yetersiz:
+            satir['mesaj'] = 'Yetersiz bakiye.'
+        else:
+            satir['durum'] = 'Başarılı'
+    return [(islem_id, gonderen_id, tutar)
+            for islem_id, (_, gonderen_id, _, tutar, _) in zip(islem_idleri, uygulananlar)]
+
+def toplu_yukleme(tutar, aciklama='Bakiye Yüklemesi', parca_boyutu=10000, deneme=False, ilerleme=None):
+    """Tüm kullanıcıların ilk vadesiz hesabına aynı tutarı yükler (test verisi, promosyon vb.)
+    
+    Kullanıcılar id sırasına göre parca_boyutu'luk parçalar halinde işlenir ve her parça
+    ayrı commit edilir. Parça başına: vadesiz hesabı olanlar için tek bir UPDATE, olmayanlar
+    için tek bir toplu INSERT (bakiye yüklenen tutarla açılır) ve her yükleme için
+    INSERT ... SELECT ile 'Yükleme' türünde bir işlem kaydı. deneme=True ise hiçbir şey
+    yazılmaz, sadece etkilenecek kayıtlar sayılır. ilerleme verilirse her parçadan sonra
+    o ana kadarki özetle çağrılır. Özet sözlüğü döndürür.
+    """
+    ozet = {'kullanici': 0, 'guncellenen_hesap': 0, 'yeni_hesap': 0, 'toplam_tutar': Decimal(0)}
+    son_id = 0
+    while True:
+        # Sıradaki parçanın kullanıcı id aralığı
+        kullanici_idleri = db.session.scalars(
+            db.select(User.id).where(User.id > son_id).order_by(User.id).limit(parca_boyutu)
+        ).all()
+        if not kullanici_idleri:
+            break
+        aralik = (kullanici_idleri[0], kullanici_idleri[-1])
+        son_id = aralik[1]
+        
+        # Her kullanıcının yükleme yapılacak hesabı: ilk (en küçük id'li) vadesiz hesabı
+        ilk_vadesizler = (db.select(db.func.min(Hesap.id))
+                          .where(Hesap.hesap_turu == 'Vadesiz', Hesap.kullanici_id.between(*aralik))
+                          .group_by(Hesap.kullanici_id))
+        vadesizi_olan = db.select(Hesap.id).where(Hesap.hesap_turu == 'Vadesiz', Hesap.kullanici_id == User.id)
+        hesapsizlar = db.session.execute(
+            db.select(User.id, User.tc_no).where(User.id.between(*aralik), ~vadesizi_olan.exists())
+        ).all()
+        
+        if deneme:
+            guncellenen = len(kullanici_idleri) - len(hesapsizlar)
+        else:
+            # Mevcut vadesiz hesaplar - Tek set tabanlı UPDATE
+            guncellenen = db.session.execute(
+                db.update(Hesap).where(Hesap.id.in_(ilk_vadesizler)).values(bakiye=Hesap.bakiye + tutar)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            
+            # Vadesiz hesabı olmayanlar - Kayıt sırasındaki hesap numarası kuralıyla toplu INSERT
+            if hesapsizlar:
+                db.session.execute(db.insert(Hesap), [
+                    {'hesap_no': f"{tc_no}{kullanici_id:05d}"[:16], 'kullanici_id': kullanici_id,
+                     'bakiye': tutar, 'hesap_turu': 'Vadesiz'}
+                    for kullanici_id, tc_no in hesapsizlar
+                ])
+            
+            # Denetim kaydı - Her yükleme için hesabın yeni bakiyesiyle bir işlem satırı (INSERT ... SELECT)
+            db.session.execute(
+                db.insert(Islem).from_select(
+                    ['gonderen_hesap_id', 'alici_hesap_id', 'tutar', 'aciklama', 'islem_turu', 'tarih',
+                     'gonderen_bakiye_sonrasi', 'alici_bakiye_sonrasi'],
+                    db.select(Hesap.id, Hesap.id, db.literal(tutar, type_=Para()), db.literal(aciklama),
+                              db.literal('Yükleme'), db.literal(datetime.utcnow(), type_=db.DateTime()),
+                              Hesap.bakiye, Hesap.bakiye)
+                    .where(Hesap.id.in_(ilk_vadesizler))
+                )
+            )
+            db.session.commit()
+            
+            dashboard_onbellegini_temizle(*kullanici_idleri)  # Bakiyeler değişti
+            kullanici_onbellegini_temizle(*(kullanici_id for kullanici_id, _ in hesapsizlar))  # Hesap listesi değişti
+        
+        ozet['kullanici'] += len(kullanici_idleri)
+        ozet['guncellenen_hesap'] += guncellenen
+        ozet['yeni_hesap'] += len(hesapsizlar)
+        ozet['toplam_tutar'] += tutar * (guncellenen + len(hesapsizlar))
+        if ilerleme:
+            ilerleme(ozet)
+    
+    return ozet
+
+# ============================================
+# KART YETKİLENDİRME
+# ============================================
+
+# POS'tan gelen kart harcamaları istek başına birkaç milisaniyede yetkilendirilir. Kartın
+# doğrulama bilgileri (hesap, tür, durum, son kullanma, CVV özeti) kart numarasının özetiyle
+# önbellekte tutulur; bilinmeyen numaralar da kısa süre önbellekte kalır. Limit ve bakiye
+# önbellekten okunmaz: kredi kartlarında kullanılan limit, banka kartlarında hesap bakiyesi
+# tek bir koşullu UPDATE ile ayrılır, böylece eşzamanlı harcamalar limiti aşamaz.
+
+def _kart_anahtari(kart_no):
+    """Kart durumunun önbellek anahtarı (kart numarası önbellekte açık tutulmaz)"""
+    return f'kart:{hashlib.sha256(kart_no.encode()).hexdigest()}'
+
+def _kart_dogrulama_ozeti(kart_no, son_kullanim_tarihi, cvv):
+    """Son kullanma tarihi ve CVV'nin gizli anahtarla alınmış özeti"""
+    mesaj = f'{kart_no}:{son_kullanim_tarihi}:{cvv}'.encode()
+    return hmac.new(current_app.config['SECRET_KEY'].encode(), mesaj, hashlib.sha256).hexdigest()
+
+def kart_durumu(kart_no):
+    """Kartın yetkilendirme bilgilerini önbellekten (yoksa tek sorguyla veritabanından) döndürür; kart yoksa None"""
+    anahtar = _kart_anahtari(kart_no)
+    kart = onbellek.getir(anahtar)
+    if kart is None:
+        satir = db.session.execute(
+            db.select(Kart.id, Kart.kullanici_id, Kart.hesap_id, Kart.kart_turu, Kart.durum,
+                      Kart.son_kullanim_tarihi, Kart.cvv).where(Kart.kart_no == kart_no)
+        ).first()
+        kart = {}  # Bilinmeyen numara da önbelleğe alınır (numara taraması veritabanına gitmez)
+        if satir:
+            kart = {'id': satir.id, 'kullanici_id': satir.kullanici_id, 'hesap_id': satir.hesap_id,
+                    'kart_turu': satir.kart_turu, 'durum': satir.durum, 'son_kullanim_tarihi': satir.son_kullanim_tarihi,
+                    'ozet': _kart_dogrulama_ozeti(kart_no, satir.son_kullanim_tarihi, satir.cvv)}
+        onbellek.koy(anahtar, kart, sure=current_app.config['KART_ONBELLEK_SURESI'])
+    return kart or None
+
+def kart_onbellegini_temizle(*kart_nolar):
+    """Kartların önbellekteki durumunu siler (kart oluşturulduğunda veya durumu değiştiğinde çağrılır)"""
+    onbellek.sil(*(_kart_anahtari(kart_no) for kart_no in kart_nolar))
+
+def kart_suresi_doldu_mu(son_kullanim_tarihi, bugun=None):
+    """MM/YY biçimindeki son kullanma tarihinin ayı geçmiş mi?"""
+    bugun = bugun or date.today()
+    ay, yil = son_kullanim_tarihi.split('/')
+    return (2000 + int(yil), int(ay)) < (bugun.year, bugun.month)
+
+def kart_harcamasi(kart_no, son_kullanim_tarihi, cvv, tutar, aciklama='', anahtar=None):
+    """Kart harcamasını yetkilendirip kaydeder ve (işlem, yeni_mi) döndürür; reddedilirse TransferHatasi fırlatır
+    
+    Onaylanan harcama, kartın bağlı hesabında bir işlem olarak kaydedilir. Banka kartı ve
+    sanal kartlarda tutar hesap bakiyesinden düşülür ('Kart Harcaması', hesaptan çıkış ve hız
+    kurallarına tabi). Kredi kartlarında kartın kullanılan limitine eklenir, hesap bakiyesi
+    değişmez ve işlem KREDI_KARTI_HARCAMASI türüyle hesap hareketlerinin dışında tutulur.
+    Aynı anahtarla (Idempotency-Key) tekrar gelen istek ikinci kez uygulanmaz; anahtarlar kart
+    bazındadır ve aynı anahtar farklı bir tutarla gelirse IslemAnahtariCakismasi fırlatılır.
+    """
+    kart = kart_durumu(kart_no)
+    if kart is None:
+        raise TransferHatasi('Kart bilgileri hatalı.')
+    
+    # Hatalı CVV/tarih denemeleri sayılır - Sınır aşılınca kart bir süre yetkilendirilmez
+    hata_anahtari = f'{_kart_anahtari(kart_no)}:hata'
+    hatali_deneme = onbellek.getir(hata_anahtari) or 0
+    if hatali_deneme >= current_app.config['KART_HATALI_DENEME_SINIRI']:
+        raise TransferHatasi('Çok fazla hatalı deneme. Kart geçici olarak kullanıma kapatıldı.')
+    if not hmac.compare_digest(kart['ozet'], _kart_dogrulama_ozeti(kart_no, son_kullanim_tarihi, cvv)):
+        onbellek.koy(hata_anahtari, hatali_deneme + 1, sure=current_app.config['KART_HATALI_DENEME_SURESI'])
+        raise TransferHatasi('Kart bilgileri hatalı.')
+    
+    if kart['durum'] != 'Aktif':
+        raise TransferHatasi('Kart kullanıma kapalı.')
+    if kart_suresi_doldu_mu(kart['son_kullanim_tarihi']):
+        raise TransferHatasi('Kartın süresi dolmuş.')
+    if tutar <= 0:
+        raise TransferHatasi('Harcama tutarı 0\'dan büyük olmalıdır.')
+    
+    hesap_id = kart['hesap_id']
+    kredi_karti = kart['kart_turu'] == 'Kredi Kartı'
+    islem_turu = KREDI_KARTI_HARCAMASI if kredi_karti else 'Kart Harcaması'
+    
+    # Tekrar gönderilmiş istek mi? (ör. zaman aşımı sonrası POS'un yeniden gönderdiği istek)
+    kapsam = kart_anahtar_kapsami(kart['id'])
+    parmak_izi = istek_parmak_izi(islem_turu, hesap_id, hesap_id, tutar)
+    onceki_islem = anahtarli_islem(kart['kullanici_id'], anahtar, parmak_izi, kapsam)
+    if onceki_islem:
+        return onceki_islem, False
+    
+    # Hız kuralları hesaptan çıkışları sayar - Kredi kartında hesaptan para çıkmaz, sınır kart limitidir
+    karar = hiz_kontrolu.degerlendir(hesap_id, tutar) if hiz_kontrolu and not kredi_karti else None
+    if karar and karar.engellendi:
+        current_app.logger.warning('Kart harcaması engellendi (kart %s, %s TL): %s', kart['id'], tutar, ', '.join(karar.kurallar))
+        raise TransferHatasi('Harcama güvenlik limitlerini aştığı için engellendi.')
+    
+    try:
+        if kredi_karti:
+            # Limit ayırma - Durum ve limit kontrolü aynı koşullu UPDATE'te (önbellekteki durum eski olabilir)
+            ayrildi = db.session.execute(
+                db.update(Kart)
+                .where(Kart.id == kart['id'], Kart.durum == 'Aktif', Kart.kullanilan_limit + tutar <= Kart.limit)
+                .values(kullanilan_limit=Kart.kullanilan_limit + tutar)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not ayrildi:
+                raise TransferHatasi('Yetersiz kart limiti.')
+            bakiye = db.session.execute(db.select(Hesap.bakiye).where(Hesap.id == hesap_id)).scalar()
+        else:
+            hesaplari_kilitle([hesap_id])
+            bakiye = bakiye_dus(hesap_id, tutar)  # Bakiye yeterliyse düş
+            if bakiye is None:
+                raise TransferHatasi('Yetersiz bakiye.')
+        
+        # İşlem kaydı - Aynı hesaplı işlem; banka kartında hesaptan çıkış sayılır, kredi kartında sayılmaz
+        islem = Islem(
+            gonderen_hesap_id=hesap_id,
+            alici_hesap_id=hesap_id,
+            tutar=tutar,
+            aciklama=aciklama,
+            islem_turu=islem_turu,
+            gonderen_bakiye_sonrasi=bakiye,
+            alici_bakiye_sonrasi=bakiye
+        )
+        db.session.add(islem)
+        db.session.flush()  # islem.id'yi al
+        
+        if anahtar:
+            db.session.add(IslemAnahtari(kullanici_id=kart['kullanici_id'], kapsam=kapsam, anahtar=anahtar,
+                                         parmak_izi=parmak_izi, islem_id=islem.id))
+        
+        olay = dict(_transfer_olayi(islem.id, hesap_id, hesap_id, tutar, islem.islem_turu, islem.tarih,
+                                    kart['kullanici_id']), kart_id=kart['id'])
+        olay_ekle('kart.harcama', olay)
+        if karar and karar.isaretlendi:  # İnceleme için işaretlenen harcama
+            olay_ekle('transfer.isaretlendi', dict(olay, kurallar=karar.kurallar))
+        
+        db.session.commit()
+    except TransferHatasi:
+        db.session.rollback()  # Ayrılan limit veya düşülen bakiyeyi geri al
+        raise
+    except IntegrityError:
+        # Aynı anahtarla eşzamanlı gelen başka bir istek önce kaydedildi
+        db.session.rollback()
+        onceki_islem = anahtarli_islem(kart['kullanici_id'], anahtar, parmak_izi, kapsam)
+        if onceki_islem is None:
+            raise
+        return onceki_islem, False
+    
+    if hiz_kontrolu and not kredi_karti:
+        hiz_kontrolu.kaydet(islem.id, hesap_id, tutar)
+    dashboard_onbellegini_temizle(kart['kullanici_id'])  # Bakiye ve kart limiti değişti
+    return islem, True
+
+# ============================================
+# TRANSFER TALİMATLARI
+# ============================================
+
+# İleri tarihli ve düzenli transferler web isteğinde değil, talimat_zamanlayici.py sürecinde
+# çalışır. Zamanlayıcı zamanı gelmiş talimatları (durum, sonraki_calisma) indeksinden parça
+# parça sahiplenir ve her parçayı toplu transferle aynı yoldan (_toplu_transfer_parcasi)
+# uygular; transferler ve talimatların yeni durumu aynı commit'te yazılır. Böylece çöken bir
+# zamanlayıcının yarım bıraktığı parça kira süresi sonunda tekrar alınır ve iki kez uygulanmaz.
+
+TALIMAT_SIKLIKLARI = ('Tek Sefer', 'Günlük', 'Haftalık', 'Aylık')
+
+def talimat_sonraki_calisma(siklik, onceki, ayin_gunu=None):
+    """Talimatın 'onceki' çalışmasından sonraki çalışma anını döndürür (tek seferlik talimatta None)
+    
+    Aylık talimatlar ayin_gunu'nda çalışır; ay o kadar uzun değilse ayın son gününde.
+    """
+    if siklik == 'Günlük':
+        return onceki + timedelta(days=1)
+    if siklik == 'Haftalık':
+        return onceki + timedelta(weeks=1)
+    if siklik == 'Aylık':
+        yil, ay = (onceki.year + 1, 1) if onceki.month == 12 else (onceki.year, onceki.month + 1)
+        return onceki.replace(year=yil, month=ay, day=min(ayin_gunu or onceki.day, calendar.monthrange(yil, ay)[1]))
+    return None
+
+def talimat_olustur(kullanici_id, gonderen_hesap_id, alici_hesap_id, tutar, siklik, ilk_calisma, aciklama=''):
+    """Yeni bir transfer talimatı kaydeder; geçersizse TransferHatasi fırlatır"""
+    if siklik not in TALIMAT_SIKLIKLARI:
+        raise TransferHatasi('Geçersiz talimat sıklığı.')
+    if gonderen_hesap_id == alici_hesap_id:
+        raise TransferHatasi('Kendi hesabınıza transfer yapamazsınız.')
+    if tutar <= 0:
+        raise TransferHatasi('Transfer tutarı 0\'dan büyük olmalıdır.')
+    if ilk_calisma.date() < datetime.utcnow().date():
+        raise TransferHatasi('Talimat tarihi geçmiş bir gün olamaz.')
+    
+    talimat = TransferTalimati(
+        kullanici_id=kullanici_id,
+        gonderen_hesap_id=gonderen_hesap_id,
+        alici_hesap_id=alici_hesap_id,
+        tutar=tutar,
+        aciklama=aciklama,
+        siklik=siklik,
+        ayin_gunu=ilk_calisma.day if siklik == 'Aylık' else None,
+        planlanan_tarih=ilk_calisma,
+        sonraki_calisma=ilk_calisma,
+    )
+    db.session.add(talimat)
+    db.session.commit()
+    return talimat
+
+def _talimatlari_sahiplen(limit):
+    """Zamanı gelmiş en fazla limit talimatı bu zamanlayıcı adına işaretler; (anahtar, talimatlar) döndürür
+    
+    Sahiplenme tek bir koşullu UPDATE ile yapılır; aynı anda çalışan zamanlayıcılar aynı talimatı
+    alamaz. Kira süresi içinde bitirilemeyen talimatlar yeniden sahiplenilebilir.
+    """
+    simdi = datetime.utcnow()
+    zamani_gelen = db.and_(TransferTalimati.durum.in_(('Aktif', 'İşleniyor')), TransferTalimati.sonraki_calisma <= simdi)
+    adaylar = db.session.scalars(
+        db.select(TransferTalimati.id).where(zamani_gelen)
+        .order_by(TransferTalimati.sonraki_calisma, TransferTalimati.id).limit(limit)
+    ).all()
+    if not adaylar:
+        return None, []
+    
+    isleyici = secrets.token_hex(16)
+    db.session.execute(
+        db.update(TransferTalimati).where(TransferTalimati.id.in_(adaylar), zamani_gelen)
+        .values(durum='İşleniyor', isleyici=isleyici,
+                sonraki_calisma=simdi + timedelta(seconds=current_app.config['TALIMAT_KIRA_SURESI']))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return isleyici, db.session.execute(
+        db.select(TransferTalimati.id, TransferTalimati.kullanici_id, TransferTalimati.gonderen_hesap_id,
+                  TransferTalimati.alici_hesap_id, TransferTalimati.tutar, TransferTalimati.aciklama,
+                  TransferTalimati.siklik, TransferTalimati.ayin_gunu, TransferTalimati.planlanan_tarih,
+                  TransferTalimati.deneme_sayisi)
+        .where(TransferTalimati.isleyici == isleyici, TransferTalimati.durum == 'İşleniyor')
+        .order_by(TransferTalimati.planlanan_tarih, TransferTalimati.id)
+    ).all()
+
+def talimatlari_calistir(limit=1000):
+    """Zamanı gelmiş en fazla limit talimatı tek bir veritabanı işleminde çalıştırır ve durum özeti döndürür
+    
+    Bakiyeler tek sorguyla okunup talimatlar sırayla kontrol edilir; yeterli bakiyesi olanlar
+    toplu olarak uygulanır. Bakiyesi yetmeyen talimat TALIMAT_TEKRAR_BEKLEME saniye sonra tekrar
+    denenir; TALIMAT_AZAMI_DENEME denemede de olmazsa tek seferlik talimat 'Başarısız' olur,
+    düzenli talimatın bu çalışması atlanır. Her iki durumda 'talimat.basarisiz' olayı yazılır.
+    Çalışmadığı sırada zamanı geçen tekrarlar telafi edilmez, talimat bir kez çalışır.
+    """
+    ozet = {'Başarılı': 0, 'Tekrar Denenecek': 0, 'Başarısız': 0}
+    isleyici, talimatlar = _talimatlari_sahiplen(limit)
+    if not talimatlar:
+        return ozet
+    
+    # Talimatlar para hareketinden önce bu işlemde kilitlenir (kira da uzatılır) - Commit'e kadar
+    # başka zamanlayıcı yeniden sahiplenemez, kullanıcı iptal edemez. Bu arada kirası dolup başka
+    # zamanlayıcıya geçen veya iptal edilen talimat kilitlenemez ve bu çalışmada atlanır.
+    sahipli = db.and_(TransferTalimati.id.in_([talimat.id for talimat in talimatlar]),
+                      TransferTalimati.isleyici == isleyici, TransferTalimati.durum == 'İşleniyor')
+    db.session.execute(
+        db.update(TransferTalimati).where(sahipli)
+        .values(sonraki_calisma=datetime.utcnow() + timedelta(seconds=current_app.config['TALIMAT_KIRA_SURESI']))
+        .execution_options(synchronize_session=False)
+    )
+    kilitli = set(db.session.scalars(db.select(TransferTalimati.id).where(sahipli)).all())
+    talimatlar = [talimat for talimat in talimatlar if talimat.id in kilitli]
+    if not talimatlar:
+        db.session.rollback()
+        return ozet
+    
+    # Bakiyeler ve hesap sahipleri tek sorguda - Talimatlar planlanma sırasıyla bakiyeden düşülür
+    hesap_idleri = {talimat.gonderen_hesap_id for talimat in talimatlar} | {talimat.alici_hesap_id for talimat in talimatlar}
+    hesaplar = db.session.execute(
+        db.select(Hesap.id, Hesap.bakiye, Hesap.kullanici_id).where(Hesap.id.in_(hesap_idleri))
+    ).all()
+    kalan_bakiye = {hesap_id: bakiye for hesap_id, bakiye, _ in hesaplar}
+    hesap_sahipleri = {hesap_id: kullanici_id for hesap_id, _, kullanici_id in hesaplar}
+    
+    satirlar = {}  # Talimat id -> sonuç satırı
+    gecerliler = []  # (sonuç satırı, gönderen id, alıcı id, tutar, açıklama)
+    for talimat in talimatlar:
+        satir = satirlar[talimat.id] = {'durum': 'Hata', 'mesaj': 'Yetersiz bakiye.'}
+        if kalan_bakiye.get(talimat.gonderen_hesap_id, 0) >= talimat.tutar:
+            kalan_bakiye[talimat.gonderen_hesap_id] -= talimat.tutar
+            gecerliler.append((satir, talimat.gonderen_hesap_id, talimat.alici_hesap_id, talimat.tutar,
+                               talimat.aciklama or ''))
+    
+    try:
+        if gecerliler:
+            _toplu_transfer_parcasi(gecerliler, 'Talimatlı Transfer', commit=False)
+        
+        simdi = datetime.utcnow()
+        degerler, olaylar = [], []
+        for talimat in talimatlar:
+            satir = satirlar[talimat.id]
+            deger = {'t_id': talimat.id, 't_son_hata': None, 't_deneme': 0, 't_son_calisma': None}
+            if satir['durum'] == 'Başarılı':
+                deger['t_son_calisma'] = simdi
+                planlanan = talimat.planlanan_tarih
+                ozet['Başarılı'] += 1
+            elif talimat.deneme_sayisi + 1 < current_app.config['TALIMAT_AZAMI_DENEME']:
+                deger.update(t_durum='Aktif', t_planlanan=talimat.planlanan_tarih, t_son_hata=satir['mesaj'],
+                             t_deneme=talimat.deneme_sayisi + 1,
+                             t_sonraki=simdi + timedelta(seconds=current_app.config['TALIMAT_TEKRAR_BEKLEME']))
+                degerler.append(deger)
+                ozet['Tekrar Denenecek'] += 1
+                continue
+            else:
+                deger['t_son_hata'] = satir['mesaj']
+                planlanan = talimat.planlanan_tarih
+                olaylar.append(('talimat.basarisiz', {'talimat_id': talimat.id, 'kullanici_id': talimat.kullanici_id,
+                                                      'tutar': talimat.tutar, 'planlanan_tarih': planlanan.isoformat(),
+                                                      'sebep': satir['mesaj']}))
+                ozet['Başarısız'] += 1
+            
+            # Sıradaki çalışma - Zamanı geçmiş tekrarlar atlanır
+            sonraki = talimat_sonraki_calisma(talimat.siklik, planlanan, talimat.ayin_gunu)
+            while sonraki is not None and sonraki <= simdi:
+                sonraki = talimat_sonraki_calisma(talimat.siklik, sonraki, talimat.ayin_gunu)
+            if sonraki is None:  # Tek seferlik talimat bitti
+                deger.update(t_durum='Tamamlandı' if satir['durum'] == 'Başarılı' else 'Başarısız',
+                             t_planlanan=planlanan, t_sonraki=planlanan)
+            else:
+                deger.update(t_durum='Aktif', t_planlanan=sonraki, t_sonraki=sonraki)
+            degerler.append(deger)
+        
+        # Talimatların yeni durumu tek executemany ile, transferlerle aynı commit'te
+        tablo = TransferTalimati.__table__
+        guncellenen = db.session.execute(
+            db.update(tablo)
+            .where(tablo.c.id == db.bindparam('t_id'), tablo.c.isleyici == isleyici, tablo.c.durum == 'İşleniyor')
+            .values(durum=db.bindparam('t_durum'), planlanan_tarih=db.bindparam('t_planlanan'),
+                    sonraki_calisma=db.bindparam('t_sonraki'), deneme_sayisi=db.bindparam('t_deneme'),
+                    son_hata=db.bindparam('t_son_hata'), isleyici=None,
+                    son_calisma=db.func.coalesce(db.bindparam('t_son_calisma', type_=db.DateTime()), tablo.c.son_calisma)),
+            degerler
+        ).rowcount
+        if db.engine.dialect.supports_sane_multi_rowcount and guncellenen < len(degerler):
+            # Kilitli talimatlardan biri yine de elden çıkmış - Transferler de geri alınır
+            db.session.rollback()
+            current_app.logger.warning('Talimat parçası geri alındı: %d talimattan %d tanesi güncellenebildi',
+                                       len(degerler), guncellenen)
+            return dict.fromkeys(ozet, 0)
+        if olaylar:
+            olaylari_ekle(olaylar)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()  # Talimatlar kira süresi sonunda tekrar sahiplenilir
+        raise
+    
+    # Bakiyesi değişen kullanıcıların dashboard önbelleğini temizle
+    dashboard_onbellegini_temizle(*{
+        hesap_sahipleri[hesap_id]
+        for satir, gonderen_id, alici_id, _, _ in gecerliler if satir['durum'] == 'Başarılı'
+        for hesap_id in (gonderen_id, alici_id)
+    })
+    return ozet
+
+# ============================================
+# HESAP BAKİYE GEÇMİŞİ VE GÜNLÜK ÖZETLER
+# ============================================
+
+def bakiye_tarihinde(hesap_id, an):
+    """Hesabın verilen andaki bakiyesini döndürür
+    
+    Hesabın o ana kadarki son işleminin işlem sonrası bakiyesi okunur; bu, gönderilen ve
+    alınan işlem indekslerinde birer aramadır ve geçmişin uzunluğundan bağımsızdır.
+    O ana kadar hiç işlem yoksa None döner. Sıcak tabloda o ana kadar işlem yoksa arşive bakılır.
+    """
+    bakiye = None
+    for tablo in reversed(hareket_tablolari(bitis=an)):  # En yeni tablodan başla
+        gonderilen = (db.select(tablo.tarih, tablo.id, tablo.gonderen_bakiye_sonrasi.label('bakiye'))
+                      .where(tablo.gonderen_hesap_id == hesap_id, tablo.tarih <= an)
+                      .order_by(tablo.tarih.desc(), tablo.id.desc()).limit(1).subquery())
+        alinan = (db.select(tablo.tarih, tablo.id, tablo.alici_bakiye_sonrasi.label('bakiye'))
+                  .where(tablo.alici_hesap_id == hesap_id, tablo.tarih <= an)
+                  .order_by(tablo.tarih.desc(), tablo.id.desc()).limit(1).subquery())
+        birlesik = db.union_all(db.select(gonderilen), db.select(alinan)).subquery()
+        bakiye = db.session.execute(
+            db.select(birlesik.c.bakiye).order_by(birlesik.c.tarih.desc(), birlesik.c.id.desc()).limit(1)
+        ).scalar()
+        if bakiye is not None:
+            break
+    return bakiye
+
+def giris_cikis_hareketleri(kosul, hesap_idleri=None, kolonlar=(), tablo=Islem):
+    """İşlemleri hesap bazında giriş/çıkış satırlarına açan UNION ALL alt sorgusunu döndürür
+    
+    Her işlem, gönderen hesap için bir çıkış ve alıcı hesap için bir giriş satırı üretir.
+    Aynı hesaplı işlemlerden yatırım çıkışı ve kart harcaması sadece çıkış, bakiye yüklemesi
+    sadece giriştir; kredi kartı harcaması hesap bakiyesini değiştirmediği için satır üretmez.
+    Alt sorgunun kolonları: hesap_id, giris, cikis, bakiye_sonrasi ve verilen Islem kolonları.
+    hesap_idleri verilirse sadece bu hesapların satırları üretilir (hesap indeksleri kullanılır).
+    tablo=IslemArsivi ile arşivdeki işlemler okunur (kosul ve kolonlar da o tablodan olmalıdır).
+    """
+    sifir = db.literal(0, type_=Para())
+    ayni_hesap = tablo.alici_hesap_id == tablo.gonderen_hesap_id
+    yukleme = db.and_(ayni_hesap, tablo.islem_turu == 'Yükleme')
+    kredi_karti = db.and_(ayni_hesap, tablo.islem_turu == KREDI_KARTI_HARCAMASI)
+    gonderen_kosulu = [kosul, ~yukleme, ~kredi_karti]
+    alici_kosulu = [kosul, db.or_(~ayni_hesap, yukleme)]
+    if hesap_idleri is not None:
+        gonderen_kosulu.append(tablo.gonderen_hesap_id.in_(hesap_idleri))
+        alici_kosulu.append(tablo.alici_hesap_id.in_(hesap_idleri))
+    return db.union_all(
+        db.select(tablo.gonderen_hesap_id.label('hesap_id'), sifir.label('giris'), tablo.tutar.label('cikis'),
+                  tablo.gonderen_bakiye_sonrasi.label('bakiye_sonrasi'), *kolonlar).where(*gonderen_kosulu),
+        db.select(tablo.alici_hesap_id.label('hesap_id'), tablo.tutar.label('giris'), sifir.label('cikis'),
+                  tablo.alici_bakiye_sonrasi.label('bakiye_sonrasi'), *kolonlar).where(*alici_kosulu),
+    ).subquery()
+
+def gun_ozetleri(gun):
+    """Verilen günde hareket gören her hesap için günlük özet satırlarını tek sorguda hesaplar"""
+    baslangic = datetime.combine(gun, datetime.min.time())
+    bitis = baslangic + timedelta(days=1)
+    hareketler = giris_cikis_hareketleri(db.and_(Islem.tarih >= baslangic, Islem.tarih < bitis),
+                                         kolonlar=(Islem.tarih, Islem.id))
+    
+    hesap = db.select(
+        hareketler.c.hesap_id,
+        hareketler.c.bakiye_sonrasi,
+        db.func.sum(hareketler.c.giris).over(partition_by=hareketler.c.hesap_id).label('giris'),
+        db.func.sum(hareketler.c.cikis).over(partition_by=hareketler.c.hesap_id).label('cikis'),
+        db.func.count().over(partition_by=hareketler.c.hesap_id).label('sayi'),
+        db.func.row_number().over(partition_by=hareketler.c.hesap_id,
+                                  order_by=(hareketler.c.tarih.desc(), hareketler.c.id.desc())).label('sira'),
+    ).subquery()
+    
+    satirlar = db.session.execute(
+        db.select(hesap.c.hesap_id, hesap.c.bakiye_sonrasi, hesap.c.giris, hesap.c.cikis, hesap.c.sayi)
+        .where(hesap.c.sira == 1)  # Günün son hareketi kapanış bakiyesini verir
+    ).all()
+    return [
+        {
+            'hesap_id': hesap_id,
+            'tarih': gun,
+            'acilis_bakiye': kapanis - giris + cikis,
+            'kapanis_bakiye': kapanis,
+            'toplam_giris': giris,
+            'toplam_cikis': cikis,
+            'islem_sayisi': sayi,
+        }
+        for hesap_id, kapanis, giris, cikis, sayi in satirlar
+        if kapanis is not None
+    ]
+
+def gunluk_ozetleri_guncelle(son_gun=None):
+    """Henüz özetlenmemiş tamamlanmış günler için hesap günlük özetlerini oluşturur
+    
+    İş artımlıdır: en son özetlenen günden sonraki günler (varsayılan olarak dünden
+    itibaren geriye) işlenir ve her gün ayrı commit edilir. Özetlenen gün sayısını döndürür.
+    """
+    son_gun = son_gun or (datetime.utcnow().date() - timedelta(days=1))  # Bugün henüz bitmedi
+    
+    son_ozet = db.session.query(db.func.max(HesapGunlukOzet.tarih)).scalar()
+    if son_ozet:
+        gun = son_ozet + timedelta(days=1)
+    else:
+        ilk_islem = db.session.query(db.func.min(Islem.tarih)).scalar()
+        if ilk_islem is None:
+            return 0  # Hiç işlem yok
+        gun = ilk_islem.date()
+    
+    islenen = 0
+    while gun <= son_gun:
+        ozetler = gun_ozetleri(gun)
+        if ozetler:
+            db.session.execute(db.insert(HesapGunlukOzet), ozetler)
+            db.session.commit()
+        islenen += 1
+        gun += timedelta(days=1)
+    return islenen
+
+def gunluk_ozetleri_yeniden_hesapla(gunler):
+    """Verilen günlerden daha önce özetlenmiş olanların özetlerini güncel işlemlerle yeniden oluşturur
+    
+    Geçmiş işlemler düzeltildiğinde (ör. şema güncellemeleri) kullanılır; henüz özetlenmemiş
+    günler gunluk_ozetleri_guncelle() ile sırası gelince özetlenir. Commit edilmez; yeniden
+    hesaplanan gün sayısını döndürür.
+    """
+    ozetli_gunler = db.session.execute(
+        db.select(HesapGunlukOzet.tarih).where(HesapGunlukOzet.tarih.in_(list(gunler))).distinct()
+    ).scalars().all()
+    for gun in ozetli_gunler:
+        db.session.execute(db.delete(HesapGunlukOzet).where(HesapGunlukOzet.tarih == gun))
+        ozetler = gun_ozetleri(gun)
+        if ozetler:
+            db.session.execute(db.insert(HesapGunlukOzet), ozetler)
+    return len(ozetli_gunler)
+
+# ============================================
+# DASHBOARD ÖNBELLEĞİ
+# ============================================
+
+# Dashboard verileri kullanıcı bazında önbellekte tutulur. Kullanıcının kendi yazma
+# işlemleri (transfer, kart, yatırım) session'daki dashboard sürümünü artırır; sürümü
+# farklı kayıt hiçbir worker'da kullanılmaz. Başka kullanıcıları etkileyen yazmalarda
+# (ör. gelen transfer) ilgili kayıtlar ayrıca açıkça silinir.
+
+def _dashboard_anahtari(kullanici_id):
+    """Kullanıcının dashboard önbellek anahtarını döndürür"""
+    return f'dashboard:{kullanici_id}'
+
+def sozluk_listesi(sorgu):
+    """Sorgu sonucunu önbelleğe konabilecek sade sözlük listesine çevirir"""
+    return [dict(satir) for satir in db.session.execute(sorgu).mappings()]
+
+def dashboard_verisi(kullanici_id):
+    """Dashboard'da gösterilen hesap, kart, yatırım ve son işlem verilerini döndürür (önbellekten veya veritabanından)"""
+    surum = session.get('dashboard_surumu', 0)
+    kayit = onbellek.getir(_dashboard_anahtari(kullanici_id))
+    if kayit is not None and kayit['surum'] == surum:
+        return kayit['veri']
+    
+    # Kullanıcının tüm hesaplarını getir
+    hesaplar = sozluk_listesi(
+        db.select(Hesap.id, Hesap.hesap_no, Hesap.hesap_turu, Hesap.bakiye)
+        .where(Hesap.kullanici_id == kullanici_id).order_by(Hesap.id)
+    )
+    
+    # Kullanıcının aktif kartlarını getir (en yeni olanlar önce)
+    kartlar = sozluk_listesi(
+        db.select(Kart.id, Kart.kart_no, Kart.kart_turu, Kart.kart_sahibi_adi, Kart.son_kullanim_tarihi,
+                  Kart.limit, Kart.durum)
+        .where(Kart.kullanici_id == kullanici_id, Kart.durum == 'Aktif').order_by(Kart.created_at.desc())
+    )
+    
+    # Kullanıcının aktif yatırım hesaplarını getir (en yeni olanlar önce)
+    yatirim_hesaplari = sozluk_listesi(
+        db.select(YatirimHesabi.id, YatirimHesabi.hesap_no, YatirimHesabi.yatirim_turu,
+                  YatirimHesabi.toplam_bakiye, YatirimHesabi.kar_zarar, YatirimHesabi.durum)
+        .where(YatirimHesabi.kullanici_id == kullanici_id, YatirimHesabi.durum == 'Aktif')
+        .order_by(YatirimHesabi.created_at.desc())
+    )
+    
+    # Son 10 işlemi tüm hesaplardan tek sorguda getir (en yeni olanlar önce)
+    son_islemler = [dict(islem._mapping) for islem in hesap_hareketleri([hesap['id'] for hesap in hesaplar], limit=10)]
+    
+    veri = {
+        'hesaplar': hesaplar,
+        'kartlar': kartlar,
+        'yatirim_hesaplari': yatirim_hesaplari,
+        'son_islemler': son_islemler,
+    }
+    onbellek.koy(_dashboard_anahtari(kullanici_id), {'surum': surum, 'veri': veri})
+    return veri
+
+def dashboard_onbellegini_temizle(*kullanici_idleri):
+    """Verilen kullanıcıların dashboard ve bu ayın analiz önbelleğini siler (yazma işlemi commit edildikten sonra çağrılır)"""
+    bu_ay = datetime.utcnow().strftime('%Y-%m')
+    onbellek.sil(*(anahtar for kullanici_id in set(kullanici_idleri)
+                   for anahtar in (_dashboard_anahtari(kullanici_id), _analiz_anahtari(kullanici_id, bu_ay))))
+    if has_request_context() and current_user.is_authenticated and current_user.id in kullanici_idleri:
+        session['dashboard_surumu'] = session.get('dashboard_surumu', 0) + 1  # Diğer worker'lardaki kopyaları geçersiz kıl
+
+# ============================================
+# HARCAMA ANALİZİ
+# ============================================
+
+# Kullanıcı bazındaki toplamlar gruplanmış SQL sorgularıyla veritabanında hesaplanır; işlem
+# geçmişi Python'a yüklenmez. Aylık sonuçlar (kullanıcı, ay) anahtarıyla önbelleğe alınır.
+# Geçmiş aylar değişmediği için uzun süre tutulur; içinde bulunulan ayın kaydı dashboard
+# önbelleğiyle aynı sürüm ve temizleme kurallarına tabidir. Aylar UTC'ye göredir.
+
+def _analiz_anahtari(kullanici_id, ay):
+    """Kullanıcının verilen aya ('YYYY-MM') ait analiz önbellek anahtarını döndürür"""
+    return f'analiz:{kullanici_id}:{ay}'
+
+def ay_coz(deger):
+    """'YYYY-MM' biçimindeki ayı (yıl, ay) olarak döndürür; geçersizse None döner"""
+    try:
+        baslangic = datetime.strptime(deger, '%Y-%m')
+    except (TypeError, ValueError):
+        return None
+    return baslangic.year, baslangic.month
+
+def ay_araligi(yil, ay):
+    """Ayın başlangıç anını ve bir sonraki ayın başlangıç anını döndürür"""
+    baslangic = datetime(yil, ay, 1)
+    bitis = datetime(yil + 1, 1, 1) if ay == 12 else datetime(yil, ay + 1, 1)
+    return baslangic, bitis
+
+def toplam_bakiye(kullanici_id):
+    """Kullanıcının tüm banka hesaplarındaki toplam bakiyeyi tek bir SUM sorgusuyla döndürür"""
+    return db.session.execute(
+        db.select(db.func.coalesce(db.func.sum(Hesap.bakiye), 0)).where(Hesap.kullanici_id == kullanici_id)
+    ).scalar()
+
+def aylik_analiz(kullanici_id, hesap_idleri, yil, ay):
+    """Kullanıcının verilen aydaki hesap bazında ve işlem türü bazında giriş/çıkış toplamlarını döndürür
+    
+    Hesap ve tür kırılımları birer gruplanmış sorguyla hesaplanır. Hesaplar arası kendi
+    transferleri bir hesapta çıkış, diğerinde giriş olarak görünür.
+    """
+    ay_metni = f'{yil:04d}-{ay:02d}'
+    bu_ay = ay_metni == datetime.utcnow().strftime('%Y-%m')
+    surum = session.get('dashboard_surumu', 0) if bu_ay else None  # Geçmiş aylar değişmez
+    kayit = onbellek.getir(_analiz_anahtari(kullanici_id, ay_metni))
+    if kayit is not None and kayit['surum'] == surum:
+        return kayit['veri']
+    
+    baslangic, bitis = ay_araligi(yil, ay)
+    tablo = hareket_tablolari(baslangic, bitis)[0]  # Ay tamamen ya sıcak tabloda ya arşivdedir
+    hareketler = giris_cikis_hareketleri(db.and_(tablo.tarih >= baslangic, tablo.tarih < bitis),
+                                         hesap_idleri=list(hesap_idleri), kolonlar=(tablo.islem_turu,), tablo=tablo)
+    giris = db.func.coalesce(db.func.sum(hareketler.c.giris), 0)
+    cikis = db.func.coalesce(db.func.sum(hareketler.c.cikis), 0)
+    
+    # Hesap bazında - Hareketi olmayan hesaplar da sıfır toplamlarla listelenir
+    hesaplar = sozluk_listesi(
+        db.select(Hesap.id, Hesap.hesap_no, Hesap.hesap_turu, giris.label('giris'), cikis.label('cikis'),
+                  db.func.count(hareketler.c.hesap_id).label('islem_sayisi'))
+        .outerjoin(hareketler, hareketler.c.hesap_id == Hesap.id)
+        .where(Hesap.kullanici_id == kullanici_id)
+        .group_by(Hesap.id, Hesap.hesap_no, Hesap.hesap_turu)
+        .order_by(Hesap.id)
+    )
+    
+    # İşlem türü bazında
+    turler = sozluk_listesi(
+        db.select(hareketler.c.islem_turu, giris.label('giris'), cikis.label('cikis'),
+                  db.func.count().label('islem_sayisi'))
+        .group_by(hareketler.c.islem_turu)
+        .order_by(hareketler.c.islem_turu)
+    )
+    
+    veri = {
+        'ay': ay_metni,
+        'toplam_giris': sum((hesap['giris'] for hesap in hesaplar), Decimal(0)),
+        'toplam_cikis': sum((hesap['cikis'] for hesap in hesaplar), Decimal(0)),
+        'hesaplar': hesaplar,
+        'turler': turler,
+    }
+    onbellek.koy(_analiz_anahtari(kullanici_id, ay_metni), {'surum': surum, 'veri': veri},
+                 sure=None if bu_ay else current_app.config['ANALIZ_ONBELLEK_SURESI'])
+    return veri
+
+# ============================================
+# KULLANICI YÜKLEME FONKSİYONU
+# ============================================
+
+# Oturumdaki kullanıcı her istekte veritabanından okunmaz: kullanıcı bilgileri ve hesap
+# ID'leri tek sorguyla yüklenip kısa süreli önbellekte tutulur. Dashboard önbelleğinde
+# olduğu gibi session'daki sürüm değişince kayıt kullanılmaz.
+
+class OturumKullanicisi(UserMixin):
+    """Oturumdaki kullanıcıyı temsil eden, veritabanı oturumuna bağlı olmayan hafif nesne"""
+    
+    def __init__(self, id, tc_no, ad, soyad, email, telefon, created_at, hesap_idleri):
+        self.id = id  # Kullanıcı ID'si
+        self.tc_no = tc_no  # TC Kimlik Numarası
+        self.ad = ad  # Kullanıcı adı
+        self.soyad = soyad  # Kullanıcı soyadı
+        self.email = email  # E-posta adresi
+        self.telefon = telefon  # Telefon numarası
+        self.created_at = created_at  # Üyelik tarihi
+        self.hesap_idleri = frozenset(hesap_idleri)  # Kullanıcının banka hesaplarının ID'leri (yetki kontrolleri için)
+    
+    def hesabi_mi(self, hesap_id):
+        """Verilen hesap ID'si bu kullanıcıya ait mi? (veritabanına gitmeden)"""
+        return hesap_id in self.hesap_idleri
+
+def _kullanici_anahtari(kullanici_id):
+    """Oturum kullanıcısının önbellek anahtarını döndürür"""
+    return f'kullanici:{kullanici_id}'
+
+def oturum_kullanicisi_yukle(kullanici_id):
+    """Kullanıcıyı hesap ID'leriyle birlikte tek sorguda yükler (kullanıcı yoksa None)"""
+    satirlar = db.session.execute(
+        db.select(User.id, User.tc_no, User.ad, User.soyad, User.email, User.telefon, User.created_at,
+                  Hesap.id.label('hesap_id'))
+        .outerjoin(Hesap, Hesap.kullanici_id == User.id)
+        .where(User.id == kullanici_id)
+        .order_by(Hesap.id)
+    ).all()
+    if not satirlar:
+        return None
+    ilk = satirlar[0]
+    return OturumKullanicisi(
+        ilk.id, ilk.tc_no, ilk.ad, ilk.soyad, ilk.email, ilk.telefon, ilk.created_at,
+        [satir.hesap_id for satir in satirlar if satir.hesap_id is not None]  # Hesabı yoksa dış birleştirme NULL döner
+    )
+
+def kullanici_onbellegini_temizle(*kullanici_idleri):
+    """Verilen kullanıcıların oturum önbelleğini siler (kullanıcı veya hesap listesi değiştiğinde çağrılır)"""
+    onbellek.sil(*(_kullanici_anahtari(kullanici_id) for kullanici_id in set(kullanici_idleri)))
+    if has_request_context() and current_user.is_authenticated and current_user.id in kullanici_idleri:
+        session['kullanici_surumu'] = session.get('kullanici_surumu', 0) + 1  # Diğer worker'lardaki kopyaları geçersiz kıl
+
+# Flask-Login için kullanıcı yükleme fonksiyonu
+def kullanici_getir(kullanici_id, surum=None):
+    """Oturum kullanıcısını önbellekten veya veritabanından döndürür
+    
+    surum verilirse önbellekteki kayıt sadece aynı sürümdeyse kullanılır (tarayıcı oturumları);
+    None ise (API) kayıt süresi dolana veya açıkça silinene kadar kullanılır.
+    """
+    kayit = onbellek.getir(_kullanici_anahtari(kullanici_id))
+    if kayit is not None and (surum is None or kayit['surum'] == surum):
+        return kayit['kullanici']
+    
+    kullanici = oturum_kullanicisi_yukle(int(kullanici_id))
+    if kullanici is not None:
+        onbellek.koy(_kullanici_anahtari(kullanici_id), {'surum': surum or 0, 'kullanici': kullanici},
+                     sure=current_app.config['KULLANICI_ONBELLEK_SURESI'])
+    return kullanici
+
+def kimlik_dogrula(tc_no, sifre):
+    """TC Kimlik Numarası ve şifreyi doğrular; doğruysa User nesnesini, değilse None döndürür
+    
+    Hash eski yöntem/maliyetle üretilmişse şifre elimizdeyken güncel ayarlarla yeniden hashlenir.
+    """
+    user = User.query.filter_by(tc_no=tc_no).first()
+    if not user or not sifre or not sifre_hashleyici.dogrula(user.password_hash, sifre):
+        return None
+    if sifre_hashleyici.yeniden_hashlenmeli(user.password_hash):
+        user.password_hash = sifre_hashleyici.hashle(sifre)
+        db.session.commit()
+    return user
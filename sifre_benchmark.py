@@ -0,0 +1,84 @@
+"""
+Şifre hashleme benchmark scripti
+Bu script, verilen her hash yöntemi/maliyeti için tek çekirdekte ve doğrulama havuzuyla
+saniyede kaç giriş (şifre doğrulaması) yapılabildiğini ölçer. Sonuçlar SIFRE_HASH_YONTEMI,
+SIFRE_HAVUZ_TURU ve SIFRE_HAVUZ_BOYUTU ayarlarını ve worker sayısını belirlemek için kullanılır.
+
+Kullanım:
+    python sifre_benchmark.py
+    python sifre_benchmark.py scrypt pbkdf2:sha256:600000 --havuz process --isci 4 --sure 5
+    python sifre_benchmark.py --json sonuc.json
+"""
+import argparse  # Komut satırı argümanları için
+import json  # Sonuçları dosyaya yazmak için
+import os  # CPU sayısı için
+import time  # Süre ölçümü için
+from concurrent.futures import ThreadPoolExecutor  # Eşzamanlı giriş isteklerini taklit etmek için
+from sifreleme import SifreHashleyici, yontem_oneki  # Uygulamanın kullandığı hashleyici
+
+# Varsayılan olarak karşılaştırılan yöntemler (hızlıdan yavaşa yaklaşık sırayla)
+VARSAYILAN_YONTEMLER = ['pbkdf2:sha256:260000', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000', 'scrypt']
+
+
+def olc(hashleyici, sifre_hash, sure, paralel=1):
+    """'sure' saniye boyunca doğrulama yapar; (doğrulama sayısı, geçen süre) döndürür"""
+    def dongu(bitis):
+        adet = 0
+        while time.perf_counter() < bitis:
+            hashleyici.dogrula(sifre_hash, 'benchmark-sifre')
+            adet += 1
+        return adet
+
+    baslangic = time.perf_counter()
+    bitis = baslangic + sure
+    with ThreadPoolExecutor(max_workers=paralel) as istemciler:  # Aynı anda giriş yapan istemciler
+        adet = sum(istemciler.map(dongu, [bitis] * paralel))
+    return adet, time.perf_counter() - baslangic
+
+
+def yontem_olc(yontem, havuz_turu, isci, sure):
+    """Bir yöntem için tek çekirdek ve havuz ölçümlerini yapar"""
+    tekli = SifreHashleyici(yontem)  # Havuzsuz, çağıran thread'de
+    sifre_hash = tekli.hashle('benchmark-sifre')
+    tekli_adet, tekli_sure = olc(tekli, sifre_hash, sure)
+
+    havuzlu = SifreHashleyici(yontem, havuz_turu=havuz_turu, havuz_boyutu=isci)
+    havuzlu.dogrula(sifre_hash, 'isinma')  # Havuzu önceden başlat
+    havuz_adet, havuz_sure = olc(havuzlu, sifre_hash, sure, paralel=isci * 2)
+    havuzlu.kapat()
+    cekirdek = min(isci, os.cpu_count() or 1)  # Havuzun gerçekte kullanabildiği çekirdek sayısı
+
+    return {
+        'yontem': yontem_oneki(yontem),
+        'dogrulama_ms': round(tekli_sure / tekli_adet * 1000, 2),
+        'giris_saniye_cekirdek': round(tekli_adet / tekli_sure, 1),
+        'havuz_turu': havuz_turu,
+        'havuz_isci': isci,
+        'giris_saniye_havuz': round(havuz_adet / havuz_sure, 1),
+        'giris_saniye_cekirdek_havuz': round(havuz_adet / havuz_sure / cekirdek, 1),
+    }
+
+
+# Script doğrudan çalıştırılıyorsa
+if __name__ == '__main__':
+    ayristirici = argparse.ArgumentParser(description='Şifre hashleme yöntemlerinin giriş kapasitesini ölçer')
+    ayristirici.add_argument('yontemler', nargs='*', default=VARSAYILAN_YONTEMLER, help='Werkzeug hash yöntemleri')
+    ayristirici.add_argument('--havuz', choices=['thread', 'process'], default='thread', help='Doğrulama havuzu türü')
+    ayristirici.add_argument('--isci', type=int, default=os.cpu_count() or 1, help='Havuz boyutu (varsayılan: CPU sayısı)')
+    ayristirici.add_argument('--sure', type=float, default=3.0, help='Her ölçümün süresi (saniye)')
+    ayristirici.add_argument('--json', help='Sonuçların yazılacağı JSON dosyası')
+    argumanlar = ayristirici.parse_args()
+
+    print(f"CPU sayisi: {os.cpu_count()}, havuz: {argumanlar.havuz} x {argumanlar.isci}")
+    print(f"{'Yontem':<26} {'ms/dogrulama':>13} {'giris/s/cekirdek':>17} {'giris/s havuz':>14} {'havuz giris/s/cekirdek':>23}")
+    sonuclar = []
+    for yontem in argumanlar.yontemler:
+        sonuc = yontem_olc(yontem, argumanlar.havuz, argumanlar.isci, argumanlar.sure)
+        sonuclar.append(sonuc)
+        print(f"{sonuc['yontem']:<26} {sonuc['dogrulama_ms']:>13} {sonuc['giris_saniye_cekirdek']:>17} "
+              f"{sonuc['giris_saniye_havuz']:>14} {sonuc['giris_saniye_cekirdek_havuz']:>23}")
+
+    if argumanlar.json:  # Sonuçları dosyaya yaz
+        with open(argumanlar.json, 'w', encoding='utf-8') as dosya:
+            json.dump({'cpu_sayisi': os.cpu_count(), 'sonuclar': sonuclar}, dosya, ensure_ascii=False, indent=2)
+        print(f"[Tamamlandi] Sonuclar {argumanlar.json} dosyasina yazildi.")
@@ -0,0 +1,74 @@
+"""
+BetikBank şifre hashleme altyapısı
+Şifre hashleme yöntemini ve maliyetini ayarlanabilir yapar, eski parametrelerle üretilmiş
+hash'lerin girişte yeniden hashlenmesi gerekip gerekmediğini söyler ve CPU yoğun doğrulamayı
+sınırlı bir thread veya process havuzunda çalıştırır.
+
+Yöntemler Werkzeug biçimindedir:
+    scrypt                      -> scrypt:32768:8:1 (Werkzeug varsayılanı)
+    scrypt:16384:8:1            -> scrypt, n=16384, r=8, p=1
+    pbkdf2:sha256:600000        -> PBKDF2-HMAC-SHA256, 600000 tekrar
+"""
+import os  # Varsayılan havuz boyutu (CPU sayısı) için
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # Doğrulama havuzları için
+from werkzeug.security import generate_password_hash, check_password_hash  # Şifre hashleme için
+
+
+def yontem_oneki(yontem):
+    """Yöntemin ürettiği hash'lerin '$' öncesi kısmını döndürür (ör. 'scrypt' -> 'scrypt:32768:8:1')"""
+    return generate_password_hash('', method=yontem, salt_length=1).split('$', 1)[0]
+
+
+class SifreHashleyici:
+    """Ayarlanabilir şifre hashleme ve doğrulama
+
+    havuz_turu 'yok' ise işlemler çağıran thread'de yapılır. 'thread' ve 'process'
+    havuzlarında aynı anda en fazla havuz_boyutu kadar hash hesaplanır; giriş yoğunluğunda
+    fazla istekler havuz sırasında bekler ve diğer route'ların CPU payını tüketmez.
+    hashlib scrypt/pbkdf2 hesaplarken GIL'i bıraktığı için thread havuzu da paralel çalışır.
+    """
+
+    def __init__(self, yontem='scrypt', havuz_turu='yok', havuz_boyutu=None):
+        self.yontem = yontem  # Yeni hash'lerde kullanılacak yöntem
+        self.onek = yontem_oneki(yontem)  # Güncel parametrelerle üretilmiş hash'lerin öneki
+        self.havuz_turu = havuz_turu
+        self.havuz_boyutu = havuz_boyutu or os.cpu_count() or 1
+        if havuz_turu not in ('yok', 'thread', 'process'):
+            raise ValueError(f"Bilinmeyen havuz türü: {havuz_turu}")
+        self._havuz = None  # İlk kullanımda oluşturulur (process havuzu fork'tan sonra açılmalı)
+
+    def _calistir(self, fonksiyon, *argumanlar):
+        """Fonksiyonu havuzda (veya havuz yoksa doğrudan) çalıştırıp sonucunu bekler"""
+        if self.havuz_turu == 'yok':
+            return fonksiyon(*argumanlar)
+        if self._havuz is None:
+            havuz_sinifi = ThreadPoolExecutor if self.havuz_turu == 'thread' else ProcessPoolExecutor
+            self._havuz = havuz_sinifi(max_workers=self.havuz_boyutu)
+        return self._havuz.submit(fonksiyon, *argumanlar).result()
+
+    def hashle(self, sifre):
+        """Şifreyi güncel yöntemle hashler"""
+        return self._calistir(generate_password_hash, sifre, self.yontem)
+
+    def dogrula(self, sifre_hash, sifre):
+        """Şifre hash ile eşleşiyor mu? (hash hangi yöntemle üretilmiş olursa olsun)"""
+        return self._calistir(check_password_hash, sifre_hash, sifre)
+
+    def yeniden_hashlenmeli(self, sifre_hash):
+        """Hash güncel yöntem ve maliyetten farklı parametrelerle mi üretilmiş?"""
+        return sifre_hash.split('$', 1)[0] != self.onek
+
+    def kapat(self):
+        """Havuzu kapatır"""
+        if self._havuz is not None:
+            self._havuz.shutdown()
+            self._havuz = None
+
+
+def sifre_hashleyici_olustur(ayarlar):
+    """Uygulama ayarlarına göre şifre hashleyiciyi oluşturur"""
+    return SifreHashleyici(
+        yontem=ayarlar.get('SIFRE_HASH_YONTEMI', 'scrypt'),
+        havuz_turu=ayarlar.get('SIFRE_HAVUZ_TURU', 'yok'),
+        havuz_boyutu=ayarlar.get('SIFRE_HAVUZ_BOYUTU'),
+    )
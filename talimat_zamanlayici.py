@@ -0,0 +1,53 @@
+"""
+Transfer talimatı zamanlayıcı scripti
+Bu script, zamanı gelmiş ileri tarihli ve düzenli (günlük, haftalık, aylık) transfer
+talimatlarını parça parça sahiplenir ve toplu transfer yoluyla uygular. Her parça tek bir
+commit'tir; bakiyesi yetmeyen talimatlar daha sonra tekrar denenir. Ay başı gibi yoğun
+anlarda web worker'ları etkilenmez. Birden fazla kopya aynı anda çalışabilir; her talimat
+tek bir zamanlayıcı tarafından sahiplenilir.
+
+Kullanım:
+    python talimat_zamanlayici.py                 # Sürekli çalış (Ctrl+C ile durdurulur)
+    python talimat_zamanlayici.py --bir-kez       # Zamanı gelmiş talimatları çalıştır ve çık (ör. cron ile)
+    python talimat_zamanlayici.py --aralik 30 --parca 2000
+"""
+# Uygulama fabrikasını ve gerekli servisleri import et
+from app import uygulama_olustur  # Uygulama fabrikası (web'e özgü parçalar olmadan)
+from servisler import talimatlari_calistir
+import argparse  # Komut satırı argümanları için
+import time  # Bekleme ve süre ölçümü için
+
+def calistir(aralik=10.0, parca_boyutu=1000, bir_kez=False):
+    """Zamanı gelmiş talimatları çalıştırır; bir_kez değilse kuyruk boşaldığında 'aralik' saniye bekleyip devam eder"""
+    toplam = {'Başarılı': 0, 'Tekrar Denenecek': 0, 'Başarısız': 0}
+
+    # Uygulama bağlamı içinde çalış (veritabanı işlemleri için gerekli)
+    with uygulama_olustur(web=False).app_context():
+        while True:
+            baslangic = time.perf_counter()
+            ozet = talimatlari_calistir(parca_boyutu)
+            for durum, adet in ozet.items():
+                toplam[durum] += adet
+            if any(ozet.values()):
+                print(f"  {ozet['Başarılı']} basarili, {ozet['Tekrar Denenecek']} yeniden denenecek, "
+                      f"{ozet['Başarısız']} basarisiz ({time.perf_counter() - baslangic:.2f} sn)")
+
+            if sum(ozet.values()) < parca_boyutu:  # Zamanı gelmiş talimat kalmadı
+                if bir_kez:
+                    return toplam
+                time.sleep(aralik)
+
+# Script doğrudan çalıştırılıyorsa
+if __name__ == '__main__':
+    ayristirici = argparse.ArgumentParser(description='Zamanı gelmiş transfer talimatlarını çalıştırır')
+    ayristirici.add_argument('--aralik', type=float, default=10.0, help='Kuyruk boşken yoklama aralığı (saniye)')
+    ayristirici.add_argument('--parca', type=int, default=1000, help='Her commit\'te çalıştırılacak talimat sayısı')
+    ayristirici.add_argument('--bir-kez', action='store_true', help='Zamanı gelmiş talimatları çalıştır ve çık')
+    argumanlar = ayristirici.parse_args()
+
+    try:
+        toplam = calistir(argumanlar.aralik, argumanlar.parca, argumanlar.bir_kez)
+    except KeyboardInterrupt:  # Ctrl+C ile durduruldu
+        print("Durduruldu.")
+    else:
+        print(f"[Tamamlandi] {toplam['Başarılı']} talimat calisti, {toplam['Başarısız']} talimat basarisiz.")
@@ -0,0 +1,70 @@
+"""
+BetikBank testleri için ortak fixture'lar
+Her test geçici dizinde kendi SQLite veritabanıyla ayrı bir uygulama oluşturur.
+
+Kullanım:
+    python -m pytest -q
+"""
+import sys
+from pathlib import Path
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # Uygulama modülleri proje kökündedir
+
+from app import uygulama_olustur  # Uygulama fabrikası
+from modeller import db, User, Hesap  # Test verisi için
+from sema import veritabani_hazirla  # Şemayı kurmak için
+
+@pytest.fixture
+def app(tmp_path):
+    """Geçici veritabanıyla kurulmuş bir web uygulaması"""
+    app = uygulama_olustur({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'SIFRE_HASH_YONTEMI': 'pbkdf2:sha256:1000',  # Testlerde hızlı hash
+    })
+    with app.app_context():
+        veritabani_hazirla()
+    return app
+
+@pytest.fixture
+def kullanici_olustur(app):
+    """Verilen sayıda vadesiz hesabı olan bir kullanıcı oluşturup (kullanıcı id, [hesap id]) döndüren fonksiyon"""
+    sayac = iter(range(1, 10 ** 6))
+
+    def olustur(hesap_sayisi=1, bakiye=0):
+        no = next(sayac)
+        with app.app_context():
+            kullanici = User(tc_no=f'{no:011d}', ad='Test', soyad=f'Kullanici {no}', email=f'test{no}@example.com',
+                             telefon='05550000000', password_hash='-')
+            db.session.add(kullanici)
+            db.session.flush()
+            hesaplar = [Hesap(hesap_no=f'{no:08d}{sira:08d}', kullanici_id=kullanici.id, bakiye=bakiye)
+                        for sira in range(hesap_sayisi)]
+            db.session.add_all(hesaplar)
+            db.session.commit()
+            return kullanici.id, [hesap.id for hesap in hesaplar]
+    return olustur
+
+def giris_yap(istemci, kullanici_id):
+    """Test istemcisinin oturumunu verilen kullanıcıyla açar"""
+    with istemci.session_transaction() as oturum:
+        oturum['_user_id'] = str(kullanici_id)
+        oturum['_fresh'] = True
+
+@contextmanager
+def sorgu_sayaci(app):
+    """Blok içinde uygulamanın veritabanına gönderilen SQL ifadelerini listede toplar"""
+    sorgular = []
+    with app.app_context():
+        motor = db.engine
+
+    def kaydet(baglanti, imlec, ifade, parametreler, baglam, coklu):
+        sorgular.append(ifade)
+    event.listen(motor, 'before_cursor_execute', kaydet)
+    try:
+        yield sorgular
+    finally:
+        event.remove(motor, 'before_cursor_execute', kaydet)
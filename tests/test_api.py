@@ -0,0 +1,40 @@
+"""
+JSON API testleri
+"""
+import pytest
+from modeller import db, User
+from servisler import sifre_hashleyici
+
+@pytest.fixture
+def kullanici(app, kullanici_olustur):
+    """Şifresi 'sifre' olan kullanıcının TC Kimlik Numarası"""
+    kullanici_id, _ = kullanici_olustur()
+    with app.app_context():
+        user = db.session.get(User, kullanici_id)
+        user.password_hash = sifre_hashleyici.hashle('sifre')
+        db.session.commit()
+        return user.tc_no
+
+@pytest.mark.parametrize('govde', [
+    {'password': 12345},
+    {'password': None},
+    {'password': {'$ne': ''}},
+    {'password': ''},
+    {'password': 'sifre', 'ad': 5},
+    {'tc_no': None, 'password': 'sifre'},
+])
+def test_token_al_gecersiz_alanlari_reddeder(app, kullanici, govde):
+    yanit = app.test_client().post('/api/v1/token', json={'tc_no': kullanici, **govde})
+    assert yanit.status_code == 400
+
+@pytest.mark.parametrize('govde', [[], 'metin', 5])
+def test_token_al_nesne_olmayan_govdeyi_reddeder(app, govde):
+    assert app.test_client().post('/api/v1/token', json=govde).status_code == 400
+
+def test_token_al(app, kullanici):
+    istemci = app.test_client()
+    assert istemci.post('/api/v1/token', json={'tc_no': kullanici, 'password': 'yanlis'}).status_code == 401
+    yanit = istemci.post('/api/v1/token', json={'tc_no': kullanici, 'password': 'sifre', 'ad': 'iPhone'})
+    assert yanit.status_code == 201
+    token = yanit.get_json()['token']
+    assert istemci.get('/api/v1/accounts', headers={'Authorization': f'Bearer {token}'}).status_code == 200
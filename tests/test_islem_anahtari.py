@@ -0,0 +1,138 @@
+"""
+İşlem anahtarı (Idempotency-Key) testleri
+İstemcinin gönderdiği anahtar IslemAnahtari.anahtar kolonuna (String(64)) yazılır; kolona
+sığmayan veya izin verilmeyen karakter içeren anahtarlar 500 yerine 400 ile reddedilmelidir.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+import hashlib
+import pytest
+from modeller import db, ApiTokeni, Hesap, Islem, IslemAnahtari, Kart, SemaSurumu
+from sema import veritabani_hazirla
+from servisler import transfer_yap, kart_harcamasi
+from conftest import giris_yap
+
+GECERSIZ_ANAHTARLAR = ['a' * 65, 'bosluklu anahtar', 'türkçe', 'x/y']
+
+@pytest.fixture
+def hesaplar(app, kullanici_olustur):
+    """(kullanıcı id, gönderen hesap id, alıcı hesap no) - Gönderen hesapta 100 TL var"""
+    kullanici_id, (hesap_id,) = kullanici_olustur(bakiye=Decimal('100'))
+    _, (alici_id,) = kullanici_olustur()
+    with app.app_context():
+        return kullanici_id, hesap_id, db.session.get(Hesap, alici_id).hesap_no
+
+def _api_token(app, kullanici_id):
+    """Kullanıcı için geçerli bir API token'ı oluşturur"""
+    with app.app_context():
+        db.session.add(ApiTokeni(kullanici_id=kullanici_id, token_ozeti=hashlib.sha256(b'test-token').hexdigest(),
+                                 son_kullanma=datetime.utcnow() + timedelta(days=1)))
+        db.session.commit()
+    return {'Authorization': 'Bearer test-token'}
+
+@pytest.mark.parametrize('anahtar', GECERSIZ_ANAHTARLAR)
+def test_api_gecersiz_anahtari_reddeder(app, hesaplar, anahtar):
+    kullanici_id, hesap_id, alici_no = hesaplar
+    yanit = app.test_client().post('/api/v1/transfers', headers={**_api_token(app, kullanici_id), 'Idempotency-Key': anahtar},
+                                   json={'gonderen_hesap_id': hesap_id, 'alici_hesap_no': alici_no, 'tutar': '10'})
+    assert yanit.status_code == 400
+    with app.app_context():
+        assert db.session.query(Islem).count() == 0
+
+def test_api_gecerli_anahtarla_tekrar_uygulanmaz(app, hesaplar):
+    kullanici_id, hesap_id, alici_no = hesaplar
+    basliklar = {**_api_token(app, kullanici_id), 'Idempotency-Key': 'k' * 64}
+    istemci = app.test_client()
+    veri = {'gonderen_hesap_id': hesap_id, 'alici_hesap_no': alici_no, 'tutar': '10'}
+    assert istemci.post('/api/v1/transfers', headers=basliklar, json=veri).status_code == 201
+    assert istemci.post('/api/v1/transfers', headers=basliklar, json=veri).get_json()['tekrar'] is True
+
+def test_kart_yetkilendirme_gecersiz_anahtari_reddeder(app):
+    app.config['POS_TOKEN'] = 'pos'
+    yanit = app.test_client().post('/api/v1/card-authorizations',
+                                   headers={'Authorization': 'Bearer pos', 'Idempotency-Key': 'a' * 65},
+                                   json={'kart_no': '9792310000000001', 'son_kullanim_tarihi': '12/99',
+                                         'cvv': '123', 'tutar': '10'})
+    assert yanit.status_code == 400
+
+@pytest.mark.parametrize('anahtar', GECERSIZ_ANAHTARLAR)
+def test_transfer_formu_gecersiz_anahtari_reddeder(app, hesaplar, anahtar):
+    kullanici_id, hesap_id, alici_no = hesaplar
+    istemci = app.test_client()
+    giris_yap(istemci, kullanici_id)
+    yanit = istemci.post('/transfer', data={'gonderen_hesap': hesap_id, 'alici_hesap_no': alici_no, 'tutar': '10',
+                                            'islem_anahtari': anahtar})
+    assert yanit.status_code == 400
+    with app.app_context():
+        assert db.session.query(Islem).count() == 0
+
+@pytest.mark.parametrize('degisiklik', [{'tutar': '20'}, {'alici_hesap_no': 'diger'}])
+def test_api_ayni_anahtarla_farkli_istegi_reddeder(app, hesaplar, kullanici_olustur, degisiklik):
+    kullanici_id, hesap_id, alici_no = hesaplar
+    _, (diger_id,) = kullanici_olustur()
+    with app.app_context():
+        diger_no = db.session.get(Hesap, diger_id).hesap_no
+    basliklar = {**_api_token(app, kullanici_id), 'Idempotency-Key': 'abc'}
+    istemci = app.test_client()
+    veri = {'gonderen_hesap_id': hesap_id, 'alici_hesap_no': alici_no, 'tutar': '10'}
+    assert istemci.post('/api/v1/transfers', headers=basliklar, json=veri).status_code == 201
+
+    farkli = {**veri, **degisiklik}
+    if farkli['alici_hesap_no'] == 'diger':
+        farkli['alici_hesap_no'] = diger_no
+    assert istemci.post('/api/v1/transfers', headers=basliklar, json=farkli).status_code == 422
+    with app.app_context():
+        assert db.session.query(Islem).count() == 1
+        assert db.session.get(Hesap, hesap_id).bakiye == Decimal('90')
+
+def test_sema_guncellemesi_eski_anahtarlara_ozet_ekler(app, hesaplar):
+    kullanici_id, hesap_id, _ = hesaplar
+    with app.app_context():
+        alici_id = db.session.query(Hesap.id).filter(Hesap.id != hesap_id).scalar()
+        islem, _ = transfer_yap(hesap_id, alici_id, Decimal('10'), kullanici_id=kullanici_id, anahtar='eski')
+        kart = Kart(kart_no='9792310000000001', kullanici_id=kullanici_id, hesap_id=hesap_id, kart_turu='Banka Kartı',
+                    son_kullanim_tarihi='12/99', cvv='123', kart_sahibi_adi='TEST')
+        db.session.add(kart)
+        db.session.commit()
+        harcama, _ = kart_harcamasi('9792310000000001', '12/99', '123', Decimal('5'), anahtar='pos')
+        # Güncelleme öncesi tablo - Kapsam ve özet kolonları yok
+        db.session.execute(db.text('DROP TABLE islem_anahtari'))
+        db.session.execute(db.text('CREATE TABLE islem_anahtari (kullanici_id INTEGER, anahtar VARCHAR(64), '
+                                   'islem_id INTEGER NOT NULL, created_at DATETIME, PRIMARY KEY (kullanici_id, anahtar))'))
+        db.session.execute(db.text('INSERT INTO islem_anahtari (kullanici_id, anahtar, islem_id) VALUES '
+                                   '(:k, :a, :i), (:k, :p, :h), (:k, :y, 999)'),
+                           {'k': kullanici_id, 'a': 'eski', 'i': islem.id, 'p': 'pos', 'h': harcama.id, 'y': 'yetim'})
+        db.session.execute(db.delete(SemaSurumu).where(SemaSurumu.surum == 9))
+        db.session.commit()
+
+        assert veritabani_hazirla() == [9]
+        kayitlar = {(kayit.kapsam, kayit.anahtar) for kayit in db.session.query(IslemAnahtari)}
+        assert kayitlar == {('transfer', 'eski'), (f'kart:{kart.id}', 'pos')}  # İşlemi olmayan anahtar atılır
+        assert transfer_yap(hesap_id, alici_id, Decimal('10'), kullanici_id=kullanici_id, anahtar='eski') == (islem, False)
+        assert kart_harcamasi('9792310000000001', '12/99', '123', Decimal('5'), anahtar='pos') == (harcama, False)
+
+def _kart_harcamasi_iste(app, anahtar, tutar):
+    """POS'tan test kartıyla harcama isteği gönderir"""
+    app.config['POS_TOKEN'] = 'pos'
+    return app.test_client().post('/api/v1/card-authorizations',
+                                  headers={'Authorization': 'Bearer pos', 'Idempotency-Key': anahtar},
+                                  json={'kart_no': '9792310000000001', 'son_kullanim_tarihi': '12/99',
+                                        'cvv': '123', 'tutar': tutar})
+
+def test_kart_anahtari_transfer_anahtariyla_cakismaz(app, hesaplar):
+    kullanici_id, hesap_id, alici_no = hesaplar
+    with app.app_context():
+        db.session.add(Kart(kart_no='9792310000000001', kullanici_id=kullanici_id, hesap_id=hesap_id,
+                            kart_turu='Banka Kartı', son_kullanim_tarihi='12/99', cvv='123', kart_sahibi_adi='TEST'))
+        db.session.commit()
+    veri = {'gonderen_hesap_id': hesap_id, 'alici_hesap_no': alici_no, 'tutar': '1'}
+    assert app.test_client().post('/api/v1/transfers', json=veri,
+                                  headers={**_api_token(app, kullanici_id), 'Idempotency-Key': 'abc'}).status_code == 201
+
+    yanit = _kart_harcamasi_iste(app, 'abc', '7')
+    assert yanit.status_code == 201 and yanit.get_json()['tekrar'] is False
+    assert _kart_harcamasi_iste(app, 'abc', '7').get_json()['tekrar'] is True
+    yanit = _kart_harcamasi_iste(app, 'abc', '8')  # Aynı anahtar, farklı harcama
+    assert yanit.status_code == 409 and yanit.get_json()['onay'] is False
+    with app.app_context():
+        assert db.session.get(Hesap, hesap_id).bakiye == Decimal('92')
@@ -0,0 +1,38 @@
+"""
+İşlem arşivi testleri
+Arşivleme ayrı bir süreçte çalışır; web worker'ları taşınan ayları bir sonraki istekte
+arşivden okumalıdır.
+"""
+from datetime import datetime, timedelta
+from app import uygulama_olustur
+from modeller import db, Islem, IslemArsivi
+from servisler import hesap_hareketleri, islemleri_arsivle
+from conftest import giris_yap
+
+def test_baska_surecte_arsivlenen_aylar_gecmiste_kalir(app, kullanici_olustur):
+    kullanici_id, (hesap_id, diger_id) = kullanici_olustur(hesap_sayisi=2)
+    with app.app_context():
+        eski = datetime.utcnow().replace(day=1) - timedelta(days=75)  # İki ay öncesinden eski
+        db.session.add_all([
+            Islem(gonderen_hesap_id=hesap_id, alici_hesap_id=diger_id, tutar=10, tarih=eski,
+                  gonderen_bakiye_sonrasi=0, alici_bakiye_sonrasi=10),
+            Islem(gonderen_hesap_id=diger_id, alici_hesap_id=hesap_id, tutar=5, tarih=datetime.utcnow(),
+                  gonderen_bakiye_sonrasi=5, alici_bakiye_sonrasi=5),
+        ])
+        db.session.commit()
+        assert len(hesap_hareketleri([hesap_id])) == 2  # Web worker'ı henüz arşiv yokken okur
+
+    istemci = app.test_client()
+    giris_yap(istemci, kullanici_id)
+    assert istemci.get('/transactions').status_code == 200
+
+    # Arşivleme aynı veritabanında ayrı bir uygulama (süreç) olarak çalışır
+    arsivleyici = uygulama_olustur({'SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI']}, web=False)
+    with arsivleyici.app_context():
+        assert islemleri_arsivle(ay_sayisi=1) >= 1
+        assert db.session.query(IslemArsivi).count() == 1
+
+    with app.app_context():
+        assert len(hesap_hareketleri([hesap_id])) == 2
+    sayfa = istemci.get('/transactions').get_data(as_text=True)
+    assert eski.strftime('%d.%m.%Y') in sayfa
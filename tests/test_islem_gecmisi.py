@@ -0,0 +1,60 @@
+"""
+İşlem geçmişi sorgu sayısı testleri
+Geçmiş sayfaları satır başına ilişki yüklemesi (N+1 sorgu) yapmamalıdır: gönderilen ve
+alınan işlemler karşı hesap numaralarıyla tek ifadede okunur.
+"""
+from datetime import datetime, timedelta
+from modeller import db, Hesap, Islem
+from servisler import hesap_hareketleri
+from conftest import giris_yap, sorgu_sayaci
+
+def _islem_ekle(app, hesap_id, karsi_hesap_idleri, baslangic):
+    """Hesapla her karşı hesap arasında biri giden biri gelen iki işlem ekler"""
+    with app.app_context():
+        for sira, karsi_id in enumerate(karsi_hesap_idleri):
+            tarih = baslangic + timedelta(minutes=sira)
+            db.session.add_all([
+                Islem(gonderen_hesap_id=hesap_id, alici_hesap_id=karsi_id, tutar=10, tarih=tarih,
+                      gonderen_bakiye_sonrasi=0, alici_bakiye_sonrasi=10),
+                Islem(gonderen_hesap_id=karsi_id, alici_hesap_id=hesap_id, tutar=10, tarih=tarih,
+                      gonderen_bakiye_sonrasi=0, alici_bakiye_sonrasi=10),
+            ])
+        db.session.commit()
+
+def test_hesap_detay_sorgu_sayisi_islem_sayisindan_bagimsiz(app, kullanici_olustur):
+    kullanici_id, (hesap_id,) = kullanici_olustur()
+    karsi_hesaplar = [kullanici_olustur()[1][0] for _ in range(20)]
+    istemci = app.test_client()
+    giris_yap(istemci, kullanici_id)
+    baslangic = datetime.utcnow() - timedelta(days=1)
+
+    _islem_ekle(app, hesap_id, karsi_hesaplar[:2], baslangic)
+    assert istemci.get(f'/account/{hesap_id}').status_code == 200  # Kullanıcı önbelleğe alınır
+    with sorgu_sayaci(app) as az_islemle:
+        yanit = istemci.get(f'/account/{hesap_id}')
+    assert yanit.status_code == 200
+
+    _islem_ekle(app, hesap_id, karsi_hesaplar[2:], baslangic + timedelta(hours=1))
+    with sorgu_sayaci(app) as cok_islemle:
+        yanit = istemci.get(f'/account/{hesap_id}')
+    sayfa = yanit.get_data(as_text=True)
+
+    assert yanit.status_code == 200
+    assert len(cok_islemle) == len(az_islemle) <= 4
+    with app.app_context():
+        for karsi_id in karsi_hesaplar:  # Karşı hesap numaraları da aynı sorguyla gelir
+            assert db.session.get(Hesap, karsi_id).hesap_no in sayfa
+
+def test_hesap_hareketleri_tek_ifadede_okunur(app, kullanici_olustur):
+    _, (hesap_id,) = kullanici_olustur()
+    karsi_hesaplar = [kullanici_olustur()[1][0] for _ in range(10)]
+    _islem_ekle(app, hesap_id, karsi_hesaplar, datetime.utcnow() - timedelta(days=1))
+
+    with app.app_context():
+        with sorgu_sayaci(app) as sorgular:
+            islemler = hesap_hareketleri([hesap_id], limit=50)
+            numaralar = {(islem.gonderen_hesap_no, islem.alici_hesap_no, islem.gelen) for islem in islemler}
+
+    assert len(islemler) == 20
+    assert len(numaralar) == 20  # Her satırda karşı hesap numarası ve yön hazır
+    assert len(sorgular) <= 2  # Arşiv sınırı + tek UNION ALL sorgusu
@@ -0,0 +1,88 @@
+"""
+Kart harcaması testleri
+Kredi kartı harcaması bağlı hesabın bakiyesini değiştirmez; bu yüzden günlük özetlerde ve hız
+kurallarında hesaptan çıkış sayılmamalıdır. Banka kartı harcaması ise hesaptan çıkıştır.
+"""
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from modeller import db, Hesap, HesapGunlukOzet, Islem, Kart, SemaSurumu, KREDI_KARTI_HARCAMASI
+from sema import veritabani_hazirla
+from servisler import (toplu_yukleme, transfer_yap, kart_harcamasi, gunluk_ozetleri_guncelle, gun_ozetleri,
+                       hiz_kontrolu, TransferHatasi)
+
+GUNLUK_SINIR = [{'ad': 'gun_tutar', 'pencere': 86400, 'tutar': '200', 'sonuc': 'engelle'}]
+
+@pytest.fixture
+def app(app):
+    """Günlük 200 TL çıkış sınırı olan uygulama"""
+    app.config['DOLANDIRICILIK_KURALLARI'] = GUNLUK_SINIR
+    return app
+
+def _kart_ac(hesap_id, kullanici_id, kart_no, kart_turu, limit=0):
+    """Hesaba bağlı aktif bir kart oluşturur"""
+    db.session.add(Kart(kart_no=kart_no, kullanici_id=kullanici_id, hesap_id=hesap_id, kart_turu=kart_turu,
+                        son_kullanim_tarihi='12/99', cvv='123', kart_sahibi_adi='TEST', limit=limit))
+    db.session.commit()
+
+def test_kredi_karti_harcamasi_hesaptan_cikis_sayilmaz(app, kullanici_olustur):
+    kullanici_id, (hesap_id,) = kullanici_olustur()
+    _, (alici_id,) = kullanici_olustur()
+    with app.app_context():
+        toplu_yukleme(Decimal('1000'))
+        _kart_ac(hesap_id, kullanici_id, '9792310000000001', 'Kredi Kartı', limit=500)
+        _kart_ac(hesap_id, kullanici_id, '9792310000000002', 'Banka Kartı')
+
+        transfer_yap(hesap_id, alici_id, Decimal('50'))
+        transfer_yap(hesap_id, alici_id, Decimal('70.10'))
+        transfer_yap(alici_id, hesap_id, Decimal('20'))
+        kart_harcamasi('9792310000000002', '12/99', '123', Decimal('30'))
+        islem, _ = kart_harcamasi('9792310000000001', '12/99', '123', Decimal('50'))
+        assert islem.islem_turu == KREDI_KARTI_HARCAMASI
+        transfer_yap(hesap_id, alici_id, Decimal('45'))  # Kredi kartı sayılsaydı günlük sınır aşılırdı
+
+        ozet = next(satir for satir in gun_ozetleri(datetime.utcnow().date()) if satir['hesap_id'] == hesap_id)
+        assert ozet['acilis_bakiye'] == 0
+        assert ozet['toplam_giris'] == Decimal('1020')
+        assert ozet['toplam_cikis'] == Decimal('195.10')
+        assert ozet['acilis_bakiye'] + ozet['toplam_giris'] - ozet['toplam_cikis'] == ozet['kapanis_bakiye']
+        assert ozet['kapanis_bakiye'] == db.session.get(Hesap, hesap_id).bakiye == Decimal('824.90')
+        assert db.session.get(Kart, 1).kullanilan_limit == Decimal('50')
+
+        with pytest.raises(TransferHatasi):  # 195.10 + 5 > 200
+            transfer_yap(hesap_id, alici_id, Decimal('5'))
+
+def test_hiz_sayaclari_kredi_karti_harcamasini_tohumlamaz(app, kullanici_olustur):
+    kullanici_id, (hesap_id,) = kullanici_olustur()
+    with app.app_context():
+        toplu_yukleme(Decimal('1000'))
+        _kart_ac(hesap_id, kullanici_id, '9792310000000001', 'Kredi Kartı', limit=500)
+        kart_harcamasi('9792310000000001', '12/99', '123', Decimal('150'))
+        assert Islem.query.filter_by(islem_turu=KREDI_KARTI_HARCAMASI).count() == 1
+
+        del app.extensions['betikbank']['hiz_kontrolu']  # Sayaçlar veritabanından yeniden tohumlanır
+        assert not hiz_kontrolu.degerlendir(hesap_id, Decimal('100')).engellendi
+
+def test_sema_guncellemesi_eski_kredi_karti_harcamalarini_duzeltir(app, kullanici_olustur):
+    kullanici_id, (hesap_id,) = kullanici_olustur()
+    _, (alici_id,) = kullanici_olustur()
+    bugun = datetime.utcnow().date()
+    with app.app_context():
+        toplu_yukleme(Decimal('1000'))
+        _kart_ac(hesap_id, kullanici_id, '9792310000000001', 'Kredi Kartı', limit=500)
+        _kart_ac(hesap_id, kullanici_id, '9792310000000002', 'Banka Kartı')
+        kredi, _ = kart_harcamasi('9792310000000001', '12/99', '123', Decimal('50'))
+        banka, _ = kart_harcamasi('9792310000000002', '12/99', '123', Decimal('30'))
+        transfer_yap(hesap_id, alici_id, Decimal('10'))
+
+        # Güncelleme öncesi durum - Kredi kartı harcaması hesaptan çıkış olarak özetlenmiş
+        db.session.execute(db.update(Islem).where(Islem.id == kredi.id).values(islem_turu='Kart Harcaması'))
+        db.session.execute(db.delete(SemaSurumu).where(SemaSurumu.surum >= 8))
+        db.session.commit()
+        gunluk_ozetleri_guncelle(bugun)
+
+        assert veritabani_hazirla() == [8, 9]
+        assert db.session.get(Islem, kredi.id).islem_turu == KREDI_KARTI_HARCAMASI
+        assert db.session.get(Islem, banka.id).islem_turu == 'Kart Harcaması'
+        ozet = db.session.get(HesapGunlukOzet, (hesap_id, bugun))
+        assert (ozet.acilis_bakiye, ozet.toplam_cikis, ozet.kapanis_bakiye) == (0, Decimal('40'), Decimal('960'))
@@ -0,0 +1,38 @@
+"""
+Olay kutusu testleri
+Kira süresi dolan olay başka bir worker'a geçtiğinde geç kalan worker'ın sonucu yazılmamalıdır.
+"""
+import pytest
+from modeller import db, OlayKutusu
+import servisler
+from servisler import olay_ekle, olaylari_isle
+
+def _baska_worker_sahiplenir(olay):
+    """İşleyici çalışırken kira süresinin dolduğunu ve olayı başka bir worker'ın aldığını taklit eder"""
+    db.session.execute(db.update(OlayKutusu).where(OlayKutusu.id == olay['id']).values(isleyici='baska-worker'))
+    db.session.commit()
+
+def _gec_kalan_hatali(olay):
+    """Olay başka worker'a geçtikten sonra hata veren işleyici"""
+    _baska_worker_sahiplenir(olay)
+    raise RuntimeError('zaman aşımı')
+
+@pytest.mark.parametrize('isleyici', [_baska_worker_sahiplenir, _gec_kalan_hatali])
+def test_gec_kalan_worker_sonucu_yazmaz(app, monkeypatch, isleyici):
+    monkeypatch.setitem(servisler.OLAY_ISLEYICILERI, 'test.olay', [isleyici])
+    with app.app_context():
+        olay_ekle('test.olay', {})
+        db.session.commit()
+
+        assert olaylari_isle() == {'Gönderildi': 0, 'Bekliyor': 0, 'Başarısız': 0}
+        olay = db.session.query(OlayKutusu).one()
+        assert (olay.durum, olay.isleyici, olay.deneme_sayisi) == ('İşleniyor', 'baska-worker', 0)
+
+def test_sahiplenilen_olay_gonderilir(app, monkeypatch):
+    monkeypatch.setitem(servisler.OLAY_ISLEYICILERI, 'test.olay', [lambda olay: None])
+    with app.app_context():
+        olay_ekle('test.olay', {})
+        db.session.commit()
+
+        assert olaylari_isle()['Gönderildi'] == 1
+        assert db.session.query(OlayKutusu).one().durum == 'Gönderildi'
@@ -0,0 +1,59 @@
+"""
+Transfer talimatı testleri
+Zamanlayıcı talimatı sahiplendikten sonra kira süresi dolup talimat başka zamanlayıcıya geçerse
+veya kullanıcı talimatı iptal ederse geç kalan zamanlayıcı parayı hareket ettirmemelidir.
+"""
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from modeller import db, Hesap, Islem, TransferTalimati
+import servisler
+from servisler import talimat_olustur, talimatlari_calistir
+from conftest import giris_yap
+
+@pytest.fixture
+def talimat(app, kullanici_olustur):
+    """(kullanıcı id, talimat id, gönderen hesap id) - Zamanı gelmiş 10 TL'lik tek seferlik talimat"""
+    kullanici_id, (hesap_id,) = kullanici_olustur(bakiye=Decimal('100'))
+    _, (alici_id,) = kullanici_olustur()
+    with app.app_context():
+        return kullanici_id, talimat_olustur(kullanici_id, hesap_id, alici_id, Decimal('10'), 'Tek Sefer',
+                                             datetime.utcnow()).id, hesap_id
+
+def _sahiplendikten_sonra(monkeypatch, degisiklik):
+    """Talimatlar sahiplenildikten hemen sonra başka bir sürecin talimatları değiştirmesini taklit eder"""
+    sahiplen = servisler._talimatlari_sahiplen
+    def sahiplen_ve_degistir(limit):
+        sonuc = sahiplen(limit)
+        db.session.execute(db.update(TransferTalimati).values(**degisiklik))
+        db.session.commit()
+        return sonuc
+    monkeypatch.setattr(servisler, '_talimatlari_sahiplen', sahiplen_ve_degistir)
+
+@pytest.mark.parametrize('degisiklik', [{'isleyici': 'baska-zamanlayici'}, {'durum': 'İptal', 'isleyici': None}])
+def test_elden_cikan_talimat_calistirilmaz(app, monkeypatch, talimat, degisiklik):
+    _, talimat_id, hesap_id = talimat
+    _sahiplendikten_sonra(monkeypatch, degisiklik)
+    with app.app_context():
+        assert talimatlari_calistir() == {'Başarılı': 0, 'Tekrar Denenecek': 0, 'Başarısız': 0}
+        assert db.session.query(Islem).count() == 0
+        assert db.session.get(Hesap, hesap_id).bakiye == Decimal('100')
+        assert db.session.get(TransferTalimati, talimat_id).durum == degisiklik.get('durum', 'İşleniyor')
+
+def test_talimat_calistirilir(app, talimat):
+    _, talimat_id, hesap_id = talimat
+    with app.app_context():
+        assert talimatlari_calistir()['Başarılı'] == 1
+        assert db.session.get(Hesap, hesap_id).bakiye == Decimal('90')
+        assert db.session.get(TransferTalimati, talimat_id).durum == 'Tamamlandı'
+
+def test_islenen_talimat_iptal_edilemez(app, talimat):
+    kullanici_id, talimat_id, _ = talimat
+    with app.app_context():
+        db.session.execute(db.update(TransferTalimati).values(durum='İşleniyor', isleyici='zamanlayici'))
+        db.session.commit()
+    istemci = app.test_client()
+    giris_yap(istemci, kullanici_id)
+    istemci.post(f'/transfer/scheduled/{talimat_id}/cancel')
+    with app.app_context():
+        assert db.session.get(TransferTalimati, talimat_id).durum == 'İşleniyor'
@@ -0,0 +1,38 @@
+"""
+Toplu transfer testleri
+Toplu yükleme, tek transferdeki hız/limit kurallarını aşmanın yolu olmamalıdır: her talimat
+aynı kurallardan geçer ve dosyadaki önceki talimatlar da sayılır.
+"""
+import json
+from decimal import Decimal
+import pytest
+from modeller import db, Hesap, Islem, OlayKutusu
+from servisler import toplu_transfer, transfer_yap, TransferHatasi
+
+KURALLAR = [{'ad': 'gun_tutar', 'pencere': 86400, 'tutar': '200', 'sonuc': 'engelle'},
+            {'ad': 'tek_islem', 'pencere': 0, 'tutar': '80', 'sonuc': 'isaretle'}]
+
+@pytest.fixture
+def app(app):
+    """Günlük 200 TL çıkış sınırı ve 80 TL üstü işaretleme kuralı olan uygulama"""
+    app.config['DOLANDIRICILIK_KURALLARI'] = KURALLAR
+    return app
+
+def test_toplu_transfer_hiz_kurallarina_tabi(app, kullanici_olustur):
+    _, (hesap_id,) = kullanici_olustur(bakiye=Decimal('1000'))
+    _, (alici_id,) = kullanici_olustur()
+    with app.app_context():
+        gonderen_no, alici_no = (db.session.get(Hesap, hesap_id).hesap_no, db.session.get(Hesap, alici_id).hesap_no)
+        transfer_yap(hesap_id, alici_id, Decimal('30'))
+        rapor = toplu_transfer([{'gonderen_hesap_no': gonderen_no, 'alici_hesap_no': alici_no, 'tutar': tutar}
+                                for tutar in ('90', '60', '40', '20')])
+
+        assert [satir['durum'] for satir in rapor] == ['Başarılı', 'Başarılı', 'Hata', 'Başarılı']  # 30+90+60+40 > 200
+        assert 'güvenlik' in rapor[2]['mesaj']
+        assert db.session.get(Hesap, hesap_id).bakiye == Decimal('800')
+        assert db.session.query(Islem).count() == 4
+
+        isaretlenen = db.session.scalars(db.select(OlayKutusu.veri).where(OlayKutusu.olay_turu == 'transfer.isaretlendi')).all()
+        assert [json.loads(veri)['kurallar'] for veri in isaretlenen] == [['tek_islem']]
+        with pytest.raises(TransferHatasi):  # Toplu transferler sayaçlara eklendi: 200 + 5 > 200
+            transfer_yap(hesap_id, alici_id, Decimal('5'))
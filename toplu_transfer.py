@@ -0,0 +1,73 @@
+"""
+Toplu transfer scripti (maaş ödemeleri vb.)
+Bu script, CSV veya JSON dosyasındaki transfer talimatlarını toplu olarak uygular ve
+her satır için sonuç raporu üretir.
+
+CSV dosyası şu kolonları içermelidir: gonderen_hesap_no, alici_hesap_no, tutar, aciklama
+JSON dosyası aynı anahtarlara sahip nesnelerden oluşan bir liste olmalıdır.
+
+Kullanım:
+    python toplu_transfer.py odemeler.csv
+    python toplu_transfer.py odemeler.json --parca 5000 --rapor sonuc.csv
+"""
+# Uygulama fabrikasını ve gerekli servisleri import et
+from app import uygulama_olustur  # Uygulama fabrikası (web'e özgü parçalar olmadan)
+from servisler import toplu_transfer
+import argparse  # Komut satırı argümanları için
+import csv  # CSV dosyalarını okumak/yazmak için
+import json  # JSON dosyalarını okumak/yazmak için
+import time  # Süre ölçümü için
+
+# Rapor dosyasına yazılan kolonlar
+RAPOR_KOLONLARI = ['satir', 'gonderen_hesap_no', 'alici_hesap_no', 'tutar', 'durum', 'mesaj']
+
+def talimatlari_oku(dosya_yolu):
+    """CSV veya JSON dosyasından transfer talimatlarını okur"""
+    with open(dosya_yolu, encoding='utf-8-sig') as dosya:  # Excel'in eklediği BOM'u da kabul et
+        if dosya_yolu.lower().endswith('.json'):
+            return json.load(dosya)
+        return list(csv.DictReader(dosya))
+
+def raporu_yaz(rapor, dosya_yolu):
+    """Satır bazında sonuç raporunu CSV veya JSON olarak kaydeder"""
+    with open(dosya_yolu, 'w', encoding='utf-8', newline='') as dosya:
+        if dosya_yolu.lower().endswith('.json'):
+            json.dump(rapor, dosya, ensure_ascii=False, indent=2, default=str)
+        else:
+            yazici = csv.DictWriter(dosya, fieldnames=RAPOR_KOLONLARI)
+            yazici.writeheader()
+            yazici.writerows(rapor)
+
+# Script doğrudan çalıştırılıyorsa
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='CSV/JSON dosyasındaki transfer talimatlarını toplu olarak uygular')
+    parser.add_argument('dosya', help='Talimat dosyası (.csv veya .json)')
+    parser.add_argument('--parca', type=int, default=1000, help='Her commit\'te uygulanacak talimat sayısı (varsayılan: 1000)')
+    parser.add_argument('--rapor', help='Sonuç raporunun kaydedileceği dosya (.csv veya .json)')
+    args = parser.parse_args()
+    
+    talimatlar = talimatlari_oku(args.dosya)
+    print(f"Toplam {len(talimatlar)} talimat okundu.")
+    
+    # Uygulama bağlamı içinde çalış (veritabanı işlemleri için gerekli)
+    with uygulama_olustur(web=False).app_context():
+        baslangic = time.perf_counter()
+        rapor = toplu_transfer(talimatlar, parca_boyutu=args.parca)
+        sure = time.perf_counter() - baslangic
+    
+    basarili = sum(1 for satir in rapor if satir['durum'] == 'Başarılı')
+    
+    # Hatalı satırları yazdır
+    for satir in rapor:
+        if satir['durum'] != 'Başarılı':
+            print(f"[HATA] Satir {satir['satir']}: {satir['gonderen_hesap_no']} -> {satir['alici_hesap_no']} "
+                  f"({satir['tutar']}) - {satir['mesaj']}")
+    
+    if args.rapor:
+        raporu_yaz(rapor, args.rapor)
+        print(f"Rapor kaydedildi: {args.rapor}")
+    
+    # İşlem özetini yazdır
+    hiz = len(rapor) / sure if sure > 0 else 0
+    print(f"\n[Tamamlandi] {basarili} basarili, {len(rapor) - basarili} hatali talimat "
+          f"({sure:.2f} sn, {hiz:.0f} talimat/sn).")
@@ -0,0 +1,72 @@
+"""
+Yatırım değerleme scripti
+Bu script, tüm aktif yatırım hesaplarının pozisyonlarını belleğe yükler, fiyat akışındaki her
+tick'te ilgili enstrümanın pozisyonlarını yeniden değerler ve değişen toplam_bakiye/kar_zarar
+değerlerini belirli aralıklarla veritabanına toplu olarak yazar. Bu sırada açılan yeni yatırım
+hesapları her yazmadan önce motora eklenir. NumPy kuruluysa değerleme vektörel yapılır.
+
+Kullanım:
+    python yatirim_degerleme.py                          # Simülatör fiyatlarıyla sürekli çalış
+    python yatirim_degerleme.py --dosya fiyatlar.csv     # 'enstruman,fiyat' satırlarını sırayla uygula
+    python yatirim_degerleme.py --aralik 0.1 --yazma-araligi 2 --adet 500
+"""
+# Uygulama fabrikasını ve gerekli servisleri import et
+from app import uygulama_olustur  # Uygulama fabrikası (web'e özgü parçalar olmadan)
+from servisler import degerleme_motoru_olustur, pozisyonlari_yukle, degerlemeleri_yaz
+from degerleme import DosyaFiyatAkisi, SimulatorFiyatAkisi  # Fiyat akışları
+import argparse  # Komut satırı argümanları için
+import time  # Yazma aralığı ve süre ölçümü için
+
+def calistir(akis, yazma_araligi=5.0, vektorel=None):
+    """Akıştaki fiyatları motora uygular; en fazla 'yazma_araligi' saniyede bir veritabanına yazar"""
+    # Uygulama bağlamı içinde çalış (veritabanı işlemleri için gerekli)
+    with uygulama_olustur(web=False).app_context():
+        baslangic = time.perf_counter()
+        motor, son_id = degerleme_motoru_olustur(vektorel=vektorel)
+        print(f"{motor.pozisyon_sayisi()} pozisyon yuklendi ({time.perf_counter() - baslangic:.2f} sn, "
+              f"{'numpy' if motor.vektorel else 'saf Python'})")
+
+        def yaz():
+            """Yeni hesapları ekler ve değişen değerleri yazar"""
+            nonlocal son_id
+            son_id = pozisyonlari_yukle(motor, son_id)
+            yazma_baslangic = time.perf_counter()
+            yazilan = degerlemeleri_yaz(motor)
+            if yazilan:
+                print(f"  {yazilan} hesap yazildi ({time.perf_counter() - yazma_baslangic:.2f} sn), "
+                      f"toplam deger {motor.toplam_deger() / 100:.2f} TL")
+
+        tick_sayisi, tick_suresi = 0, 0.0
+        son_yazma = time.monotonic()
+        for enstruman, fiyat in akis.fiyatlar():
+            tick_baslangic = time.perf_counter()
+            motor.fiyat_guncelle(enstruman, fiyat)  # Sadece bu enstrümanın pozisyonları yeniden değerlenir
+            tick_suresi += time.perf_counter() - tick_baslangic
+            tick_sayisi += 1
+            if time.monotonic() - son_yazma >= yazma_araligi:
+                yaz()
+                son_yazma = time.monotonic()
+        yaz()  # Akış bittiyse son değerleri yaz
+
+        if tick_sayisi:
+            print(f"[Tamamlandi] {tick_sayisi} tick, tick basina ortalama {tick_suresi / tick_sayisi * 1000:.2f} ms degerleme")
+
+# Script doğrudan çalıştırılıyorsa
+if __name__ == '__main__':
+    ayristirici = argparse.ArgumentParser(description='Yatırım hesaplarını fiyat akışına göre değerler')
+    ayristirici.add_argument('--dosya', help="'enstruman,fiyat' satırlarından oluşan fiyat dosyası (verilmezse simülatör)")
+    ayristirici.add_argument('--aralik', type=float, default=1.0, help='Simülatörde tick aralığı (saniye)')
+    ayristirici.add_argument('--adet', type=int, help='Simülatörün üreteceği tick sayısı (varsayılan: sınırsız)')
+    ayristirici.add_argument('--yazma-araligi', type=float, default=5.0, help='Veritabanına yazma aralığı (saniye)')
+    ayristirici.add_argument('--saf-python', action='store_true', help='NumPy kurulu olsa bile kullanma')
+    argumanlar = ayristirici.parse_args()
+
+    if argumanlar.dosya:
+        akis = DosyaFiyatAkisi(argumanlar.dosya)
+    else:
+        akis = SimulatorFiyatAkisi(aralik=argumanlar.aralik, adet=argumanlar.adet)
+
+    try:
+        calistir(akis, argumanlar.yazma_araligi, vektorel=False if argumanlar.saf_python else None)
+    except KeyboardInterrupt:  # Ctrl+C ile durduruldu
+        print("Durduruldu.")
@@ -0,0 +1,105 @@
+"""
+BetikBank yönetim komutları
+'flask' komut satırı için hafif giriş noktası. create_app() web route'ları, JSON API, oturum
+yönetimi ve performans ölçümü olmadan (web=False) bir uygulama oluşturur; komutlar sadece
+ayarları, veritabanını ve kullandıkları servisleri yükler. Sürekli çalışan worker'lar için
+olay_dagitici.py ve talimat_zamanlayici.py scriptleri kullanılmaya devam eder.
+
+Kullanım:
+    flask --app yonetim sema-guncelle                 # Şemayı kur veya bekleyen güncellemeleri uygula
+    flask --app yonetim sema-durumu                   # Uygulanmış ve bekleyen güncellemeleri göster
+    flask --app yonetim olaylari-isle --parca 500     # Bekleyen olayları bir kez teslim et
+    flask --app yonetim talimatlari-calistir          # Zamanı gelmiş talimatları bir kez çalıştır
+    flask --app yonetim gunluk-ozet 2025-01-31        # Verilen güne kadar olan günleri özetle
+    flask --app yonetim islem-arsivle --ay 6          # Son 6 aydan eski işlemleri arşive taşı
+"""
+import click  # Komut satırı argümanları için
+from flask.cli import with_appcontext  # Komutları uygulama bağlamında çalıştırmak için
+from app import uygulama_olustur  # Uygulama fabrikası
+from sema import sema_surumu, bekleyen_guncellemeler, veritabani_hazirla  # Şema güncellemeleri
+from servisler import olaylari_isle, talimatlari_calistir, gunluk_ozetleri_guncelle, islemleri_arsivle
+
+# Şema komutları
+@click.command('sema-guncelle')
+@with_appcontext
+def sema_guncelle_komutu():
+    """Şemayı sıfırdan kurar veya mevcut veritabanına bekleyen güncellemeleri uygular"""
+    uygulanan = veritabani_hazirla()
+    if uygulanan:
+        click.echo(f"[Tamamlandi] Uygulanan guncellemeler: {', '.join(map(str, uygulanan))}")
+    else:
+        click.echo("[Tamamlandi] Sema guncel.")
+
+@click.command('sema-durumu')
+@with_appcontext
+def sema_durumu_komutu():
+    """Uygulanmış son güncellemeyi ve bekleyen güncellemeleri gösterir; bekleyen varsa çıkış kodu 1 olur"""
+    surum = sema_surumu()
+    bekleyen = bekleyen_guncellemeler()
+    click.echo(f"Sema surumu: {'kurulmamis' if surum is None else surum}")
+    click.echo(f"Bekleyen guncellemeler: {', '.join(map(str, bekleyen)) or 'yok'}")
+    if bekleyen:
+        raise SystemExit(1)  # Dağıtım betiklerinde kontrol için
+
+# Toplu iş komutları - Kuyrukta zamanı gelmiş kayıt kalmayana kadar bir kez çalışır
+@click.command('olaylari-isle')
+@click.option('--parca', default=100, show_default=True, help='Tek seferde sahiplenilecek olay sayısı')
+@with_appcontext
+def olaylari_isle_komutu(parca):
+    """Bekleyen olayları işleyicilerine bir kez teslim eder"""
+    toplam = {'Gönderildi': 0, 'Bekliyor': 0, 'Başarısız': 0}
+    while True:
+        ozet = olaylari_isle(parca)
+        for durum, adet in ozet.items():
+            toplam[durum] += adet
+        if sum(ozet.values()) < parca:
+            break
+    click.echo(f"[Tamamlandi] {toplam['Gönderildi']} olay gonderildi, {toplam['Bekliyor']} yeniden denenecek, "
+               f"{toplam['Başarısız']} olay basarisiz.")
+
+@click.command('talimatlari-calistir')
+@click.option('--parca', default=1000, show_default=True, help="Her commit'te çalıştırılacak talimat sayısı")
+@with_appcontext
+def talimatlari_calistir_komutu(parca):
+    """Zamanı gelmiş transfer talimatlarını bir kez çalıştırır"""
+    toplam = {'Başarılı': 0, 'Tekrar Denenecek': 0, 'Başarısız': 0}
+    while True:
+        ozet = talimatlari_calistir(parca)
+        for durum, adet in ozet.items():
+            toplam[durum] += adet
+        if sum(ozet.values()) < parca:
+            break
+    click.echo(f"[Tamamlandi] {toplam['Başarılı']} talimat calisti, {toplam['Tekrar Denenecek']} yeniden denenecek, "
+               f"{toplam['Başarısız']} talimat basarisiz.")
+
+@click.command('gunluk-ozet')
+@click.argument('son_gun', required=False, type=click.DateTime(formats=['%Y-%m-%d']))
+@with_appcontext
+def gunluk_ozet_komutu(son_gun):
+    """Henüz özetlenmemiş günlerin hesap özetlerini oluşturur (varsayılan: düne kadar)"""
+    gun_sayisi = gunluk_ozetleri_guncelle(son_gun.date() if son_gun else None)
+    click.echo(f"[Tamamlandi] {gun_sayisi} gun ozetlendi.")
+
+@click.command('islem-arsivle')
+@click.option('--ay', type=int, help='Sıcak tabloda tutulacak ay sayısı (varsayılan: ISLEM_ARSIV_AY)')
+@with_appcontext
+def islem_arsivle_komutu(ay):
+    """Eski işlemleri arşiv tablosuna taşır"""
+    donem_sayisi = islemleri_arsivle(ay, ilerleme=lambda donem, satir: click.echo(f"  {donem}: {satir} islem arsivlendi"))
+    click.echo(f"[Tamamlandi] {donem_sayisi} ay arsive tasindi.")
+
+KOMUTLAR = [
+    sema_guncelle_komutu,
+    sema_durumu_komutu,
+    olaylari_isle_komutu,
+    talimatlari_calistir_komutu,
+    gunluk_ozet_komutu,
+    islem_arsivle_komutu,
+]
+
+def create_app():
+    """'flask --app yonetim' için web'e özgü parçalar olmadan uygulama oluşturur ve komutları ekler"""
+    app = uygulama_olustur(web=False)
+    for komut in KOMUTLAR:
+        app.cli.add_command(komut)
+    return app